@@ -0,0 +1,214 @@
+"""
+Persistent (on-disk) store of backend metadata documents
+(e.g. process and collection listings, which can be several MB for large backends),
+to avoid downloading them again in each test suite run (or each pytest-xdist worker)
+when they did not change.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Union
+
+import requests
+
+from openeo_test_suite.lib.caching import get_persistent_cache
+
+_log = logging.getLogger(__name__)
+
+
+class BackendMetadataStore:
+    """
+    Store of (unauthenticated) metadata documents of a single backend,
+    persisted in a directory with a JSON file per document
+    (so that concurrent test suite runs or pytest-xdist workers
+    can not overwrite each other's documents).
+
+    Documents younger than the configured TTL are used as-is.
+    Older documents are revalidated with a conditional request
+    (`If-None-Match`/`If-Modified-Since`, based on `ETag`/`Last-Modified` response headers),
+    so that they are only downloaded again when they actually changed.
+    Paginated listings (e.g. collections) are followed through their "next" links
+    and stored as a whole.
+    """
+
+    # Document name to API path (relative to the root URL) mapping
+    DOCUMENTS = {
+        "processes": "processes",
+        "collections": "collections",
+        "file_formats": "file_formats",
+        "conformance": "conformance",
+        # Well-known discovery document lives at the domain root, not under the (versioned) root URL
+        "well_known": "/.well-known/openeo",
+    }
+
+    # Document name to the property holding the items of paginated listings
+    PAGINATED = {"processes": "processes", "collections": "collections"}
+
+    # Maximum number of pages to follow (safeguard against pagination loops)
+    MAX_PAGES = 1000
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        root_url: str,
+        ttl: float = 3600,
+        session: Union[requests.Session, None] = None,
+        timeout: float = 60,
+    ):
+        """
+        :param path: path of the directory to persist the documents in
+        :param root_url: root URL of the backend (e.g. "https://openeo.test/openeo/1.2/")
+        :param ttl: time (in seconds) to use a stored document without revalidation
+        :param session: requests session to use
+        :param timeout: request timeout in seconds
+        """
+        self._path = Path(path)
+        self._root_url = root_url.rstrip("/") + "/"
+        self._ttl = ttl
+        self._session = session or requests.Session()
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._documents = {}
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _url(self, name: str) -> str:
+        return urllib.parse.urljoin(self._root_url, self.DOCUMENTS[name])
+
+    def _document_path(self, name: str) -> Path:
+        return self._path / f"{name}.json"
+
+    def _read(self, name: str) -> Union[dict, None]:
+        path = self._document_path(name)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("root_url") == self._root_url:
+                return data["document"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _log.warning(f"Failed to read backend metadata from {path}: {e!r}")
+        return None
+
+    def _write(self, name: str, entry: dict):
+        path = self._document_path(name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=path.parent,
+                prefix=f".{path.name}.",
+                delete=False,
+            ) as f:
+                json.dump({"root_url": self._root_url, "document": entry}, f)
+            os.replace(f.name, path)
+        except Exception as e:
+            _log.warning(f"Failed to write backend metadata to {path}: {e!r}")
+
+    def _fetch_next_pages(self, name: str, url: str, data: dict) -> dict:
+        """
+        Follow "next" links of a paginated listing (starting from first page `data` at `url`)
+        and merge the items of all pages in the first one.
+        """
+        items_property = self.PAGINATED.get(name)
+        if not items_property:
+            return data
+        data = dict(data)
+        items = list(data.get(items_property, []))
+        page, page_url = data, url
+        for _ in range(self.MAX_PAGES):
+            next_url = _get_next_link(page, base_url=page_url)
+            if not next_url:
+                break
+            resp = self._session.get(next_url, timeout=self._timeout)
+            resp.raise_for_status()
+            page, page_url = resp.json(), next_url
+            items.extend(page.get(items_property, []))
+        else:
+            raise RuntimeError(f"Too many pages for backend metadata {url}")
+        data[items_property] = items
+        if "links" in data:
+            data["links"] = [
+                link for link in data["links"] if link.get("rel") != "next"
+            ]
+        return data
+
+    def get(self, name: str) -> dict:
+        """
+        Get metadata document (parsed JSON) by name (see `DOCUMENTS`).
+        """
+        with self._lock:
+            entry = self._documents.get(name)
+            if entry is None:
+                # Load (potentially updated by other test suite runs) document on first use only
+                entry = self._read(name)
+            if entry and time.time() - entry["validated"] < self._ttl:
+                self._documents[name] = entry
+                return entry["data"]
+
+            url = self._url(name)
+            headers = {}
+            if entry and entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry and entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            try:
+                resp = self._session.get(url, headers=headers, timeout=self._timeout)
+                if resp.status_code == 304 and entry:
+                    _log.info(f"Backend metadata {url} not modified")
+                else:
+                    resp.raise_for_status()
+                    entry = {
+                        "data": self._fetch_next_pages(name, url, resp.json()),
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                    }
+            except Exception as e:
+                if not entry:
+                    raise
+                _log.warning(
+                    f"Failed to revalidate backend metadata {url}, using stored version: {e!r}"
+                )
+                self._documents[name] = entry
+                return entry["data"]
+
+            entry["validated"] = time.time()
+            self._documents[name] = entry
+            self._write(name, entry)
+            return entry["data"]
+
+
+def _get_next_link(data: dict, base_url: str) -> Union[str, None]:
+    """Get (absolute) URL of the "next" link of a page of a paginated listing, if any."""
+    for link in data.get("links") or []:
+        if link.get("rel") == "next" and link.get("href"):
+            return urllib.parse.urljoin(base_url, link["href"])
+    return None
+
+
+def get_backend_metadata_store(
+    root_url: str, ttl: float, session: Union[requests.Session, None] = None
+) -> Union[BackendMetadataStore, None]:
+    """
+    Get persistent store of backend metadata for given backend root URL
+    (or None when persistent caching is disabled).
+    """
+    cache = get_persistent_cache("backend-metadata")
+    if cache is None:
+        return None
+    return BackendMetadataStore(
+        path=cache.root / cache.make_key(root_url),
+        root_url=root_url,
+        ttl=ttl,
+        session=session,
+    )
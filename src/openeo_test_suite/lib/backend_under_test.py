@@ -11,11 +11,14 @@ not test collection time, making it practically impossible to implement proper p
 import abc
 import functools
 import logging
-from typing import List, Union
+from typing import List, Optional, Union
 
 import openeo
 import pytest
 
+from openeo_test_suite.lib.backend_metadata import BackendMetadataStore
+from openeo_test_suite.lib.capabilities import CapabilitySnapshot
+
 _log = logging.getLogger(__name__)
 
 
@@ -32,18 +35,49 @@ class _BackendUnderTest(metaclass=abc.ABCMeta):
         """List available processes."""
         ...
 
+    @abc.abstractmethod
+    def list_output_formats(self) -> List[str]:
+        """List supported output file formats (lower case)."""
+        ...
+
 
 class HttpBackend(_BackendUnderTest):
     """Back-end under test that uses the openEO HTTP API."""
 
-    def __init__(self, connection: openeo.Connection):
+    def __init__(
+        self,
+        connection: openeo.Connection,
+        metadata_store: Optional[BackendMetadataStore] = None,
+    ):
+        """
+        :param connection: openeo connection
+        :param metadata_store: optional persistent store of backend metadata
+            to use instead of fetching listings through the connection.
+        """
         self.connection = connection
+        self.metadata_store = metadata_store
+
+    def _get_metadata(self, name: str, path: str) -> dict:
+        if self.metadata_store:
+            return self.metadata_store.get(name)
+        return self.connection.get(path, expected_status=200).json()
 
     def list_collection_ids(self) -> List[str]:
-        return [c["id"] for c in self.connection.list_collections()]
+        return [
+            c["id"]
+            for c in self._get_metadata("collections", "/collections")["collections"]
+        ]
 
     def list_process_ids(self) -> List[str]:
-        return [p["id"] for p in self.connection.list_processes()]
+        return [
+            p["id"] for p in self._get_metadata("processes", "/processes")["processes"]
+        ]
+
+    def list_output_formats(self) -> List[str]:
+        return [
+            f.lower()
+            for f in self._get_metadata("file_formats", "/file_formats")["output"]
+        ]
 
 
 class NoBackend(_BackendUnderTest):
@@ -55,6 +89,9 @@ class NoBackend(_BackendUnderTest):
     def list_process_ids(self) -> List[str]:
         return []
 
+    def list_output_formats(self) -> List[str]:
+        return []
+
 
 def get_backend_url(config: pytest.Config, required: bool = False) -> Union[str, None]:
     """
@@ -106,3 +143,28 @@ def get_collection_ids() -> List[str]:
 @functools.lru_cache
 def get_process_ids() -> List[str]:
     return get_backend_under_test().list_process_ids()
+
+
+@functools.lru_cache
+def get_capability_snapshot() -> Union[CapabilitySnapshot, None]:
+    """
+    Get snapshot of the capabilities of the backend under test
+    (or None when there is no backend or its capabilities can not be listed).
+    """
+    backend = get_backend_under_test()
+    if isinstance(backend, NoBackend):
+        return None
+    try:
+        snapshot = CapabilitySnapshot(
+            process_ids=frozenset(get_process_ids()),
+            output_formats=frozenset(backend.list_output_formats()),
+            collection_ids=frozenset(get_collection_ids()),
+        )
+    except Exception as e:
+        _log.warning(f"Failed to take capability snapshot of backend under test: {e!r}")
+        return None
+    _log.info(
+        f"Capability snapshot of backend under test: {len(snapshot.process_ids)} processes,"
+        f" {len(snapshot.collection_ids)} collections, output formats {sorted(snapshot.output_formats)}"
+    )
+    return snapshot
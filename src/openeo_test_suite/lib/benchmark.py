@@ -0,0 +1,132 @@
+"""
+Benchmarking of individual process tests:
+latency distributions per process and level, stored as (and compared against) a baseline file,
+e.g. to use the process test corpus as performance regression suite for backend releases.
+"""
+
+import collections
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pytest
+
+_log = logging.getLogger(__name__)
+
+
+# User properties of test reports with the benchmark latencies (in seconds) and the process level
+USER_PROPERTY_LATENCIES = "benchmark_latencies"
+USER_PROPERTY_LEVEL = "benchmark_level"
+
+
+class BenchmarkResults:
+    """Latencies (in seconds) of repeated process executions, per process and level."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+
+    @staticmethod
+    def key(process_id: str, level: str) -> str:
+        return f"{process_id}/{level}"
+
+    def add(self, process_id: str, level: str, latencies: List[float]):
+        self.latencies[self.key(process_id, level)].extend(latencies)
+
+    def add_report(self, report: pytest.TestReport):
+        """
+        Add the latencies from the user properties of a test report (see `USER_PROPERTY_LATENCIES`),
+        e.g. as received by the pytest-xdist controller from the workers.
+        """
+        properties = dict(report.user_properties)
+        latencies = properties.get(USER_PROPERTY_LATENCIES)
+        if latencies:
+            self.add(
+                properties.get("process_id", "-"),
+                properties.get(USER_PROPERTY_LEVEL, "-"),
+                latencies,
+            )
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency distribution (min, median, p95) per process and level."""
+        stats = {}
+        for key, latencies in sorted(self.latencies.items()):
+            if not latencies:
+                continue
+            stats[key] = {
+                "count": len(latencies),
+                "min": float(np.min(latencies)),
+                "median": float(np.median(latencies)),
+                "p95": float(np.percentile(latencies, 95)),
+            }
+        return stats
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf8") as f:
+            json.dump({"processes": self.get_stats()}, f, indent=2)
+        _log.info(f"Saved benchmark results to {path}")
+
+    def get_regressions(
+        self, baseline: Dict[str, Dict[str, float]], threshold: float
+    ) -> List[str]:
+        """
+        Compare median latencies against baseline stats (see `load_baseline`)
+        and list the processes that regressed beyond given relative threshold (e.g. 0.2 for 20%).
+        """
+        regressions = []
+        for key, stats in self.get_stats().items():
+            if key not in baseline:
+                continue
+            reference = baseline[key]["median"]
+            if reference > 0 and stats["median"] > reference * (1 + threshold):
+                regressions.append(
+                    f"{key}: median {stats['median'] * 1000:.2f}ms"
+                    f" vs baseline {reference * 1000:.2f}ms"
+                    f" (+{stats['median'] / reference - 1:.0%})"
+                )
+        return regressions
+
+    def get_summary(
+        self,
+        baseline: Optional[Dict[str, Dict[str, float]]] = None,
+        threshold: float = 0.2,
+    ) -> List[str]:
+        """Human-readable summary of latency distributions (and regressions against baseline)."""
+        lines = []
+        for key, stats in self.get_stats().items():
+            line = (
+                f"{key}: min {stats['min'] * 1000:.2f}ms,"
+                f" median {stats['median'] * 1000:.2f}ms,"
+                f" p95 {stats['p95'] * 1000:.2f}ms ({stats['count']} runs)"
+            )
+            if baseline and key in baseline:
+                line += f", baseline median {baseline[key]['median'] * 1000:.2f}ms"
+            lines.append(line)
+        if baseline is not None:
+            regressions = self.get_regressions(baseline, threshold=threshold)
+            if regressions:
+                lines.append(
+                    f"Latency regressions (median more than {threshold:.0%} above baseline):"
+                )
+                lines.extend(f"  {r}" for r in regressions)
+            else:
+                lines.append(
+                    f"No latency regressions (median more than {threshold:.0%} above baseline)"
+                )
+        return lines
+
+
+def load_baseline(path: Union[str, Path]) -> Dict[str, Dict[str, float]]:
+    """Load baseline stats from a benchmark results file (see `BenchmarkResults.save`)."""
+    with Path(path).open("r", encoding="utf8") as f:
+        return json.load(f)["processes"]
+
+
+_benchmark_results = BenchmarkResults()
+
+
+def get_benchmark_results() -> BenchmarkResults:
+    return _benchmark_results
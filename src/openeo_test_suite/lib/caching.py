@@ -0,0 +1,187 @@
+"""
+Caching of data that is expensive to compute or fetch:
+persistent (on-disk) caching (e.g. parsed process definitions), to reuse it across test suite runs,
+and in-memory LRU caching within a test session.
+"""
+
+import collections
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Union
+
+import pytest
+
+import openeo_test_suite
+
+_log = logging.getLogger(__name__)
+
+CACHE_DIR_ENV_VAR = "OPENEO_TEST_SUITE_CACHE_DIR"
+
+
+class PersistentCache:
+    """
+    Simple on-disk key-value cache of pickled Python objects,
+    intended to be used with content-based keys (see `make_key`).
+
+    Entries are versioned with the test suite version
+    and written atomically (write to temp file, then rename),
+    so that the cache directory can be shared between concurrent
+    test suite runs (e.g. between CI runners).
+    """
+
+    def __init__(self, root: Union[str, Path], namespace: str = "default"):
+        """
+        :param root: root directory of the cache
+        :param namespace: subdirectory to separate entries of different kinds
+        """
+        self._root = Path(root) / namespace / openeo_test_suite.__version__
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @staticmethod
+    def make_key(*parts: Union[str, bytes]) -> str:
+        """Build cache key by hashing given parts (e.g. file contents)."""
+        h = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode("utf-8")
+            # Length prefix to avoid ambiguity between different splits of the same bytes
+            h.update(len(part).to_bytes(8, "big"))
+            h.update(part)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            _log.warning(f"Failed to read cache entry {path}: {e!r}")
+            return default
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=f".{key}.", delete=False
+            ) as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+        except Exception as e:
+            _log.warning(f"Failed to write cache entry {path}: {e!r}")
+
+
+class LruCache:
+    """
+    Thread-safe in-memory cache that evicts least recently used entries,
+    with hit/miss statistics.
+
+    The size of the cache is its number of entries by default,
+    or the total size of the entries as reported by `get_size` (e.g. in bytes).
+    Entries that are larger than the maximum size on their own are not stored.
+    """
+
+    def __init__(self, max_size: int, get_size: Optional[Callable[[Any], int]] = None):
+        """
+        :param max_size: maximum (total) size of the entries
+        :param get_size: function to determine the size of an entry (default: 1 per entry)
+        """
+        self.max_size = max_size
+        self._get_size = get_size or (lambda value: 1)
+        self._entries: "collections.OrderedDict[Hashable, Any]" = (
+            collections.OrderedDict()
+        )
+        self._sizes = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """Store entry (evicting others if necessary), returns whether it was stored."""
+        size = self._get_size(value)
+        with self._lock:
+            self._pop(key)
+            if size > self.max_size:
+                return False
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._size += size
+            while self._size > self.max_size:
+                self._pop(next(iter(self._entries)))
+            return True
+
+    def _pop(self, key: Hashable):
+        if key in self._entries:
+            del self._entries[key]
+            self._size -= self._sizes.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# Internal singleton pointing to the root directory of persistent caches (or None when disabled),
+# setup happens in `pytest_configure` hook
+_cache_dir: Union[None, Path] = None
+
+
+def set_cache_dir_from_config(config: pytest.Config):
+    """
+    Set up persistent cache directory from pytest config (CLI options),
+    with fallback to an environment variable
+    and finally a subdirectory of the pytest cache directory.
+    """
+    global _cache_dir
+    if not config.getoption("--suite-cache"):
+        _cache_dir = None
+    elif config.getoption("--suite-cache-dir") or os.environ.get(CACHE_DIR_ENV_VAR):
+        _cache_dir = Path(
+            config.getoption("--suite-cache-dir") or os.environ[CACHE_DIR_ENV_VAR]
+        )
+    elif getattr(config, "cache", None) is not None:
+        _cache_dir = Path(config.cache.mkdir("openeo-test-suite"))
+    else:
+        _cache_dir = None
+    _log.info(f"Using persistent cache directory {_cache_dir}")
+
+
+def get_persistent_cache(namespace: str) -> Union[PersistentCache, None]:
+    """Get persistent cache for given namespace (or None when caching is disabled)."""
+    global _cache_dir
+    if _cache_dir is None:
+        return None
+    return PersistentCache(root=_cache_dir, namespace=namespace)
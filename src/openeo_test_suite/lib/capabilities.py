@@ -0,0 +1,194 @@
+"""
+Caching of backend capabilities (e.g. supported processes and file formats)
+that are queried repeatedly throughout a test session.
+"""
+
+import dataclasses
+import logging
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import pytest
+
+_log = logging.getLogger(__name__)
+
+# Aliases of output file formats (lower case), as used by backends
+# in their `GET /file_formats` listing.
+OUTPUT_FORMAT_ALIASES = {
+    "netcdf": frozenset({"netcdf", "nc"}),
+    "geotiff": frozenset({"geotiff", "gtiff"}),
+}
+
+
+def is_output_format_supported(
+    output_format: str, output_formats: Iterable[str]
+) -> bool:
+    """Check if given output format (or one of its aliases) is in given (lower case) format listing."""
+    output_format = output_format.lower()
+    aliases = OUTPUT_FORMAT_ALIASES.get(output_format, frozenset({output_format}))
+    return not aliases.isdisjoint(output_formats)
+
+
+class CapabilityCache:
+    """
+    Session-wide cache of backend capabilities,
+    to avoid redundant requests from per-test helpers like `Skipper`.
+
+    Concurrent requests for the same (uncached) capability are coalesced:
+    only one caller actually fetches it, while the others wait for its result.
+    Failures are not cached.
+    """
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str], Any] = {}
+        self._fetch_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: str, capability: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Get capability from cache, or fetch it (once) if not available yet.
+
+        :param source: identifier of the capability source (e.g. backend URL)
+        :param capability: name of the capability (e.g. "process_ids")
+        :param fetch: callable to fetch the capability value.
+            Note that the value will be shared between all callers, so it should be immutable.
+        """
+        key = (source, capability)
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        with fetch_lock:
+            with self._lock:
+                if key in self._values:
+                    self.hits += 1
+                    return self._values[key]
+            _log.debug(f"Fetching capability {capability!r} from {source!r}")
+            value = fetch()
+            with self._lock:
+                self._values[key] = value
+                self.misses += 1
+        return value
+
+    def invalidate(
+        self, source: Optional[str] = None, capability: Optional[str] = None
+    ):
+        """
+        Invalidate cached capabilities:
+        all of them or only those matching given source and/or capability name.
+        """
+        with self._lock:
+            for key in list(self._values.keys()):
+                if (source is None or key[0] == source) and (
+                    capability is None or key[1] == capability
+                ):
+                    del self._values[key]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def get_capability_source(connection) -> str:
+    """
+    Build capability source identifier for given connection-like object
+    (`openeo.Connection` or a `ProcessTestRunner`).
+    """
+    # Runners wrapping an `openeo.Connection` (e.g. `Http` runner)
+    connection = getattr(connection, "connection", connection)
+    root_url = getattr(connection, "root_url", None)
+    if root_url:
+        # Capabilities (e.g. available processes) might depend on authentication
+        auth = getattr(connection, "auth", None)
+        return f"{root_url} (auth: {type(auth).__name__ if auth else None})"
+    return type(connection).__name__
+
+
+@dataclasses.dataclass(frozen=True)
+class CapabilitySnapshot:
+    """
+    Snapshot of the capabilities of the backend under test,
+    taken once at test collection time.
+    """
+
+    process_ids: FrozenSet[str]
+    output_formats: FrozenSet[str]
+    collection_ids: FrozenSet[str]
+
+    def get_unmet_requirements(self, requirements: "TestRequirements") -> List[str]:
+        """List (human-readable) reasons why a test with given requirements can not run."""
+        reasons = []
+        unsupported_processes = requirements.processes.difference(self.process_ids)
+        if unsupported_processes:
+            reasons.append(f"Backend does not support: {unsupported_processes}")
+        for output_format in sorted(requirements.output_formats):
+            if not is_output_format_supported(output_format, self.output_formats):
+                reasons.append(f"{output_format} not supported as output file format")
+        missing_collections = requirements.collections.difference(self.collection_ids)
+        if missing_collections:
+            reasons.append(
+                f"Backend does not provide collections: {missing_collections}"
+            )
+        return reasons
+
+
+@dataclasses.dataclass
+class TestRequirements:
+    """Backend capabilities required by a test, as far as they can be determined at collection time."""
+
+    # Avoid pytest trying to collect this class as test class
+    __test__ = False
+
+    processes: Set[str] = dataclasses.field(default_factory=set)
+    output_formats: Set[str] = dataclasses.field(default_factory=set)
+    collections: Set[str] = dataclasses.field(default_factory=set)
+
+
+def get_test_requirements(item: pytest.Item) -> TestRequirements:
+    """
+    Determine the backend capabilities required by a collected test item, based on:
+    - `required_processes` and `required_output_format` markers
+    - parametrization of process tests (`test_process`) and process metadata tests
+    - usage of the `s2_collection` fixture (workflow tests)
+    """
+    requirements = TestRequirements()
+
+    for marker in item.iter_markers("required_processes"):
+        requirements.processes.update(marker.args)
+    for marker in item.iter_markers("required_output_format"):
+        requirements.output_formats.update(marker.args)
+
+    params = getattr(getattr(item, "callspec", None), "params", {})
+    if "expected_process" in params:
+        # Process metadata tests
+        requirements.processes.add(params["expected_process"].process_id)
+    if "process_id" in params and "example" in params:
+        # Individual process tests: only relevant for the runner against the backend under test
+        if item.config.getoption("--runner") == "http":
+            requirements.processes.add(params["process_id"])
+            requirements.processes.update(params["example"].get("required", []))
+
+    if "s2_collection" in getattr(item, "fixturenames", []):
+        s2_collection = item.config.getoption("--s2-collection")
+        if s2_collection:
+            # Mirror the `load_stac`/`load_collection` logic of the workflow cube fixtures
+            if "http" in s2_collection:
+                requirements.processes.update(["load_stac", "save_result"])
+            else:
+                requirements.processes.update(["load_collection", "save_result"])
+                requirements.collections.add(s2_collection)
+
+    return requirements
+
+
+# Internal singleton: capability cache for the whole test session
+_capability_cache = CapabilityCache()
+
+
+def get_capability_cache() -> CapabilityCache:
+    return _capability_cache
@@ -0,0 +1,153 @@
+"""
+Comparison of (potentially large) array and datacube results of process tests
+with their expected values.
+
+Numerical data is compared in a vectorized way with numpy,
+following the `DeepDiff` semantics used for other results
+(`math_epsilon`, `ignore_nan_inequality`, `ignore_numeric_type_changes`).
+DeepDiff is only used for the (small) mismatching slices, to keep reports compact.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from deepdiff import DeepDiff
+
+# Maximum number of mismatching slices to report in detail
+MAX_REPORTED_MISMATCHES = 10
+# Size of slices (along the last axis) to report mismatches in
+SLICE_SIZE = 10
+
+
+def _deepdiff(expected: Any, actual: Any, delta: float, **kwargs) -> DeepDiff:
+    return DeepDiff(
+        expected,
+        actual,
+        math_epsilon=delta,
+        ignore_numeric_type_changes=True,
+        ignore_nan_inequality=True,
+        **kwargs,
+    )
+
+
+def _as_array(data: Any) -> Optional[np.ndarray]:
+    """Convert to a (non-object) numpy array, or None if not possible (e.g. ragged or mixed data)."""
+    try:
+        array = np.asarray(data)
+    except (ValueError, TypeError):
+        return None
+    return None if array.dtype.hasobject else array
+
+
+def _get_mismatch_mask(
+    expected: np.ndarray, actual: np.ndarray, delta: float
+) -> Optional[np.ndarray]:
+    """
+    Vectorized element-wise comparison, or None if not supported for these data types.
+    """
+    numeric = "iuf"
+    if expected.dtype.kind in numeric and actual.dtype.kind in numeric:
+        # Same semantics as `math.isclose(a, b, abs_tol=delta)` used by DeepDiff's `math_epsilon`
+        return ~np.isclose(actual, expected, rtol=1e-09, atol=delta, equal_nan=True)
+    if expected.dtype.kind == actual.dtype.kind and expected.dtype.kind in "bUS":
+        return expected != actual
+    return None
+
+
+def compare_arrays(expected: Any, actual: Any, delta: float) -> List[str]:
+    """
+    Compare (nested) arrays (lists or numpy arrays).
+
+    :return: list of human-readable differences (empty if equal)
+    """
+    expected_array = _as_array(expected)
+    actual_array = _as_array(actual)
+    mismatch = None
+    if expected_array is not None and actual_array is not None:
+        if expected_array.shape != actual_array.shape:
+            return [
+                f"Shape mismatch: expected {expected_array.shape} but got {actual_array.shape}"
+            ]
+        mismatch = _get_mismatch_mask(expected_array, actual_array, delta)
+
+    if mismatch is None:
+        # Non-vectorizable data (e.g. nulls, mixed types or ragged arrays): full DeepDiff.
+        expected = expected.tolist() if isinstance(expected, np.ndarray) else expected
+        actual = actual.tolist() if isinstance(actual, np.ndarray) else actual
+        diff = _deepdiff(expected, actual, delta)
+        return [f"Differences: {diff!s}"] if diff else []
+
+    if not mismatch.any():
+        return []
+    return _summarize_mismatches(expected_array, actual_array, mismatch, delta)
+
+
+def _summarize_mismatches(
+    expected: np.ndarray, actual: np.ndarray, mismatch: np.ndarray, delta: float
+) -> List[str]:
+    count = int(mismatch.sum())
+    differences = [f"{count} of {mismatch.size} values differ"]
+
+    # Collect distinct slices (along last axis) containing mismatches, in order
+    slices: List[Tuple] = []
+    for index in np.argwhere(mismatch):
+        index = tuple(int(i) for i in index)
+        if expected.ndim == 0:
+            key = ()
+        else:
+            start = index[-1] - index[-1] % SLICE_SIZE
+            key = index[:-1] + (slice(start, start + SLICE_SIZE),)
+        if key not in slices:
+            slices.append(key)
+            if len(slices) >= MAX_REPORTED_MISMATCHES:
+                break
+
+    for key in slices:
+        diff = _deepdiff(expected[key].tolist(), actual[key].tolist(), delta)
+        location = ", ".join(
+            f"{k.start}:{min(k.stop, expected.shape[-1])}"
+            if isinstance(k, slice)
+            else str(k)
+            for k in key
+        )
+        differences.append(f"at [{location}]: {diff!s}")
+    if len(slices) >= MAX_REPORTED_MISMATCHES:
+        differences.append("...")
+    return differences
+
+
+def compare_datacubes(
+    expected: dict,
+    actual: dict,
+    delta: float,
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Compare datacubes (in the process test JSON representation, with data as nested lists or numpy array):
+    dimensions, labels and other metadata with DeepDiff, data with vectorized array comparison.
+
+    :return: list of human-readable differences (empty if equal)
+    """
+    exclude_paths = list(exclude_paths or [])
+    differences = []
+
+    diff = _deepdiff(
+        {k: v for k, v in expected.items() if k != "data"},
+        {k: v for k, v in actual.items() if k != "data"},
+        delta,
+        exclude_paths=exclude_paths,
+        exclude_regex_paths=exclude_regex_paths or [],
+    )
+    if diff:
+        differences.append(f"Differences: {diff!s}")
+
+    if "root['data']" not in exclude_paths:
+        if "data" not in actual:
+            differences.append("Missing data")
+        else:
+            differences.extend(
+                f"Data: {d}"
+                for d in compare_arrays(expected.get("data"), actual["data"], delta)
+            )
+    return differences
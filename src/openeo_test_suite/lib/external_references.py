@@ -0,0 +1,132 @@
+"""
+Loading of external references (`{"$ref": "..."}`) in the JSON5 process tests,
+e.g. to larger GeoJSON documents or data cubes shared by multiple tests.
+
+Supported formats:
+- JSON, JSON5 and GeoJSON documents (`.json`, `.json5`, `.geojson`)
+- plain text (`.txt`, `.wkt2`)
+- binary arrays as (copy-on-write) memory-mapped numpy array (`.npy`)
+- data cubes as lazily loaded `xarray.DataArray` (NetCDF `.nc`, Zarr `.zarr`)
+"""
+
+import logging
+import pickle
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import json5
+import numpy as np
+import xarray as xr
+
+from openeo_test_suite.lib.caching import LruCache
+
+_log = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    kind: str
+    payload: Any
+    # Memory footprint to take into account for eviction
+    size: int
+
+
+class ExternalReferenceLoader:
+    """
+    Memoizing loader of external references, so that each referenced file
+    is only read and parsed once, no matter how many tests use it.
+
+    Parsed data is kept in serialized (pickled) form,
+    so that each `load` returns a fresh copy
+    (which the caller can safely mutate in-place)
+    at a fraction of the cost of parsing the original (JSON5) file again.
+    Least recently used entries are evicted when the total size
+    exceeds the configured limit.
+
+    Binary array formats are not parsed into memory at all:
+    `.npy` files are memory-mapped (copy-on-write) on each load
+    and NetCDF/Zarr data cubes are opened lazily
+    (each load returns a shallow copy of the same `xarray.DataArray`).
+    """
+
+    def __init__(self, max_size: int = 256 * 1024 * 1024):
+        """
+        :param max_size: maximum total size (in bytes) of memoized entries
+        """
+        self._entries = LruCache(max_size=max_size, get_size=lambda e: e.size)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def load(self, ref: str, file: Path) -> Any:
+        """
+        Load external reference
+
+        :param ref: reference (path relative to the referring file)
+        :param file: path of the referring file (e.g. JSON5 process test file)
+        """
+        try:
+            path = (file.parent / ref).resolve()
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._read(ref=ref, path=path)
+                if not self._entries.set(path, entry):
+                    _log.info(
+                        f"Not memoizing external reference {path}: too large ({entry.size})"
+                    )
+            return self._unpack(entry)
+        except Exception as e:
+            # TODO: is this try-except actually useful?
+            raise RuntimeError(f"Failed to load external reference {ref}") from e
+
+    def _read(self, ref: str, path: Path) -> _Entry:
+        if ref.endswith(".json") or ref.endswith(".json5") or ref.endswith(".geojson"):
+            with open(path) as f:
+                data = json5.load(f)
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            return _Entry(kind="pickle", payload=payload, size=len(payload))
+        elif ref.endswith(".txt") or ref.endswith(".wkt2"):
+            with open(path) as f:
+                text = f.read()
+            return _Entry(kind="text", payload=text, size=len(text))
+        elif ref.endswith(".npy"):
+            # Only validate here, actual memory-mapping happens on each load
+            np.load(path, mmap_mode="r")
+            return _Entry(kind="npy", payload=path, size=0)
+        elif ref.endswith(".nc"):
+            data = xr.open_dataarray(path)
+            return _Entry(kind="dataarray", payload=data, size=0)
+        elif ref.endswith(".zarr"):
+            # Note: requires optional `zarr` dependency
+            data = xr.open_dataarray(path, engine="zarr")
+            return _Entry(kind="dataarray", payload=data, size=0)
+        else:
+            raise NotImplementedError(f"Unhandled external reference {ref}.")
+
+    @staticmethod
+    def _unpack(entry: _Entry) -> Any:
+        if entry.kind == "pickle":
+            return pickle.loads(entry.payload)
+        elif entry.kind == "npy":
+            # Copy-on-write memory map: writes only affect the returned array, not the file.
+            return np.load(entry.payload, mmap_mode="c")
+        elif entry.kind == "dataarray":
+            # Shallow copy: shares the (lazily loaded) data, but not the attributes.
+            return entry.payload.copy(deep=False)
+        return entry.payload
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Internal singleton: loader shared by all tests of a test session
+_loader = ExternalReferenceLoader()
+
+
+def load_ref(ref: str, file: Path) -> Any:
+    """Load external reference `ref`, relative to referring `file`, with session-wide memoization."""
+    return _loader.load(ref=ref, file=file)
@@ -0,0 +1,74 @@
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
+
+
+class DummyRunner(ProcessTestRunner):
+    """Runner with a handful of trivial process implementations, keeping track of executions."""
+
+    def __init__(self, backend_id: str = "dummy 1.0"):
+        self.backend_id = backend_id
+        self.executed = []
+        self.prefetched = []
+
+    def get_backend_id(self) -> str:
+        return self.backend_id
+
+    def list_processes(self):
+        return iter([{"id": "add"}, {"id": "divide"}])
+
+    def execute(self, id, arguments):
+        self.executed.append(id)
+        if id == "add":
+            return arguments["x"] + arguments["y"]
+        elif id == "divide":
+            if arguments["y"] == 0:
+                raise ZeroDivisionError("Division by zero")
+            return arguments["x"] / arguments["y"]
+        elif id == "sort":
+            return sorted(arguments["data"])
+        elif id == "sum":
+            return float(np.sum(arguments["data"]))
+        elif id == "apply":
+            return [arguments["process"](x) for x in arguments["data"]]
+        elif id == "ones":
+            return np.ones(arguments["size"])
+        elif id == "skip":
+            pytest.skip("Skipped")
+        raise ValueError(id)
+
+    def prefetch(self, calls):
+        self.prefetched.extend(c.process_id for c in calls)
+
+    def encode_process_graph(
+        self, process, parent_process_id=None, parent_parameter=None
+    ):
+        factor = process["process_graph"]["m"]["arguments"]["y"]
+        return lambda x: x * factor
+
+
+def _multiply_by(y: int) -> dict:
+    return {
+        "process_graph": {
+            "m": {
+                "process_id": "multiply",
+                "arguments": {"x": {"from_parameter": "x"}, "y": y},
+                "result": True,
+            }
+        }
+    }
+
+
+@pytest.fixture
+def make_dummy_runner() -> Callable[..., DummyRunner]:
+    """Factory of `DummyRunner`s (e.g. with a given backend id)."""
+    return DummyRunner
+
+
+@pytest.fixture
+def multiply_by() -> Callable[[int], dict]:
+    """Factory of callback process graphs (as encoded by `DummyRunner`) multiplying by given factor."""
+    return _multiply_by
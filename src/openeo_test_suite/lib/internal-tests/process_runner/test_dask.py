@@ -0,0 +1,234 @@
+import dask.array
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall
+from openeo_test_suite.lib.process_runner.dask import (
+    Dask,
+    LazyProcessRegistry,
+    _parse_process_graph,
+    get_startup_report,
+)
+
+
+class TestLazyProcessRegistry:
+    def test_resolve_on_first_use(self):
+        registry = LazyProcessRegistry()
+        assert "add" not in registry.store.get("predefined", {})
+        process = registry["add"]
+        assert process.spec["id"] == "add"
+        assert process.implementation(x=1, y=2) == 3
+        assert "add" in registry.store["predefined"]
+        assert registry["add"] is process
+
+    def test_normalized_name(self):
+        registry = LazyProcessRegistry()
+        assert registry["sum"].spec["id"] == "sum"
+
+    def test_unknown_process(self):
+        registry = LazyProcessRegistry()
+        with pytest.raises(KeyError):
+            registry["nope"]
+
+
+def test_list_processes():
+    process_ids = {p["id"] for p in Dask().list_processes()}
+    assert {"add", "sum", "e", "apply"}.issubset(process_ids)
+
+
+def test_startup_report():
+    LazyProcessRegistry()["add"]
+    assert get_startup_report().startswith(
+        "Dask runner startup: importing process implementations took"
+    )
+
+
+class TestEncodeProcessGraph:
+    @pytest.fixture
+    def reducer(self) -> dict:
+        return {
+            "process_graph": {
+                "sum": {
+                    "process_id": "sum",
+                    "arguments": {"data": {"from_parameter": "data"}},
+                    "result": True,
+                }
+            }
+        }
+
+    def test_parse_memoized(self, reducer):
+        parsed = _parse_process_graph(reducer, "reduce_dimension", "reducer")
+        same = _parse_process_graph(dict(reducer), "reduce_dimension", "reducer")
+        other = _parse_process_graph(reducer, "apply_dimension", "process")
+        assert same.nested_graph is parsed.nested_graph
+        assert other.nested_graph is not parsed.nested_graph
+        # Fresh graph for each parse, as building callables modifies it
+        assert same is not parsed
+        assert same.G is not parsed.G
+        assert list(same.nodes) == list(parsed.nodes)
+
+    def test_repeated_callback(self, reducer):
+        runner = Dask()
+        results = []
+        for data in [[1, 2], [5, 6], [1, 2]]:
+            callback = runner.encode_process_graph(
+                reducer,
+                parent_process_id="reduce_dimension",
+                parent_parameter="reducer",
+            )
+            results.append(callback(np.array(data), positional_parameters={"data": 0}))
+        assert results == [3, 11, 3]
+
+    def test_repeated_callback_multiple_nodes(self):
+        process = {
+            "process_graph": {
+                "add": {
+                    "process_id": "add",
+                    "arguments": {"x": {"from_parameter": "x"}, "y": 1},
+                },
+                "multiply": {
+                    "process_id": "multiply",
+                    "arguments": {"x": {"from_node": "add"}, "y": 2},
+                    "result": True,
+                },
+            }
+        }
+        runner = Dask()
+        results = []
+        for x in [1, 5]:
+            callback = runner.encode_process_graph(
+                process, parent_process_id="apply", parent_parameter="process"
+            )
+            results.append(callback(x, positional_parameters={"x": 0}))
+        assert results == [4, 12]
+
+
+class TestScheduler:
+    @pytest.mark.parametrize("scheduler", ["synchronous", "threads", "processes"])
+    def test_scheduler_context(self, scheduler):
+        runner = Dask(scheduler=scheduler, num_workers=2)
+        with runner._scheduler_context():
+            assert dask.config.get("scheduler") == scheduler
+        assert runner.get_backend_id().endswith(f" ({scheduler} scheduler)")
+
+    def test_default(self):
+        runner = Dask()
+        with runner._scheduler_context():
+            assert dask.config.get("scheduler", None) is None
+        assert "scheduler" not in runner.get_backend_id()
+
+    @pytest.mark.parametrize("scheduler", ["synchronous", "threads", "processes"])
+    def test_compute(self, scheduler):
+        runner = Dask(scheduler=scheduler, num_workers=2)
+        data = dask.array.arange(6, chunks=2)
+        expected = list(range(6))
+        assert runner.decode_data(data, expected=expected) == expected
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="Invalid Dask scheduler"):
+            Dask(scheduler="nope")
+        with pytest.raises(ValueError, match="memory limit"):
+            Dask(scheduler="threads", memory_limit="1GB")
+
+
+class TestVectorize:
+    def test_prefetch_size(self):
+        assert Dask().get_prefetch_size() == 0
+        assert Dask(vectorize=True).get_prefetch_size() > 0
+
+    def test_vectorized(self):
+        runner = Dask(vectorize=True)
+        calls = [ProcessCall("add", {"x": x, "y": 0.5}) for x in [1.0, 2.0, 3.0]]
+        calls += [ProcessCall("clip", {"x": x, "min": 0, "max": 2}) for x in [-1, 3]]
+        runner.prefetch(calls)
+        assert len(runner._prefetched) == 5
+        assert runner.decode_data(runner.execute("add", {"x": 2.0, "y": 0.5}), 0) == 2.5
+        assert (
+            runner.decode_data(runner.execute("clip", {"x": 3, "min": 0, "max": 2}), 0)
+            == 2
+        )
+        assert len(runner._prefetched) == 3
+        # Not prefetched
+        assert runner.execute("add", {"x": 4.0, "y": 0.5}) == 4.5
+
+    def test_signature_groups(self):
+        runner = Dask(vectorize=True)
+        runner.prefetch(
+            [
+                ProcessCall("add", {"x": 1, "y": 2}),
+                ProcessCall("add", {"x": 1.5, "y": 2}),
+                ProcessCall("add", {"x": 3, "y": 2}),
+            ]
+        )
+        # Only the int/int calls are vectorized (as a group)
+        assert len(runner._prefetched) == 2
+        result = runner.execute("add", {"x": 3, "y": 2})
+        assert runner.decode_data(result, 0) == 5
+        assert isinstance(runner.decode_data(result, 0), int)
+
+    def test_int_overflow(self):
+        runner = Dask(vectorize=True)
+        runner.prefetch(
+            [
+                ProcessCall("add", {"x": 1, "y": 2}),
+                ProcessCall("add", {"x": 9007199254740993, "y": 9223372036854775000}),
+            ]
+        )
+        # No int64 wraparound: left to be executed with Python ints
+        assert runner._prefetched == {}
+        result = runner.execute(
+            "add", {"x": 9007199254740993, "y": 9223372036854775000}
+        )
+        assert runner.decode_data(result, 0) == 9232379236109515993
+
+    def test_int_vectorized(self):
+        runner = Dask(vectorize=True)
+        calls = [ProcessCall("multiply", {"x": x, "y": 3}) for x in [2, 2**40, -7]]
+        runner.prefetch(calls)
+        assert len(runner._prefetched) == 3
+        assert (
+            runner.decode_data(runner.execute("multiply", {"x": 2**40, "y": 3}), 0)
+            == 3 * 2**40
+        )
+
+    def test_non_finite_results_not_vectorized(self):
+        runner = Dask(vectorize=True)
+        runner.prefetch(
+            [
+                ProcessCall("divide", {"x": 1.0, "y": 2.0}),
+                ProcessCall("divide", {"x": 1.0, "y": 0.0}),
+                ProcessCall("divide", {"x": 3.0, "y": 2.0}),
+                ProcessCall("divide", {"x": float("nan"), "y": 2.0}),
+            ]
+        )
+        assert len(runner._prefetched) == 3
+        # Executed on its own, with the regular error
+        with pytest.raises(ZeroDivisionError):
+            runner.execute("divide", {"x": 1.0, "y": 0.0})
+        assert (
+            runner.decode_data(runner.execute("divide", {"x": 3.0, "y": 2.0}), 0) == 1.5
+        )
+
+    def test_skip_non_scalar_and_throws(self):
+        runner = Dask(vectorize=True)
+        runner.prefetch(
+            [
+                ProcessCall("sum", {"data": [1, 2]}),
+                ProcessCall("sum", {"data": [3, 4]}),
+                ProcessCall("divide", {"x": 1.0, "y": 2.0}),
+                ProcessCall("divide", {"x": 1.0, "y": 0.0}, throws=True),
+            ]
+        )
+        assert runner._prefetched == {}
+
+    def test_fallback(self):
+        runner = Dask(vectorize=True)
+        # `round` doesn't support an array of decimals
+        runner.prefetch(
+            [
+                ProcessCall("round", {"x": 0.25, "p": 0}),
+                ProcessCall("round", {"x": 0.25, "p": 1}),
+            ]
+        )
+        assert runner._prefetched == {}
+        assert runner.execute("round", {"x": 0.25, "p": 1}) == 0.2
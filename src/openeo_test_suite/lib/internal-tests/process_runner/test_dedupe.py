@@ -0,0 +1,155 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.dedupe import (
+    DedupingRunner,
+    ExecutionCache,
+    _get_nbytes,
+)
+
+
+@pytest.fixture
+def runner(make_dummy_runner) -> ProcessTestRunner:
+    return make_dummy_runner()
+
+
+@pytest.fixture
+def cache() -> ExecutionCache:
+    return ExecutionCache()
+
+
+def test_execute(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    assert deduping.execute("add", {"x": 1, "y": 2}) == 3
+    assert deduping.execute("add", {"y": 2, "x": 1}) == 3
+    assert deduping.execute("add", {"x": 1, "y": 3}) == 4
+    assert runner.executed == ["add", "add"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_shared_across_runners(runner, cache, make_dummy_runner):
+    assert DedupingRunner(runner, cache=cache).execute("add", {"x": 1, "y": 2}) == 3
+    assert DedupingRunner(runner, cache=cache).execute("add", {"x": 1, "y": 2}) == 3
+    assert runner.executed == ["add"]
+    # Different backend
+    other = make_dummy_runner(backend_id="dummy 2.0")
+    assert DedupingRunner(other, cache=cache).execute("add", {"x": 1, "y": 2}) == 3
+    assert other.executed == ["add"]
+
+
+def test_defensive_copies(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    result = deduping.execute("sort", {"data": [3, 1, 2]})
+    assert result == [1, 2, 3]
+    # In-place modification (e.g. like `_prepare_results`)
+    result[0] = "mutated"
+    assert deduping.execute("sort", {"data": [3, 1, 2]}) == [1, 2, 3]
+    assert runner.executed == ["sort"]
+
+
+def test_exception(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError, match="Division by zero"):
+            deduping.execute("divide", {"x": 1, "y": 0})
+    assert runner.executed == ["divide"]
+
+
+def test_skip_not_shared(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    for _ in range(2):
+        with pytest.raises(pytest.skip.Exception):
+            deduping.execute("skip", {})
+    assert runner.executed == ["skip", "skip"]
+
+
+def test_arrays(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    cube = xr.DataArray(np.arange(4).reshape(2, 2), dims=["x", "y"])
+    assert deduping.execute("add", {"x": cube, "y": 1}).values.tolist() == [
+        [1, 2],
+        [3, 4],
+    ]
+    assert deduping.execute("add", {"x": cube.copy(), "y": 1}).values.tolist() == [
+        [1, 2],
+        [3, 4],
+    ]
+    assert deduping.execute("add", {"x": cube + 1, "y": 1}).values.tolist() == [
+        [2, 3],
+        [4, 5],
+    ]
+    assert runner.executed == ["add", "add"]
+
+
+def test_large_result_not_shared(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    for _ in range(2):
+        assert deduping.execute("ones", {"size": 4 * 1024**2}).shape == (
+            4 * 1024**2,
+        )
+    assert runner.executed == ["ones", "ones"]
+
+
+def test_large_list_arguments_not_shared(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    data = list(range(3 * 1024**2))
+    for _ in range(2):
+        assert len(deduping.execute("sort", {"data": data})) == len(data)
+    assert runner.executed == ["sort", "sort"]
+    assert len(cache) == 0
+
+
+def test_get_nbytes():
+    dask_array = pytest.importorskip("dask.array")
+    assert _get_nbytes(np.ones(4)) == 32
+    assert _get_nbytes(xr.DataArray(np.ones((2, 2)))) == 32
+    assert _get_nbytes(dask_array.ones(4)) == 32
+    assert _get_nbytes({"data": [1, 2, 3], "x": 1.5, "s": "foo"}) == 24
+    assert _get_nbytes([[1, 2], [3.0]]) == 24
+    assert _get_nbytes(np.float64(1.0)) == 8
+
+
+def test_callbacks(runner, cache, multiply_by):
+    deduping = DedupingRunner(runner, cache=cache)
+
+    def apply(y):
+        process = deduping.encode_process_graph(multiply_by(y), "apply", "process")
+        return deduping.execute("apply", {"data": [1, 2], "process": process})
+
+    assert apply(2) == [2, 4]
+    assert apply(3) == [3, 6]
+    assert apply(2) == [2, 4]
+    assert runner.executed == ["apply", "apply"]
+
+
+def test_prefetch(runner, cache):
+    deduping = DedupingRunner(runner, cache=cache)
+    deduping.execute("add", {"x": 1, "y": 2})
+    deduping.prefetch(
+        [
+            ProcessCall("add", {"x": 1, "y": 2}),
+            ProcessCall("divide", {"x": 1, "y": 2}),
+        ]
+    )
+    assert runner.prefetched == ["divide"]
+
+
+def test_cache_lru():
+    cache = ExecutionCache(max_size=2)
+    cache.set("a", result=1)
+    cache.set("b", result=2)
+    assert cache.get("a") == (1, None)
+    cache.set("c", result=3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_close(cache):
+    runner = mock.Mock(spec=ProcessTestRunner)
+    DedupingRunner(runner, cache=cache).close()
+    runner.close.assert_called_once_with()
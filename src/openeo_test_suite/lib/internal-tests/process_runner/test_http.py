@@ -0,0 +1,197 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall
+from openeo_test_suite.lib.process_runner.http import Http
+
+
+def _evaluate(node: dict, process_graph: dict):
+    """Very limited process graph evaluation of some math processes."""
+    args = {
+        k: _evaluate(process_graph[v["from_node"]], process_graph)
+        if isinstance(v, dict) and "from_node" in v
+        else v
+        for k, v in node["arguments"].items()
+    }
+    if node["process_id"] == "add":
+        return args["x"] + args["y"]
+    elif node["process_id"] == "divide":
+        if args["y"] == 0:
+            raise ValueError("Division by zero")
+        return args["x"] / args["y"]
+    elif node["process_id"] == "array_create":
+        return [
+            _evaluate(process_graph[d["from_node"]], process_graph)
+            for d in args["data"]
+        ]
+    raise ValueError(node["process_id"])
+
+
+@pytest.fixture
+def connection():
+    connection = mock.Mock()
+    connection.list_processes.return_value = [
+        {"id": "add"},
+        {"id": "divide"},
+        {"id": "array_create"},
+    ]
+
+    def execute(process):
+        process_graph = process["process_graph"]
+        [result_node] = [n for n in process_graph.values() if n.get("result")]
+        return _evaluate(result_node, process_graph)
+
+    connection.execute.side_effect = execute
+    return connection
+
+
+class TestHttpBatching:
+    def test_no_batching(self, connection):
+        runner = Http(connection)
+        assert runner.get_prefetch_size() == 0
+        runner.prefetch([ProcessCall("add", {"x": 1, "y": 2})])
+        assert connection.execute.call_count == 0
+        assert runner.execute("add", {"x": 1, "y": 2}) == 3
+        assert connection.execute.call_count == 1
+
+    def test_batching(self, connection):
+        runner = Http(connection, batch_size=3)
+        assert runner.get_prefetch_size() == 3
+        runner.prefetch([ProcessCall("add", {"x": i, "y": 10}) for i in range(5)])
+        # Two requests: batch of 3 and batch of 2
+        assert connection.execute.call_count == 2
+        assert [runner.execute("add", {"x": i, "y": 10}) for i in range(5)] == [
+            10,
+            11,
+            12,
+            13,
+            14,
+        ]
+        assert connection.execute.call_count == 2
+        # Not prefetched: direct execution
+        assert runner.execute("add", {"x": 1, "y": 1}) == 2
+        assert connection.execute.call_count == 3
+
+    def test_throws_not_batched(self, connection):
+        runner = Http(connection, batch_size=10)
+        runner.prefetch(
+            [
+                ProcessCall("add", {"x": 1, "y": 2}),
+                ProcessCall("divide", {"x": 1, "y": 0}, throws=True),
+                ProcessCall("add", {"x": 3, "y": 4}),
+            ]
+        )
+        assert connection.execute.call_count == 1
+        assert runner.execute("add", {"x": 3, "y": 4}) == 7
+        assert runner.execute("add", {"x": 1, "y": 2}) == 3
+        with pytest.raises(ValueError, match="Division by zero"):
+            runner.execute("divide", {"x": 1, "y": 0})
+        assert connection.execute.call_count == 2
+
+    def test_failing_batch_fallback(self, connection):
+        runner = Http(connection, batch_size=10)
+        runner.prefetch(
+            [
+                ProcessCall("add", {"x": 1, "y": 2}),
+                # Unexpected failure
+                ProcessCall("divide", {"x": 1, "y": 0}),
+                ProcessCall("divide", {"x": 6, "y": 3}),
+            ]
+        )
+        # One failed batch request and three single requests
+        assert connection.execute.call_count == 4
+        assert runner.execute("add", {"x": 1, "y": 2}) == 3
+        with pytest.raises(ValueError, match="Division by zero"):
+            runner.execute("divide", {"x": 1, "y": 0})
+        assert runner.execute("divide", {"x": 6, "y": 3}) == 2
+        assert connection.execute.call_count == 4
+
+    def test_no_array_create(self, connection):
+        connection.list_processes.return_value = [{"id": "add"}]
+        runner = Http(connection, batch_size=10)
+        runner.prefetch([ProcessCall("add", {"x": 1, "y": 2})])
+        assert connection.execute.call_count == 0
+        assert runner.execute("add", {"x": 1, "y": 2}) == 3
+
+
+class TestHttpConcurrency:
+    def test_prefetch_size(self, connection):
+        assert Http(connection, concurrency=4).get_prefetch_size() == 4
+        assert Http(connection, batch_size=3, concurrency=4).get_prefetch_size() == 12
+
+    def test_concurrent_execution(self, connection):
+        lock = threading.Lock()
+        active = []
+        max_active = []
+
+        execute = connection.execute.side_effect
+
+        def slow_execute(process):
+            with lock:
+                active.append(1)
+                max_active.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return execute(process)
+
+        connection.execute.side_effect = slow_execute
+        runner = Http(connection, concurrency=4)
+        runner.prefetch(
+            [ProcessCall("add", {"x": i, "y": 1}) for i in range(7)]
+            + [ProcessCall("divide", {"x": 1, "y": 0}, throws=True)]
+        )
+        assert [runner.execute("add", {"x": i, "y": 1}) for i in range(7)] == [
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            7,
+        ]
+        with pytest.raises(ValueError, match="Division by zero"):
+            runner.execute("divide", {"x": 1, "y": 0})
+        assert connection.execute.call_count == 8
+        assert 1 < max(max_active) <= 4
+
+    def test_concurrent_batches(self, connection):
+        runner = Http(connection, batch_size=3, concurrency=2)
+        runner.prefetch(
+            [ProcessCall("add", {"x": i, "y": 1}) for i in range(6)]
+            + [ProcessCall("divide", {"x": 1, "y": 0}, throws=True)]
+        )
+        assert [runner.execute("add", {"x": i, "y": 1}) for i in range(6)] == [
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+        ]
+        with pytest.raises(ValueError, match="Division by zero"):
+            runner.execute("divide", {"x": 1, "y": 0})
+        # Two batches and one single execution
+        assert connection.execute.call_count == 3
+
+    def test_connection_pool(self):
+        connection = mock.Mock()
+        connection.session = requests.Session()
+        Http(connection, concurrency=16)
+        adapter = connection.session.get_adapter("https://oeo.test")
+        assert adapter._pool_maxsize == 16
+
+    def test_close(self, connection):
+        runner = Http(connection, concurrency=2)
+        runner.prefetch([ProcessCall("add", {"x": i, "y": 1}) for i in range(2)])
+        assert runner.execute("add", {"x": 0, "y": 1}) == 1
+        executor = runner._executor
+        runner.close()
+        assert executor._shutdown
+        # Still usable without prefetching
+        runner.prefetch([ProcessCall("add", {"x": 5, "y": 1})])
+        assert runner.execute("add", {"x": 5, "y": 1}) == 6
@@ -0,0 +1,144 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.isolated import (
+    EncodedArgument,
+    IsolatedRunner,
+    parse_memory_size,
+)
+
+
+class DummyRunner(ProcessTestRunner):
+    def __init__(self, factor: int = 1):
+        self.factor = factor
+
+    def execute(self, id, arguments):
+        if id == "add":
+            return (arguments["x"] + arguments["y"]) * self.factor
+        elif id == "divide":
+            return arguments["x"] / arguments["y"]
+        elif id == "sleep":
+            time.sleep(arguments["seconds"])
+            return "woke up"
+        elif id == "allocate":
+            return len(np.ones(arguments["size"], dtype=np.uint8))
+        elif id == "crash":
+            os._exit(3)
+        elif id == "pid":
+            return os.getpid()
+        elif id == "apply":
+            return [arguments["process"](x) for x in arguments["data"]]
+        raise ValueError(id)
+
+    def encode_process_graph(
+        self, process, parent_process_id=None, parent_parameter=None
+    ):
+        factor = process["process_graph"]["m"]["arguments"]["y"]
+        # Note: not picklable
+        return lambda x: x * factor
+
+    def encode_datacube(self, data):
+        return np.asarray(data["data"])
+
+
+@pytest.fixture(scope="module")
+def runner() -> IsolatedRunner:
+    return IsolatedRunner(
+        runner_class=DummyRunner,
+        runner_kwargs={"factor": 10},
+        workers=2,
+        timeout=2,
+        memory_limit=parse_memory_size("1GB"),
+    )
+
+
+@pytest.mark.parametrize(
+    ["size", "expected"],
+    [
+        ("1024", 1024),
+        ("1KB", 1024),
+        ("512MB", 512 * 1024**2),
+        ("2GB", 2 * 1024**3),
+        ("1.5GiB", int(1.5 * 1024**3)),
+        ("2g", 2 * 1024**3),
+    ],
+)
+def test_parse_memory_size(size, expected):
+    assert parse_memory_size(size) == expected
+
+
+def test_parse_memory_size_invalid():
+    with pytest.raises(ValueError):
+        parse_memory_size("lots")
+
+
+class TestIsolatedRunner:
+    def test_execute(self, runner):
+        assert runner.execute("add", {"x": 1, "y": 2}) == 30
+        assert runner.execute("pid", {}) != os.getpid()
+
+    def test_exception(self, runner):
+        with pytest.raises(ZeroDivisionError):
+            runner.execute("divide", {"x": 1, "y": 0})
+
+    def test_encode_in_worker(self, runner):
+        process = {
+            "process_graph": {
+                "m": {
+                    "process_id": "multiply",
+                    "arguments": {"x": {"from_parameter": "x"}, "y": 3},
+                    "result": True,
+                }
+            }
+        }
+        callback = runner.encode_process_graph(process, "apply", "process")
+        assert isinstance(callback, EncodedArgument)
+        arguments = {"data": runner.encode_data([1, 2]), "process": callback}
+        assert runner.execute("apply", arguments) == [3, 6]
+
+        cube = runner.encode_datacube({"type": "datacube", "data": [1, 2]})
+        result = runner.execute("add", {"x": runner.encode_data(cube), "y": 1})
+        assert result.tolist() == [20, 30]
+
+    def test_not_implemented_encoding(self, runner):
+        with pytest.raises(NotImplementedError):
+            runner.encode_labeled_array({"type": "labeled-array", "data": []})
+
+    def test_timeout(self, runner):
+        with pytest.raises(pytest.fail.Exception, match="Timeout"):
+            runner.execute("sleep", {"seconds": 10})
+        assert runner.execute("add", {"x": 1, "y": 2}) == 30
+
+    def test_memory_limit(self, runner):
+        with pytest.raises(pytest.fail.Exception, match="memory limit"):
+            runner.execute("allocate", {"size": 2 * 1024**3})
+        assert runner.execute("add", {"x": 1, "y": 2}) == 30
+
+    def test_crash(self, runner):
+        with pytest.raises(pytest.fail.Exception, match="died"):
+            runner.execute("crash", {})
+        assert runner.execute("add", {"x": 1, "y": 2}) == 30
+
+    def test_prefetch(self, runner):
+        assert runner.get_prefetch_size() == 2
+        calls = [
+            ProcessCall("sleep", {"seconds": 0.5}),
+            ProcessCall("add", {"x": 1, "y": 2}),
+        ]
+        runner.prefetch(calls)
+        assert len(runner._prefetched) == 2
+        assert runner.execute("add", {"x": 1, "y": 2}) == 30
+        assert runner.execute("sleep", {"seconds": 0.5}) == "woke up"
+        assert runner._prefetched == {}
+
+
+def test_max_tasks():
+    runner = IsolatedRunner(runner_class=DummyRunner, workers=1, max_tasks=2)
+    pids = [runner.execute("pid", {}) for _ in range(4)]
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+    assert pids[2] == pids[3]
@@ -0,0 +1,170 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from openeo_test_suite.lib.caching import PersistentCache
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.recording import (
+    RecordingRunner,
+    get_recording_runner,
+)
+
+
+@pytest.fixture
+def store(tmp_path) -> PersistentCache:
+    return PersistentCache(root=tmp_path)
+
+
+class TestRecordingRunner:
+    def test_record_and_replay(self, store, make_dummy_runner):
+        runner = make_dummy_runner()
+        recorder = RecordingRunner(runner=runner, store=store, mode="record")
+        assert recorder.execute("add", {"x": 1, "y": 2}) == 3
+        assert recorder.execute("add", {"x": 1, "y": 2}) == 3
+        assert runner.executed == ["add", "add"]
+
+        runner = make_dummy_runner()
+        replayer = RecordingRunner(runner=runner, store=store, mode="replay")
+        assert replayer.execute("add", {"x": 1, "y": 2}) == 3
+        assert runner.executed == []
+        with pytest.raises(pytest.skip.Exception, match="No recorded result"):
+            replayer.execute("add", {"x": 1, "y": 3})
+        assert runner.executed == []
+
+    def test_record_exception(self, store, make_dummy_runner):
+        recorder = RecordingRunner(
+            runner=make_dummy_runner(), store=store, mode="record"
+        )
+        with pytest.raises(ZeroDivisionError):
+            recorder.execute("divide", {"x": 1, "y": 0})
+
+        replayer = RecordingRunner(
+            runner=make_dummy_runner(), store=store, mode="replay"
+        )
+        with pytest.raises(Exception, match="Division by zero") as exc_info:
+            replayer.execute("divide", {"x": 1, "y": 0})
+        assert exc_info.value.__class__.__name__ == "ZeroDivisionError"
+
+    def test_record_none(self, store, make_dummy_runner):
+        runner = mock.Mock(spec=ProcessTestRunner)
+        runner.get_backend_id.return_value = "mock"
+        runner.execute.return_value = None
+        RecordingRunner(runner=runner, store=store, mode="record").execute("foo", {})
+        replayer = RecordingRunner(
+            runner=make_dummy_runner("mock"), store=store, mode="replay"
+        )
+        assert replayer.execute("foo", {}) is None
+
+    def test_update(self, store, make_dummy_runner):
+        runner = make_dummy_runner()
+        recorder = RecordingRunner(runner=runner, store=store, mode="record")
+        recorder.execute("add", {"x": 1, "y": 2})
+
+        runner = make_dummy_runner()
+        updater = RecordingRunner(runner=runner, store=store, mode="update")
+        assert updater.execute("add", {"x": 1, "y": 2}) == 3
+        assert updater.execute("add", {"x": 3, "y": 4}) == 7
+        assert updater.execute("add", {"x": 3, "y": 4}) == 7
+        assert runner.executed == ["add"]
+
+    def test_backend_version(self, store, make_dummy_runner):
+        runner = make_dummy_runner("dummy 1.0")
+        RecordingRunner(runner=runner, store=store, mode="record").execute(
+            "add", {"x": 1, "y": 2}
+        )
+        runner = make_dummy_runner("dummy 1.1")
+        updater = RecordingRunner(runner=runner, store=store, mode="update")
+        assert updater.execute("add", {"x": 1, "y": 2}) == 3
+        assert runner.executed == ["add"]
+
+    def test_array_arguments(self, store, make_dummy_runner):
+        recorder = RecordingRunner(
+            runner=make_dummy_runner(), store=store, mode="record"
+        )
+        cube = xr.DataArray(np.arange(6.0).reshape((2, 3)), dims=["x", "y"])
+        assert recorder.execute("sum", {"data": cube}) == 15
+        assert recorder.execute("sum", {"data": np.arange(4)}) == 6
+
+        runner = make_dummy_runner()
+        replayer = RecordingRunner(runner=runner, store=store, mode="update")
+        cube = xr.DataArray(np.arange(6.0).reshape((2, 3)), dims=["x", "y"])
+        assert replayer.execute("sum", {"data": cube}) == 15
+        assert replayer.execute("sum", {"data": np.arange(4)}) == 6
+        assert runner.executed == []
+        assert replayer.execute("sum", {"data": cube * 2}) == 30
+        assert runner.executed == ["sum"]
+
+    def test_encoded_process_graph(self, store, make_dummy_runner, multiply_by):
+        recorder = RecordingRunner(
+            runner=make_dummy_runner(), store=store, mode="record"
+        )
+        args = {
+            "data": [1, 2],
+            "process": recorder.encode_process_graph(multiply_by(2)),
+        }
+        assert recorder.execute("apply", args) == [2, 4]
+        args = {
+            "data": [1, 2],
+            "process": recorder.encode_process_graph(multiply_by(3)),
+        }
+        assert recorder.execute("apply", args) == [3, 6]
+
+        runner = make_dummy_runner()
+        replayer = RecordingRunner(runner=runner, store=store, mode="update")
+        args = {
+            "data": [1, 2],
+            "process": replayer.encode_process_graph(multiply_by(3)),
+        }
+        assert replayer.execute("apply", args) == [3, 6]
+        args = {
+            "data": [1, 2],
+            "process": replayer.encode_process_graph(multiply_by(2)),
+        }
+        assert replayer.execute("apply", args) == [2, 4]
+        assert runner.executed == []
+
+    def test_list_processes(self, store, make_dummy_runner):
+        recorder = RecordingRunner(
+            runner=make_dummy_runner(), store=store, mode="record"
+        )
+        assert recorder.list_processes() == [{"id": "add"}, {"id": "divide"}]
+        runner = mock.Mock(spec=ProcessTestRunner)
+        runner.get_backend_id.return_value = "dummy 1.0"
+        replayer = RecordingRunner(runner=runner, store=store, mode="replay")
+        assert replayer.list_processes() == [{"id": "add"}, {"id": "divide"}]
+        assert not runner.list_processes.called
+
+    def test_prefetch(self, store):
+        runner = mock.Mock(spec=ProcessTestRunner)
+        runner.get_backend_id.return_value = "mock"
+        runner.get_prefetch_size.return_value = 10
+        runner.execute.return_value = 3
+        RecordingRunner(runner=runner, store=store, mode="record").execute(
+            "add", {"x": 1, "y": 2}
+        )
+
+        calls = [
+            ProcessCall("add", {"x": 1, "y": 2}),
+            ProcessCall("add", {"x": 3, "y": 4}),
+        ]
+        replayer = RecordingRunner(runner=runner, store=store, mode="replay")
+        assert replayer.get_prefetch_size() == 0
+        replayer.prefetch(calls)
+        assert not runner.prefetch.called
+
+        updater = RecordingRunner(runner=runner, store=store, mode="update")
+        assert updater.get_prefetch_size() == 10
+        updater.prefetch(calls)
+        runner.prefetch.assert_called_once_with([calls[1]])
+
+
+def test_get_recording_runner(store, make_dummy_runner):
+    runner = make_dummy_runner()
+    assert get_recording_runner(runner, mode="off", store=None) is runner
+    assert isinstance(
+        get_recording_runner(runner, mode="replay", store=store), RecordingRunner
+    )
+    with pytest.raises(RuntimeError, match="requires a store"):
+        get_recording_runner(runner, mode="record", store=None)
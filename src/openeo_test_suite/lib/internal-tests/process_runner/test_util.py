@@ -1,13 +1,21 @@
 import datetime
+import pickle
 
 import dateutil.tz
 import numpy
 import pandas
 import pytest
+import xarray
 
 from openeo_test_suite.lib.process_runner.util import (
+    PicklableException,
+    call_key,
+    datacube_to_xarray,
     datetime_to_isostr,
+    datetimes_to_isostrs,
     isostr_to_datetime,
+    isostrs_to_datetime64,
+    xarray_to_datacube,
 )
 
 
@@ -61,3 +69,117 @@ def test_isostr_to_datetime_invalid():
 )
 def test_datetime_to_isostr(dt, expected):
     assert datetime_to_isostr(dt) == expected
+
+
+def test_datacube_to_xarray_numpy_data_no_copy():
+    data = numpy.arange(6).reshape(2, 3)
+    cube = {
+        "type": "datacube",
+        "order": ["t", "x"],
+        "dimensions": {
+            "t": {
+                "type": "temporal",
+                "values": ["2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z"],
+            },
+            "x": {"type": "spatial", "axis": "x", "values": [1, 2, 3]},
+        },
+        "data": data,
+    }
+    da = datacube_to_xarray(cube)
+    assert da.dims == ("t", "x")
+    assert numpy.shares_memory(da.values, data)
+
+
+def test_datacube_to_xarray_dataarray():
+    da = xarray.DataArray(numpy.zeros((2, 3)), dims=["y", "x"])
+    assert datacube_to_xarray(da) is da
+
+
+@pytest.mark.parametrize(
+    ["values", "expected"],
+    [
+        ([], []),
+        (["2020-01-02T03:04:05Z"], ["2020-01-02T03:04:05"]),
+        # Timezone is dropped, not converted
+        (
+            ["2020-01-02T03:04:05+01:00", "2020-01-02T03:04:05-0130"],
+            ["2020-01-02T03:04:05", "2020-01-02T03:04:05"],
+        ),
+        (["2020-01-02T03:04:05.123456"], ["2020-01-02T03:04:05.123456"]),
+        # Fallback parsing
+        (["2020-01-02T03:04:05.1234567Z"], ["2020-01-02T03:04:05.123456"]),
+        (["2020-01-02T24:00:00Z"], ["2020-01-03T00:00:00"]),
+    ],
+)
+def test_isostrs_to_datetime64(values, expected):
+    actual = isostrs_to_datetime64(values)
+    assert actual.dtype == numpy.dtype("datetime64[ns]")
+    assert actual.tolist() == numpy.array(expected, dtype="datetime64[ns]").tolist()
+
+
+@pytest.mark.parametrize(
+    "values",
+    [["2020-01-02"], ["2020-01-02T03:04:05Z", 3], ["2020-02-30T00:00:00Z"]],
+)
+def test_isostrs_to_datetime64_invalid(values):
+    with pytest.raises(Exception, match="Mixed datetime types"):
+        isostrs_to_datetime64(values)
+
+
+def test_isostrs_to_datetime64_cached_copy():
+    values = ["2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z"]
+    first = isostrs_to_datetime64(values)
+    first[0] = numpy.datetime64("1999-01-01")
+    assert isostrs_to_datetime64(values)[0] == numpy.datetime64("2020-01-01")
+
+
+def test_datetimes_to_isostrs():
+    values = numpy.array(
+        ["2020-01-02T03:04:05.7", "1960-05-05T12:00:00"], dtype="datetime64[ns]"
+    )
+    assert datetimes_to_isostrs(values) == [
+        "2020-01-02T03:04:05Z",
+        "1960-05-05T12:00:00Z",
+    ]
+    assert datetimes_to_isostrs(
+        [datetime.datetime(2020, 1, 2, 3, 4, 5), "2020-01-02T03:04:05Z"]
+    ) == ["2020-01-02T03:04:05", "2020-01-02T03:04:05Z"]
+
+
+def test_datacube_roundtrip_temporal():
+    cube = {
+        "type": "datacube",
+        "order": ["t"],
+        "dimensions": {
+            "t": {
+                "type": "temporal",
+                "values": ["2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z"],
+            },
+        },
+        "data": [1, 2],
+    }
+    assert xarray_to_datacube(datacube_to_xarray(cube)) == cube
+
+
+def test_call_key():
+    assert call_key("add", {"x": 1, "y": 2}) == call_key("add", {"y": 2, "x": 1})
+    assert call_key("add", {"x": 1, "y": 2}) != call_key("add", {"x": 1, "y": 3})
+    assert call_key("add", {"x": 1, "y": 2}) != call_key("sum", {"x": 1, "y": 2})
+    # Non-JSON arguments
+    assert call_key("sum", {"data": numpy.array([1, 2])}) == call_key(
+        "sum", {"data": numpy.array([1, 2])}
+    )
+    assert call_key("sum", {"data": numpy.array([1, 2])}) != call_key(
+        "sum", {"data": numpy.array([1, 3])}
+    )
+
+
+def test_picklable_exception():
+    class CustomError(Exception):
+        pass
+
+    exception = pickle.loads(
+        pickle.dumps(PicklableException(CustomError("Oops")))
+    ).to_exception()
+    assert type(exception).__name__ == "CustomError"
+    assert str(exception) == "Oops"
@@ -0,0 +1,201 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from openeo_test_suite.lib.backend_metadata import BackendMetadataStore
+
+
+class FakeSession:
+    """Minimal stand-in for `requests.Session` serving versioned JSON documents."""
+
+    def __init__(self, documents: dict):
+        self.documents = documents
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        resp = mock.Mock(spec=requests.Response)
+        if url not in self.documents:
+            resp.status_code = 404
+            resp.raise_for_status.side_effect = requests.HTTPError("404")
+            return resp
+        version, data = self.documents[url]
+        etag = f'"v{version}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            resp.status_code = 304
+        else:
+            resp.status_code = 200
+            resp.json.return_value = data
+        resp.headers = {"ETag": etag}
+        return resp
+
+
+ROOT_URL = "https://oeo.test/openeo/1.2/"
+
+
+@pytest.fixture
+def session() -> FakeSession:
+    return FakeSession(
+        {
+            f"{ROOT_URL}processes": (1, {"processes": [{"id": "add"}]}),
+            f"{ROOT_URL}file_formats": (1, {"output": {"GTiff": {}}}),
+            "https://oeo.test/.well-known/openeo": (1, {"versions": []}),
+        }
+    )
+
+
+class TestBackendMetadataStore:
+    def test_get(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+        assert store.get("well_known") == {"versions": []}
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+        assert [url for url, _ in session.requests] == [
+            f"{ROOT_URL}processes",
+            "https://oeo.test/.well-known/openeo",
+        ]
+
+        assert {p.name for p in (tmp_path / "meta").iterdir()} == {
+            "processes.json",
+            "well_known.json",
+        }
+        stored = json.loads((tmp_path / "meta" / "processes.json").read_text())
+        assert stored["root_url"] == ROOT_URL
+        assert stored["document"]["data"] == {"processes": [{"id": "add"}]}
+
+    def test_persistence_within_ttl(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        store.get("processes")
+        assert len(session.requests) == 1
+
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+        assert len(session.requests) == 1
+
+    def test_revalidation_not_modified(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, ttl=0, session=session
+        )
+        store.get("processes")
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, ttl=0, session=session
+        )
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+        assert session.requests == [
+            (f"{ROOT_URL}processes", {}),
+            (f"{ROOT_URL}processes", {"If-None-Match": '"v1"'}),
+        ]
+
+    def test_revalidation_modified(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, ttl=0, session=session
+        )
+        store.get("processes")
+        session.documents[f"{ROOT_URL}processes"] = (2, {"processes": []})
+        assert store.get("processes") == {"processes": []}
+
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, ttl=0, session=session
+        )
+        assert store.get("processes") == {"processes": []}
+        assert session.requests[-1] == (
+            f"{ROOT_URL}processes",
+            {"If-None-Match": '"v2"'},
+        )
+
+    def test_revalidation_failure_uses_stored(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, ttl=0, session=session
+        )
+        store.get("processes")
+        del session.documents[f"{ROOT_URL}processes"]
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+
+    def test_failure(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        with pytest.raises(requests.HTTPError):
+            store.get("collections")
+        assert not (tmp_path / "meta" / "collections.json").exists()
+
+    def test_different_root_url(self, tmp_path, session):
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        store.get("processes")
+        store = BackendMetadataStore(
+            path=tmp_path / "meta",
+            root_url="https://oeo.test/openeo/1.1/",
+            session=session,
+        )
+        with pytest.raises(requests.HTTPError):
+            store.get("processes")
+
+    def test_concurrent_stores(self, tmp_path, session):
+        # E.g. different pytest-xdist workers
+        store1 = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        store2 = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        store1.get("processes")
+        store2.get("file_formats")
+        assert len(session.requests) == 2
+
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        assert store.get("processes") == {"processes": [{"id": "add"}]}
+        assert store.get("file_formats") == {"output": {"GTiff": {}}}
+        assert len(session.requests) == 2
+
+    def test_pagination(self, tmp_path, session):
+        session.documents.update(
+            {
+                f"{ROOT_URL}collections": (
+                    1,
+                    {
+                        "collections": [{"id": "S1"}],
+                        "links": [
+                            {"rel": "self", "href": f"{ROOT_URL}collections"},
+                            {"rel": "next", "href": "collections?page=2"},
+                        ],
+                    },
+                ),
+                f"{ROOT_URL}collections?page=2": (
+                    1,
+                    {
+                        "collections": [{"id": "S2"}],
+                        "links": [
+                            {"rel": "next", "href": f"{ROOT_URL}collections?page=3"}
+                        ],
+                    },
+                ),
+                f"{ROOT_URL}collections?page=3": (1, {"collections": [{"id": "S3"}]}),
+            }
+        )
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        expected = {
+            "collections": [{"id": "S1"}, {"id": "S2"}, {"id": "S3"}],
+            "links": [{"rel": "self", "href": f"{ROOT_URL}collections"}],
+        }
+        assert store.get("collections") == expected
+        assert len(session.requests) == 3
+
+        store = BackendMetadataStore(
+            path=tmp_path / "meta", root_url=ROOT_URL, session=session
+        )
+        assert store.get("collections") == expected
+        assert len(session.requests) == 3
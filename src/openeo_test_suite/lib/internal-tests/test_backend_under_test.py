@@ -3,9 +3,11 @@ from unittest import mock
 import pytest
 
 from openeo_test_suite.lib.backend_under_test import (
+    HttpBackend,
     NoBackend,
     get_backend_under_test,
     get_backend_url,
+    get_capability_snapshot,
     get_collection_ids,
     get_process_ids,
 )
@@ -41,3 +43,21 @@ def test_get_collection_ids():
 
 def test_get_process_ids():
     assert get_process_ids() == []
+
+
+def test_get_capability_snapshot():
+    assert get_capability_snapshot() is None
+
+
+def test_http_backend_metadata_store():
+    metadata_store = mock.Mock()
+    metadata_store.get.side_effect = lambda name: {
+        "processes": {"processes": [{"id": "add"}, {"id": "mean"}]},
+        "collections": {"collections": [{"id": "S2"}]},
+        "file_formats": {"output": {"GTiff": {}, "netCDF": {}}},
+    }[name]
+    backend = HttpBackend(connection=mock.Mock(), metadata_store=metadata_store)
+    assert backend.list_process_ids() == ["add", "mean"]
+    assert backend.list_collection_ids() == ["S2"]
+    assert backend.list_output_formats() == ["gtiff", "netcdf"]
+    assert not backend.connection.get.called
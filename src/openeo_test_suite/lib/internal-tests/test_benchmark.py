@@ -0,0 +1,85 @@
+import pytest
+
+from openeo_test_suite.lib.benchmark import BenchmarkResults, load_baseline
+
+
+@pytest.fixture
+def results() -> BenchmarkResults:
+    results = BenchmarkResults()
+    results.add("add", "L1", [0.001, 0.002, 0.003])
+    results.add("add", "L1", [0.004])
+    results.add("sum", "L2", [0.010, 0.010])
+    return results
+
+
+def test_get_stats(results):
+    stats = results.get_stats()
+    assert set(stats) == {"add/L1", "sum/L2"}
+    assert stats["add/L1"]["count"] == 4
+    assert stats["add/L1"]["min"] == pytest.approx(0.001)
+    assert stats["add/L1"]["median"] == pytest.approx(0.0025)
+    assert stats["add/L1"]["p95"] == pytest.approx(0.00385)
+    assert stats["sum/L2"] == {"count": 2, "min": 0.01, "median": 0.01, "p95": 0.01}
+
+
+def test_save_and_load_baseline(results, tmp_path):
+    path = tmp_path / "benchmarks" / "baseline.json"
+    results.save(path)
+    assert load_baseline(path) == results.get_stats()
+
+
+def test_get_regressions(results):
+    baseline = {
+        "add/L1": {"median": 0.002},
+        "sum/L2": {"median": 0.009},
+        "divide/L1": {"median": 0.001},
+    }
+    assert results.get_regressions(baseline, threshold=0.2) == [
+        "add/L1: median 2.50ms vs baseline 2.00ms (+25%)"
+    ]
+    assert results.get_regressions(baseline, threshold=0.1) == [
+        "add/L1: median 2.50ms vs baseline 2.00ms (+25%)",
+        "sum/L2: median 10.00ms vs baseline 9.00ms (+11%)",
+    ]
+    assert results.get_regressions(baseline, threshold=0.5) == []
+
+
+def test_get_summary(results):
+    assert results.get_summary() == [
+        "add/L1: min 1.00ms, median 2.50ms, p95 3.85ms (4 runs)",
+        "sum/L2: min 10.00ms, median 10.00ms, p95 10.00ms (2 runs)",
+    ]
+    summary = results.get_summary(baseline={"add/L1": {"median": 0.002}})
+    assert summary == [
+        "add/L1: min 1.00ms, median 2.50ms, p95 3.85ms (4 runs), baseline median 2.00ms",
+        "sum/L2: min 10.00ms, median 10.00ms, p95 10.00ms (2 runs)",
+        "Latency regressions (median more than 20% above baseline):",
+        "  add/L1: median 2.50ms vs baseline 2.00ms (+25%)",
+    ]
+
+
+def _report(user_properties) -> pytest.TestReport:
+    return pytest.TestReport(
+        nodeid="test_foo",
+        location=("test_foo.py", 0, "test_foo"),
+        keywords={},
+        outcome="passed",
+        longrepr=None,
+        when="call",
+        user_properties=user_properties,
+    )
+
+
+def test_add_report():
+    results = BenchmarkResults()
+    results.add_report(
+        _report(
+            [
+                ("process_id", "add"),
+                ("benchmark_level", "L1"),
+                ("benchmark_latencies", [0.001, 0.003]),
+            ]
+        )
+    )
+    results.add_report(_report([("process_id", "sum")]))
+    assert results.latencies == {"add/L1": [0.001, 0.003]}
@@ -0,0 +1,85 @@
+import pytest
+
+from openeo_test_suite.lib.caching import LruCache, PersistentCache
+
+
+class TestPersistentCache:
+    def test_make_key(self):
+        key = PersistentCache.make_key("foo", b"bar")
+        assert isinstance(key, str)
+        assert key == PersistentCache.make_key(b"foo", "bar")
+        assert key != PersistentCache.make_key("foob", "ar")
+        assert key != PersistentCache.make_key("foo", "bar", "")
+
+    def test_get_set(self, tmp_path):
+        cache = PersistentCache(root=tmp_path, namespace="test")
+        key = cache.make_key("foo")
+        assert cache.get(key) is None
+        assert cache.get(key, default=123) == 123
+
+        cache.set(key, {"foo": [1, 2, 3]})
+        assert cache.get(key) == {"foo": [1, 2, 3]}
+
+    def test_shared_root(self, tmp_path):
+        key = PersistentCache.make_key("foo")
+        PersistentCache(root=tmp_path, namespace="test").set(key, "bar")
+
+        assert PersistentCache(root=tmp_path, namespace="test").get(key) == "bar"
+        assert PersistentCache(root=tmp_path, namespace="other").get(key) is None
+
+    def test_corrupt_entry(self, tmp_path, caplog):
+        cache = PersistentCache(root=tmp_path, namespace="test")
+        key = cache.make_key("foo")
+        cache.set(key, "bar")
+        (path,) = cache.root.glob("**/*.pickle")
+        path.write_bytes(b"n0t a p1ckle")
+
+        assert cache.get(key) is None
+        assert "Failed to read cache entry" in caplog.text
+
+
+class TestLruCache:
+    def test_get_set(self):
+        cache = LruCache(max_size=10)
+        assert cache.get("a") is None
+        assert cache.get("a", default=0) == 0
+        assert cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_eviction(self):
+        cache = LruCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_eviction_by_size(self):
+        cache = LruCache(max_size=10, get_size=len)
+        cache.set("a", "x" * 4)
+        cache.set("b", "x" * 4)
+        cache.set("a", "x" * 5)
+        assert len(cache) == 2
+        # Replacing "a" made it the most recently used entry
+        cache.set("c", "x" * 2)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        # Too large on its own
+        assert not cache.set("d", "x" * 11)
+        assert "d" not in cache
+        assert len(cache) == 2
+
+    def test_clear(self):
+        cache = LruCache(max_size=2)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
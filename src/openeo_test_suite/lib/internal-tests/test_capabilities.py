@@ -0,0 +1,216 @@
+import threading
+import time
+from unittest import mock
+
+import openeo
+import pytest
+
+from openeo_test_suite.lib.capabilities import (
+    CapabilityCache,
+    CapabilitySnapshot,
+    TestRequirements,
+    get_capability_source,
+    get_test_requirements,
+    is_output_format_supported,
+)
+from openeo_test_suite.lib.process_registry import ProcessData
+
+
+class TestCapabilityCache:
+    def test_get(self):
+        cache = CapabilityCache()
+        fetch = mock.Mock(return_value=frozenset(["add", "mean"]))
+        assert cache.get("https://oeo.test", "process_ids", fetch) == {"add", "mean"}
+        assert cache.get("https://oeo.test", "process_ids", fetch) == {"add", "mean"}
+        assert fetch.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+    def test_get_different_keys(self):
+        cache = CapabilityCache()
+        assert cache.get("https://oeo.test", "process_ids", lambda: 1) == 1
+        assert cache.get("https://oeo.test", "output_formats", lambda: 2) == 2
+        assert cache.get("https://oeo2.test", "process_ids", lambda: 3) == 3
+        assert (cache.hits, cache.misses) == (0, 3)
+
+    def test_failure_not_cached(self):
+        cache = CapabilityCache()
+        fetch = mock.Mock(side_effect=[RuntimeError("nope"), 123])
+        with pytest.raises(RuntimeError):
+            cache.get("https://oeo.test", "process_ids", fetch)
+        assert cache.get("https://oeo.test", "process_ids", fetch) == 123
+        assert fetch.call_count == 2
+
+    def test_invalidate(self):
+        cache = CapabilityCache()
+        cache.get("https://oeo.test", "process_ids", lambda: 1)
+        cache.get("https://oeo.test", "output_formats", lambda: 2)
+        cache.get("https://oeo2.test", "process_ids", lambda: 3)
+
+        cache.invalidate(source="https://oeo.test", capability="process_ids")
+        assert cache.get("https://oeo.test", "process_ids", lambda: 11) == 11
+        assert cache.get("https://oeo.test", "output_formats", lambda: 22) == 2
+
+        cache.invalidate(capability="process_ids")
+        assert cache.get("https://oeo2.test", "process_ids", lambda: 33) == 33
+
+        cache.invalidate()
+        assert cache.get("https://oeo.test", "output_formats", lambda: 222) == 222
+
+    def test_single_flight(self):
+        cache = CapabilityCache()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return frozenset(["add"])
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get("oeo", "process_ids", fetch))
+            )
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [frozenset(["add"])] * 5
+        assert (cache.hits, cache.misses) == (4, 1)
+
+
+def test_get_capability_source():
+    connection = mock.Mock(spec=["root_url", "auth"], root_url="https://oeo.test/")
+    connection.auth = None
+    assert get_capability_source(connection) == "https://oeo.test/ (auth: None)"
+
+    runner = mock.Mock(spec=["connection"], connection=connection)
+    assert get_capability_source(runner) == "https://oeo.test/ (auth: None)"
+
+    connection.auth = openeo.rest.auth.auth.BearerAuth("t0k3n")
+    assert get_capability_source(connection) == "https://oeo.test/ (auth: BearerAuth)"
+
+    class DummyRunner:
+        pass
+
+    assert get_capability_source(DummyRunner()) == "DummyRunner"
+
+
+@pytest.mark.parametrize(
+    ["output_format", "output_formats", "expected"],
+    [
+        ("netcdf", {"netcdf", "gtiff"}, True),
+        ("netCDF", {"nc"}, True),
+        ("geotiff", {"gtiff"}, True),
+        ("geotiff", {"netcdf"}, False),
+        ("png", {"png"}, True),
+        ("png", set(), False),
+    ],
+)
+def test_is_output_format_supported(output_format, output_formats, expected):
+    assert is_output_format_supported(output_format, output_formats) == expected
+
+
+class TestCapabilitySnapshot:
+    @pytest.fixture
+    def snapshot(self) -> CapabilitySnapshot:
+        return CapabilitySnapshot(
+            process_ids=frozenset(["add", "load_collection", "save_result"]),
+            output_formats=frozenset(["gtiff"]),
+            collection_ids=frozenset(["S2"]),
+        )
+
+    def test_all_met(self, snapshot):
+        requirements = TestRequirements(
+            processes={"add", "load_collection"},
+            output_formats={"geotiff"},
+            collections={"S2"},
+        )
+        assert snapshot.get_unmet_requirements(requirements) == []
+
+    def test_no_requirements(self, snapshot):
+        assert snapshot.get_unmet_requirements(TestRequirements()) == []
+
+    def test_unmet(self, snapshot):
+        requirements = TestRequirements(
+            processes={"add", "apply_kernel"},
+            output_formats={"netcdf", "geotiff"},
+            collections={"S2", "S1"},
+        )
+        assert snapshot.get_unmet_requirements(requirements) == [
+            "Backend does not support: {'apply_kernel'}",
+            "netcdf not supported as output file format",
+            "Backend does not provide collections: {'S1'}",
+        ]
+
+
+class TestGetTestRequirements:
+    def _item(self, markers=(), params=None, fixturenames=(), options=None):
+        options = {"--runner": "skip", "--s2-collection": None, **(options or {})}
+        item = mock.Mock(spec=["iter_markers", "callspec", "fixturenames", "config"])
+        item.iter_markers.side_effect = lambda name: [
+            m.mark for m in markers if m.mark.name == name
+        ]
+        item.callspec.params = params or {}
+        item.fixturenames = list(fixturenames)
+        item.config.getoption.side_effect = options.get
+        return item
+
+    def test_markers(self):
+        item = self._item(
+            markers=[
+                pytest.mark.required_processes("add", "mean"),
+                pytest.mark.required_output_format("netcdf"),
+            ]
+        )
+        assert get_test_requirements(item) == TestRequirements(
+            processes={"add", "mean"}, output_formats={"netcdf"}
+        )
+
+    def test_process_metadata(self):
+        process = ProcessData(
+            process_id="add", spec={}, level="L1", experimental=False, path=None
+        )
+        item = self._item(params={"expected_process": process})
+        assert get_test_requirements(item) == TestRequirements(processes={"add"})
+
+    @pytest.mark.parametrize(
+        ["runner", "expected"],
+        [
+            ("http", {"apply", "absolute"}),
+            ("dask", set()),
+            ("skip", set()),
+        ],
+    )
+    def test_process_example(self, runner, expected):
+        item = self._item(
+            params={"process_id": "apply", "example": {"required": ["absolute"]}},
+            options={"--runner": runner},
+        )
+        assert get_test_requirements(item) == TestRequirements(processes=expected)
+
+    def test_s2_collection_id(self):
+        item = self._item(
+            fixturenames=["skipper", "s2_collection"],
+            options={"--s2-collection": "SENTINEL2_L2A"},
+        )
+        assert get_test_requirements(item) == TestRequirements(
+            processes={"load_collection", "save_result"}, collections={"SENTINEL2_L2A"}
+        )
+
+    def test_s2_collection_stac(self):
+        item = self._item(
+            fixturenames=["s2_collection"],
+            options={"--s2-collection": "https://stac.test/collections/s2"},
+        )
+        assert get_test_requirements(item) == TestRequirements(
+            processes={"load_stac", "save_result"}
+        )
+
+    def test_s2_collection_unset(self):
+        item = self._item(fixturenames=["s2_collection"])
+        assert get_test_requirements(item) == TestRequirements()
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.comparison import compare_arrays, compare_datacubes
+
+
+class TestCompareArrays:
+    @pytest.mark.parametrize(
+        ["expected", "actual"],
+        [
+            ([1, 2, 3], [1, 2, 3]),
+            ([1, 2, 3], [1.0, 2.0, 3.0]),
+            ([1, 2, 3], np.array([1, 2, 3])),
+            (np.array([1.5, 2.5]), [1.5, 2.5]),
+            ([1.0, math.nan], [1.0, math.nan]),
+            ([1.0, math.inf], [1.0, math.inf]),
+            ([[1, 2], [3, 4]], [[1, 2], [3, 4 + 1e-12]]),
+            ([True, False], [True, False]),
+            (["a", "b"], ["a", "b"]),
+            ([], []),
+            # Non-vectorizable: fallback
+            ([1, None, 3], [1, None, 3]),
+            ([[1, 2], [3]], [[1, 2], [3]]),
+        ],
+    )
+    def test_equal(self, expected, actual):
+        assert compare_arrays(expected, actual, delta=1e-10) == []
+
+    def test_delta(self):
+        assert compare_arrays([1.0, 2.0], [1.05, 2.0], delta=0.1) == []
+        assert compare_arrays([1.0, 2.0], [1.05, 2.0], delta=0.01) == [
+            "1 of 2 values differ",
+            "at [0:2]: {'values_changed': {'root[0]': {'new_value': 1.05, 'old_value': 1.0}}}",
+        ]
+
+    def test_nan_mismatch(self):
+        differences = compare_arrays([1.0, math.nan], [1.0, 2.0], delta=1e-10)
+        assert differences[0] == "1 of 2 values differ"
+
+    def test_shape_mismatch(self):
+        assert compare_arrays([1, 2, 3], [1, 2], delta=1e-10) == [
+            "Shape mismatch: expected (3,) but got (2,)"
+        ]
+
+    def test_type_mismatch_fallback(self):
+        differences = compare_arrays([1, None], [1, 2], delta=1e-10)
+        assert len(differences) == 1
+        assert differences[0].startswith("Differences: ")
+
+    def test_summary_large(self):
+        expected = np.zeros((100, 1000))
+        actual = expected.copy()
+        actual[3, 5] = 1
+        actual[3, 7] = 2
+        actual[50:, 100:] = 3
+        differences = compare_arrays(expected, actual, delta=1e-10)
+        assert differences[0] == "45002 of 100000 values differ"
+        # Mismatching slices of size 10 along last axis, 3:5 and 3:7 in same slice
+        assert differences[1].startswith("at [3, 0:10]: {'values_changed': {")
+        assert "'root[5]'" in differences[1]
+        assert "'root[7]'" in differences[1]
+        assert differences[2].startswith("at [50, 100:110]: ")
+        # Limited number of reported slices
+        assert len(differences) == 12
+        assert differences[-1] == "..."
+
+    def test_scalar_array(self):
+        assert compare_arrays(np.array(1.0), np.array(1.0), delta=1e-10) == []
+        assert compare_arrays(np.array(1.0), np.array(2.0), delta=1e-10) == [
+            "1 of 1 values differ",
+            "at []: {'values_changed': {'root': {'new_value': 2.0, 'old_value': 1.0}}}",
+        ]
+
+
+class TestCompareDatacubes:
+    @pytest.fixture
+    def cube(self) -> dict:
+        return {
+            "type": "datacube",
+            "order": ["x", "y"],
+            "dimensions": {
+                "x": {"type": "spatial", "axis": "x", "values": [1, 2]},
+                "y": {"type": "spatial", "axis": "y", "values": [3, 4, 5]},
+            },
+            "data": [[1, 2, 3], [4, 5, 6]],
+        }
+
+    def test_equal(self, cube):
+        actual = {**cube, "data": np.array(cube["data"], dtype=float)}
+        assert compare_datacubes(cube, actual, delta=1e-10) == []
+
+    def test_data_mismatch(self, cube):
+        actual = {**cube, "data": [[1, 2, 3], [4, 5, 7]]}
+        assert compare_datacubes(cube, actual, delta=1e-10) == [
+            "Data: 1 of 6 values differ",
+            "Data: at [1, 0:3]: {'values_changed': {'root[2]': {'new_value': 7, 'old_value': 6}}}",
+        ]
+
+    def test_label_mismatch(self, cube):
+        actual = {
+            **cube,
+            "dimensions": {
+                **cube["dimensions"],
+                "x": {"type": "spatial", "axis": "x", "values": [1, 3]},
+            },
+        }
+        differences = compare_datacubes(cube, actual, delta=1e-10)
+        assert len(differences) == 1
+        assert "root['dimensions']['x']['values'][1]" in differences[0]
+
+    def test_excluded_paths(self, cube):
+        expected = {**cube, "data": None, "nodata": [math.nan]}
+        actual = {
+            **cube,
+            "dimensions": {
+                **cube["dimensions"],
+                "x": {**cube["dimensions"]["x"], "reference_system": 32632},
+            },
+            "data": [[0, 0, 0], [0, 0, 0]],
+        }
+        assert (
+            compare_datacubes(
+                expected,
+                actual,
+                delta=1e-10,
+                exclude_paths=["root['nodata']", "root['data']"],
+                exclude_regex_paths=[
+                    r"root\['dimensions'\]\[[^\]]+\]\['reference_system'\]"
+                ],
+            )
+            == []
+        )
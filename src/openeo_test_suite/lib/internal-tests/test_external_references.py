@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from openeo_test_suite.lib.external_references import ExternalReferenceLoader
+
+
+@pytest.fixture
+def tests_root(tmp_path):
+    (tmp_path / "add.json5").write_text("{}")
+    (tmp_path / "polygon.geojson").write_text(
+        json.dumps(
+            {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
+        )
+    )
+    (tmp_path / "cube.json5").write_text("{type: 'datacube', data: [1, 2, NaN,]}")
+    (tmp_path / "crs.wkt2").write_text('GEOGCRS["WGS 84"]')
+    return tmp_path
+
+
+class TestExternalReferenceLoader:
+    def test_load_json(self, tests_root):
+        loader = ExternalReferenceLoader()
+        data = loader.load("polygon.geojson", file=tests_root / "add.json5")
+        assert data["type"] == "Polygon"
+        assert data["coordinates"][0][1] == [1, 0]
+
+    def test_load_json5(self, tests_root):
+        loader = ExternalReferenceLoader()
+        data = loader.load("cube.json5", file=tests_root / "add.json5")
+        assert data["type"] == "datacube"
+        assert data["data"][:2] == [1, 2]
+
+    def test_load_text(self, tests_root):
+        loader = ExternalReferenceLoader()
+        data = loader.load("crs.wkt2", file=tests_root / "add.json5")
+        assert data == 'GEOGCRS["WGS 84"]'
+
+    def test_unhandled(self, tests_root):
+        loader = ExternalReferenceLoader()
+        with pytest.raises(
+            RuntimeError, match="Failed to load external reference data.xyz"
+        ):
+            loader.load("data.xyz", file=tests_root / "add.json5")
+
+    def test_memoization(self, tests_root):
+        loader = ExternalReferenceLoader()
+        data1 = loader.load("polygon.geojson", file=tests_root / "add.json5")
+        (tests_root / "polygon.geojson").write_text("{}")
+        data2 = loader.load("./polygon.geojson", file=tests_root / "add.json5")
+        assert data2 == data1
+        assert (loader.hits, loader.misses) == (1, 1)
+
+    def test_copy_on_load(self, tests_root):
+        loader = ExternalReferenceLoader()
+        data1 = loader.load("polygon.geojson", file=tests_root / "add.json5")
+        data1["type"] = "Point"
+        data1["coordinates"][0].clear()
+        data2 = loader.load("polygon.geojson", file=tests_root / "add.json5")
+        assert data2["type"] == "Polygon"
+        assert len(data2["coordinates"][0]) == 4
+
+    def test_eviction(self, tests_root):
+        (tests_root / "small.json").write_text("[1, 2, 3]")
+        loader = ExternalReferenceLoader(max_size=60)
+        loader.load("small.json", file=tests_root / "add.json5")
+        loader.load("crs.wkt2", file=tests_root / "add.json5")
+        loader.load("small.json", file=tests_root / "add.json5")
+        assert (loader.hits, loader.misses) == (1, 2)
+
+        # Too large to memoize
+        loader.load("polygon.geojson", file=tests_root / "add.json5")
+        loader.load("polygon.geojson", file=tests_root / "add.json5")
+        assert (loader.hits, loader.misses) == (1, 4)
+
+        (tests_root / "other.json").write_text("[" + ", ".join(["123"] * 20) + "]")
+        loader.load("other.json", file=tests_root / "add.json5")
+        loader.load("small.json", file=tests_root / "add.json5")
+        assert (loader.hits, loader.misses) == (1, 6)
+
+    def test_load_npy(self, tests_root):
+        np.save(tests_root / "data.npy", np.arange(12, dtype="float32").reshape(3, 4))
+        loader = ExternalReferenceLoader()
+        data = loader.load("data.npy", file=tests_root / "add.json5")
+        assert isinstance(data, np.memmap)
+        assert data.dtype == np.float32
+        assert data.shape == (3, 4)
+        assert data[2, 3] == 11
+
+        # Copy-on-write: changes only affect the loaded array
+        data[2, 3] = 666
+        assert loader.load("data.npy", file=tests_root / "add.json5")[2, 3] == 11
+        assert np.load(tests_root / "data.npy")[2, 3] == 11
+
+    def test_load_netcdf(self, tests_root):
+        xr.DataArray(
+            np.arange(6).reshape(2, 3),
+            dims=["y", "x"],
+            coords={"y": [10, 20], "x": [1, 2, 3]},
+            name="cube",
+        ).to_netcdf(tests_root / "cube.nc")
+        loader = ExternalReferenceLoader()
+        data = loader.load("cube.nc", file=tests_root / "add.json5")
+        assert isinstance(data, xr.DataArray)
+        assert data.dims == ("y", "x")
+        assert data.sel(x=3, y=20).item() == 5
+
+        data.attrs["foo"] = "bar"
+        data2 = loader.load("cube.nc", file=tests_root / "add.json5")
+        assert "foo" not in data2.attrs
+        assert (loader.hits, loader.misses) == (1, 1)
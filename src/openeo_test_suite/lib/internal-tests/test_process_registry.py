@@ -1,6 +1,14 @@
+import json
+import pickle
+import shutil
+import textwrap
+from pathlib import Path
+from unittest import mock
+
 import pytest
 
-from openeo_test_suite.lib.process_registry import ProcessRegistry
+from openeo_test_suite.lib.caching import PersistentCache
+from openeo_test_suite.lib.process_registry import ProcessRegistry, _scan_json5_level
 
 
 class TestProcessRegistry:
@@ -182,3 +190,343 @@ class TestProcessRegistry:
                 assert pid in pids
             else:
                 assert pid not in pids
+
+
+@pytest.fixture
+def processes_root(tmp_path) -> Path:
+    """Minimal openeo-processes style root folder with process specs and JSON5 tests."""
+    root = tmp_path / "processes"
+    (root / "tests").mkdir(parents=True)
+    (root / "proposals").mkdir()
+    for pid, folder, experimental in [
+        ("add", root, False),
+        ("divide", root, False),
+        ("foo", root / "proposals", True),
+    ]:
+        spec = {"id": pid, "categories": ["math"], "parameters": []}
+        if experimental:
+            spec["experimental"] = True
+        (folder / f"{pid}.json").write_text(json.dumps(spec))
+    (root / "tests" / "add.json5").write_text(
+        textwrap.dedent(
+            """
+            {
+                id: "add",
+                level: "L1",
+                tests: [
+                    // JSON5 comment
+                    {arguments: {x: 0, y: 0}, returns: 0},
+                    {arguments: {x: NaN, y: 1}, returns: NaN,},
+                ],
+            }
+            """
+        )
+    )
+    (root / "tests" / "divide.json5").write_text(
+        '{id: "divide", level: "L1", tests: [{arguments: {x: 1, y: 0}, throws: true}]}'
+    )
+    return root
+
+
+class TestProcessRegistryIndexing:
+    def test_get_process(self, processes_root):
+        registry = ProcessRegistry(root=processes_root)
+        assert registry.get_process("add").process_id == "add"
+        assert registry.get_process("foo").experimental is True
+        with pytest.raises(LookupError, match="Process not found: 'bar'"):
+            registry.get_process("bar")
+
+    @pytest.mark.parametrize(
+        ["process_ids", "process_levels", "experimental", "expected"],
+        [
+            (None, None, False, {"add", "divide"}),
+            (None, None, True, {"add", "divide", "foo"}),
+            (["add"], None, False, {"add"}),
+            (["add", "add", "bar"], None, False, {"add"}),
+            (["foo"], None, False, {"foo"}),
+            (None, ["L1"], False, {"add", "divide"}),
+            (None, ["L4"], False, set()),
+            (None, ["L4"], True, {"foo"}),
+            (["add"], ["L4"], False, {"add"}),
+            (["foo"], ["L1"], False, {"add", "divide", "foo"}),
+        ],
+    )
+    def test_get_processes_filtered(
+        self, processes_root, process_ids, process_levels, experimental, expected
+    ):
+        registry = ProcessRegistry(root=processes_root)
+        processes = list(
+            registry.get_processes_filtered(
+                process_ids=process_ids,
+                process_levels=process_levels,
+                experimental=experimental,
+            )
+        )
+        assert {p.process_id for p in processes} == expected
+        # Original load order should be preserved
+        all_pids = [p.process_id for p in registry.get_all_processes()]
+        assert [p.process_id for p in processes] == [
+            pid for pid in all_pids if pid in expected
+        ]
+
+    def test_get_processes_by_category(self, processes_root):
+        registry = ProcessRegistry(root=processes_root)
+        pids = {p.process_id for p in registry.get_processes_by_category("math")}
+        assert pids == {"add", "divide", "foo"}
+        assert list(registry.get_processes_by_category("cubes")) == []
+
+    def test_reuse_across_instances(self, processes_root):
+        registry1 = ProcessRegistry(root=processes_root)
+        add = registry1.get_process("add")
+
+        registry2 = ProcessRegistry(root=processes_root)
+        assert registry2.get_process("add") is add
+
+        registry3 = ProcessRegistry(root=processes_root, reuse=False)
+        assert registry3.get_process("add") is not add
+        assert registry3.get_process("add").process_id == "add"
+
+        # Processes loaded with tests are not shared with lazily loaded ones
+        registry4 = ProcessRegistry(root=processes_root, load_tests=True)
+        assert registry4.get_process("add") is not add
+        assert registry4.get_process("add").preloaded_tests is not None
+
+
+class TestProcessRegistryCaching:
+    def test_no_cache(self, processes_root):
+        registry = ProcessRegistry(root=processes_root)
+        add = registry.get_process("add")
+        assert add.level == "L1"
+        assert len(add.tests) == 2
+        assert registry.get_process("foo").level == "L4"
+
+    def test_cold_and_warm_cache(self, processes_root, tmp_path, caplog):
+        caplog.set_level("INFO")
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        cold = list(registry.get_all_processes())
+        assert "Loaded 0 process definitions from cache" in caplog.text
+
+        caplog.clear()
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        warm = list(registry.get_all_processes())
+        assert "Loaded 3 process definitions from cache" in caplog.text
+
+        def summary(processes):
+            return sorted(
+                (p.process_id, p.level, p.experimental, p.path, len(p.tests))
+                for p in processes
+            )
+
+        assert {p.process_id for p in warm} == {"add", "divide", "foo"}
+        assert summary(warm) == summary(cold)
+
+    def test_reparse_changed_only(self, processes_root, tmp_path, caplog):
+        caplog.set_level("INFO")
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        _ = list(
+            ProcessRegistry(
+                root=processes_root, cache=cache, reuse=False
+            ).get_all_processes()
+        )
+
+        (processes_root / "tests" / "divide.json5").write_text(
+            '{id: "divide", level: "L2", tests: []}'
+        )
+        caplog.clear()
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        assert registry.get_process("divide").level == "L2"
+        assert registry.get_process("divide").tests == []
+        assert registry.get_process("add").level == "L1"
+        assert "Loaded 2 process definitions from cache" in caplog.text
+
+    def test_cache_independent_of_location(self, processes_root, tmp_path, caplog):
+        caplog.set_level("INFO")
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        _ = list(
+            ProcessRegistry(
+                root=processes_root, cache=cache, reuse=False
+            ).get_all_processes()
+        )
+
+        moved = shutil.copytree(processes_root, tmp_path / "moved")
+        caplog.clear()
+        registry = ProcessRegistry(root=moved, cache=cache, reuse=False)
+        add = registry.get_process("add")
+        assert "Loaded 3 process definitions from cache" in caplog.text
+        assert add.path == moved / "add.json"
+        assert add.tests_path == moved / "tests" / "add.json5"
+        assert add.tests_cache is cache
+        assert len(add.tests) == 2
+
+    def test_tests_cache_not_pickled(self, processes_root, tmp_path):
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        add = registry.get_process("add")
+        assert add.tests_cache is cache
+        unpickled = pickle.loads(pickle.dumps(add))
+        assert unpickled.tests_cache is None
+        assert unpickled == add
+
+    def test_broken_definition_not_cached(self, processes_root, tmp_path, caplog):
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        (processes_root / "divide.json").write_text('{"id": "dividez"}')
+
+        for _ in range(2):
+            caplog.clear()
+            registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+            pids = {p.process_id for p in registry.get_all_processes()}
+            assert pids == {"add", "foo"}
+            assert "Process id mismatch" in caplog.text
+
+
+class TestProcessRegistryParallelLoading:
+    @pytest.fixture(autouse=True)
+    def low_threshold(self, monkeypatch):
+        monkeypatch.setattr(ProcessRegistry, "PARALLEL_LOADING_THRESHOLD", 2)
+
+    def test_parallel_same_as_serial(self, processes_root, caplog):
+        caplog.set_level("INFO")
+        serial = ProcessRegistry(root=processes_root, max_workers=1, reuse=False)
+        parallel = ProcessRegistry(root=processes_root, max_workers=2, reuse=False)
+
+        serial_pids = [p.process_id for p in serial.get_all_processes()]
+        assert "Parsing 3 process definitions" not in caplog.text
+        parallel_pids = [p.process_id for p in parallel.get_all_processes()]
+        assert "Parsing 3 process definitions with max_workers=2" in caplog.text
+
+        assert parallel_pids == serial_pids
+        assert (
+            parallel.get_process("divide").tests == serial.get_process("divide").tests
+        )
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_load_tests(self, processes_root, max_workers):
+        registry = ProcessRegistry(
+            root=processes_root, max_workers=max_workers, reuse=False, load_tests=True
+        )
+        add = registry.get_process("add")
+        assert add.level == "L1"
+        assert add.preloaded_tests is not None
+        with mock.patch("json5.loads", side_effect=RuntimeError) as json5_loads:
+            assert len(add.tests) == 2
+            assert len(registry.get_process("divide").tests) == 1
+            assert registry.get_process("foo").tests == []
+        json5_loads.assert_not_called()
+
+    def test_load_tests_broken(self, processes_root, caplog):
+        (processes_root / "tests" / "divide.json5").write_text(
+            "{id: 'divide', level: 'L1', tests: [{argu"
+        )
+        registry = ProcessRegistry(
+            root=processes_root, max_workers=2, reuse=False, load_tests=True
+        )
+        divide = registry.get_process("divide")
+        assert divide.level == "L1"
+        assert divide.preloaded_tests is None
+        assert divide.tests == []
+        assert "Failed to load process tests from" in caplog.text
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_preload_tests(self, processes_root, max_workers, caplog):
+        caplog.set_level("INFO")
+        registry = ProcessRegistry(
+            root=processes_root, max_workers=max_workers, reuse=False
+        )
+        processes = list(registry.get_all_processes())
+        registry.preload_tests(processes)
+        if max_workers > 1:
+            assert "Parsing 2 process test files with max_workers=2" in caplog.text
+        with mock.patch("json5.loads", side_effect=RuntimeError) as json5_loads:
+            assert len(registry.get_process("add").tests) == 2
+            assert len(registry.get_process("divide").tests) == 1
+            assert registry.get_process("foo").tests == []
+        json5_loads.assert_not_called()
+
+    def test_preload_tests_cached(self, processes_root, tmp_path):
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        registry.preload_tests(registry.get_all_processes())
+
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        with mock.patch("json5.loads", side_effect=RuntimeError) as json5_loads:
+            registry.preload_tests(registry.get_all_processes())
+            assert len(registry.get_process("add").tests) == 2
+        json5_loads.assert_not_called()
+
+    def test_preload_tests_broken(self, processes_root, caplog):
+        (processes_root / "tests" / "divide.json5").write_text(
+            "{id: 'divide', level: 'L1', tests: [{argu"
+        )
+        registry = ProcessRegistry(root=processes_root, max_workers=2, reuse=False)
+        registry.preload_tests(registry.get_all_processes())
+        assert len(registry.get_process("add").tests) == 2
+        assert registry.get_process("divide").tests == []
+        assert "Failed to load process tests from" in caplog.text
+
+    def test_parallel_broken_definition(self, processes_root, caplog):
+        (processes_root / "divide.json").write_text('{"id": "divide", "par')
+
+        registry = ProcessRegistry(root=processes_root, max_workers=2, reuse=False)
+        pids = {p.process_id for p in registry.get_all_processes()}
+        assert pids == {"add", "foo"}
+        assert "Failed to load process data from" in caplog.text
+        assert "divide.json" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ["text", "expected"],
+    [
+        ('{"id": "add", "level": "L1", "tests": []}', "L1"),
+        ("{id: 'add', level: 'L2A', tests: []}", "L2A"),
+        ('{id: "add", tests: [{level: "L3", arguments: {}}], level: "L2"}', "L2"),
+        ('{id: "add", tests: [{level: "L3", arguments: {}}]}', None),
+        ('{\n  // level: "L3"\n  /* level: "L4" */\n  "level": "L1",\n}', "L1"),
+        ('{id: "lev:el", tests: [{x: "}", y: "level: L3"}], level: "L1"}', "L1"),
+        ('{id: "add", level: null}', None),
+        ("", None),
+    ],
+)
+def test_scan_json5_level(text, expected):
+    assert _scan_json5_level(text) == expected
+
+
+class TestProcessRegistryLazyTests:
+    def test_tests_loaded_lazily(self, processes_root, monkeypatch):
+        registry = ProcessRegistry(root=processes_root, reuse=False)
+        add = registry.get_process("add")
+        assert add.level == "L1"
+        assert add.tests_path == processes_root / "tests" / "add.json5"
+        assert "tests" not in add.__dict__
+
+        assert len(add.tests) == 2
+        assert add.tests[0] == {"arguments": {"x": 0, "y": 0}, "returns": 0}
+        assert add.tests is add.tests
+
+    def test_no_tests(self, processes_root):
+        registry = ProcessRegistry(root=processes_root, reuse=False)
+        foo = registry.get_process("foo")
+        assert foo.level == "L4"
+        assert foo.tests_path is None
+        assert foo.tests == []
+
+    def test_broken_tests(self, processes_root, caplog):
+        (processes_root / "tests" / "divide.json5").write_text(
+            "{id: 'divide', level: 'L1', tests: [{argu"
+        )
+        registry = ProcessRegistry(root=processes_root, reuse=False)
+        divide = registry.get_process("divide")
+        assert divide.level == "L1"
+        assert divide.tests == []
+        assert "Failed to load process tests from" in caplog.text
+
+    def test_tests_cached(self, processes_root, tmp_path):
+        cache = PersistentCache(root=tmp_path / "cache", namespace="process-registry")
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        assert len(registry.get_process("add").tests) == 2
+
+        registry = ProcessRegistry(root=processes_root, cache=cache, reuse=False)
+        with mock.patch("json5.loads", side_effect=RuntimeError) as json5_loads:
+            assert len(registry.get_process("add").tests) == 2
+        json5_loads.assert_not_called()
@@ -0,0 +1,128 @@
+import math
+import statistics
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.process_registry import ProcessData
+from openeo_test_suite.lib.scaled_processes import (
+    ORACLES,
+    ScaledProcessTest,
+    get_scaled_process_tests,
+    get_scaled_sizes,
+    parse_size,
+    set_scaled_sizes_from_config,
+)
+
+
+@pytest.mark.parametrize(
+    ["size", "expected"],
+    [
+        ("10000", 10000),
+        ("1e4", 10000),
+        (" 1E7 ", 10_000_000),
+        ("10^6", 1_000_000),
+    ],
+)
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+@pytest.mark.parametrize("size", ["lots", "0", "1.5", "-10"])
+def test_parse_size_invalid(size):
+    with pytest.raises(ValueError):
+        parse_size(size)
+
+
+def test_set_scaled_sizes_from_config(monkeypatch):
+    monkeypatch.setattr("openeo_test_suite.lib.scaled_processes._scaled_sizes", None)
+    config = mock.Mock(spec=pytest.Config)
+    config.getoption.return_value = "1e3,10"
+    set_scaled_sizes_from_config(config)
+    assert get_scaled_sizes() == [1000, 10]
+
+    config.getoption.return_value = "1e3,lots"
+    with pytest.raises(pytest.UsageError, match="Invalid scaled sizes option"):
+        set_scaled_sizes_from_config(config)
+
+
+class TestScaledProcessTest:
+    def test_str(self):
+        assert str(ScaledProcessTest("sum", "L1", 10000)) == "sum-10000"
+        assert (
+            str(ScaledProcessTest("sum", "L1", 10000, nodata=True))
+            == "sum-10000-nodata"
+        )
+
+    def test_get_data(self):
+        data = ScaledProcessTest("sum", "L1", 1000).get_data()
+        assert data.shape == (1000,)
+        assert not np.isnan(data).any()
+        np.testing.assert_array_equal(
+            data, ScaledProcessTest("mean", "L1", 1000).get_data()
+        )
+
+    def test_get_data_nodata(self):
+        data = ScaledProcessTest("sum", "L1", 10000, nodata=True).get_data()
+        assert 500 < np.isnan(data).sum() < 1500
+
+
+@pytest.mark.parametrize(
+    ["process_id", "reference"],
+    [
+        ("sum", math.fsum),
+        ("mean", statistics.mean),
+        ("min", min),
+        ("max", max),
+        ("median", statistics.median),
+        ("sd", statistics.stdev),
+        ("variance", statistics.variance),
+    ],
+)
+def test_reducer_oracles(process_id, reference):
+    test = ScaledProcessTest(process_id, "L1", 1000, nodata=True)
+    arguments, expected = test.get_arguments_and_expected()
+    values = [x for x in arguments["data"].tolist() if not math.isnan(x)]
+    assert expected == pytest.approx(reference(values), rel=1e-9)
+
+
+def test_oracle_quantiles():
+    arguments, expected = ORACLES["quantiles"](np.array([2.0, np.nan, 4.0, 1.0, 3.0]))
+    assert arguments["probabilities"] == [0.1, 0.25, 0.5, 0.75, 0.9]
+    assert expected.tolist() == pytest.approx([1.3, 1.75, 2.5, 3.25, 3.7])
+
+
+def test_oracle_sort():
+    _, expected = ORACLES["sort"](np.array([2.0, np.nan, 4.0, 1.0]))
+    assert expected.tolist() == [1.0, 2.0, 4.0]
+
+
+def test_oracle_cumsum():
+    _, expected = ORACLES["cumsum"](np.array([1.0, np.nan, 2.0, 3.0]))
+    np.testing.assert_array_equal(expected, [1.0, np.nan, 3.0, 6.0])
+
+
+def test_oracle_array_apply():
+    arguments, expected = ORACLES["array_apply"](np.array([1.0, np.nan, 2.0]))
+    assert "process_graph" in arguments["process"]
+    np.testing.assert_array_equal(expected, [2.0, np.nan, 4.0])
+
+
+def test_get_scaled_process_tests():
+    processes = [
+        ProcessData(process_id=pid, spec={}, level=level, experimental=False, path=None)
+        for pid, level in [("sum", "L1"), ("load_collection", "L1"), ("sort", "L2")]
+    ]
+    tests = get_scaled_process_tests(processes=processes, sizes=[10, 100])
+    assert [str(t) for t in tests] == [
+        "sum-10",
+        "sum-10-nodata",
+        "sum-100",
+        "sum-100-nodata",
+        "sort-10",
+        "sort-10-nodata",
+        "sort-100",
+        "sort-100-nodata",
+    ]
+    assert tests[-1].level == "L2"
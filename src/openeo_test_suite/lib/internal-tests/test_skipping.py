@@ -1,8 +1,11 @@
+from unittest import mock
+
 import openeo
 import pytest
 from openeo import DataCube
 
-from openeo_test_suite.lib.skipping import extract_processes_from_process_graph
+from openeo_test_suite.lib.capabilities import CapabilityCache
+from openeo_test_suite.lib.skipping import Skipper, extract_processes_from_process_graph
 
 
 def test_extract_processes_from_process_graph_basic():
@@ -10,6 +13,63 @@ def test_extract_processes_from_process_graph_basic():
     assert extract_processes_from_process_graph(pg) == {"add"}
 
 
+def test_extract_processes_from_process_graph_nested_callbacks():
+    pg = {
+        "arraycreate1": {
+            "process_id": "array_create",
+            "arguments": {
+                "data": [
+                    1,
+                    {
+                        "process_graph": {
+                            "absolute1": {
+                                "process_id": "absolute",
+                                "arguments": {"x": -1},
+                                "result": True,
+                            }
+                        }
+                    },
+                ]
+            },
+        },
+        "apply1": {
+            "process_id": "apply",
+            "arguments": {
+                "data": {"from_node": "arraycreate1"},
+                "context": {
+                    "reducer": {
+                        "process_graph": {
+                            "mean1": {
+                                "process_id": "mean",
+                                "arguments": {"data": {"from_parameter": "data"}},
+                                "result": True,
+                            }
+                        }
+                    }
+                },
+            },
+            "result": True,
+        },
+    }
+    assert extract_processes_from_process_graph(pg) == {
+        "array_create",
+        "absolute",
+        "apply",
+        "mean",
+    }
+
+
+def test_extract_processes_from_process_graph_large():
+    pg = {
+        f"add{i}": {
+            "process_id": "add" if i % 2 else "multiply",
+            "arguments": {"x": {"from_node": f"add{i - 1}"} if i else 1, "y": i},
+        }
+        for i in range(5000)
+    }
+    assert extract_processes_from_process_graph(pg) == {"add", "multiply"}
+
+
 @pytest.fixture
 def s2_cube() -> openeo.DataCube:
     return openeo.DataCube.load_collection(
@@ -42,3 +102,51 @@ def test_extract_processes_from_process_graph_cube_reduce_bands(s2_cube):
         "add",
         "divide",
     }
+
+
+class TestSkipperCapabilityCache:
+    @pytest.fixture
+    def connection(self):
+        connection = mock.Mock(spec=["list_processes", "list_file_formats"])
+        connection.list_processes.return_value = [{"id": "add"}, {"id": "mean"}]
+        connection.list_file_formats.return_value = {
+            "input": {},
+            "output": {"GTiff": {}, "netCDF": {}},
+        }
+        return connection
+
+    def test_skip_if_unsupported_process(self, connection):
+        cache = CapabilityCache()
+        for _ in range(3):
+            skipper = Skipper(
+                connection=connection, selected_processes=[], capability_cache=cache
+            )
+            skipper.skip_if_unsupported_process(["add", "mean"])
+            with pytest.raises(pytest.skip.Exception, match="does not support"):
+                skipper.skip_if_unsupported_process("sum")
+
+        assert connection.list_processes.call_count == 1
+        assert (cache.hits, cache.misses) == (5, 1)
+
+    def test_skip_if_no_file_format_support(self, connection):
+        cache = CapabilityCache()
+        for _ in range(3):
+            skipper = Skipper(
+                connection=connection, selected_processes=[], capability_cache=cache
+            )
+            skipper.skip_if_no_netcdf_support()
+            skipper.skip_if_no_geotiff_support()
+
+        assert connection.list_file_formats.call_count == 1
+
+    def test_invalidate(self, connection):
+        cache = CapabilityCache()
+        skipper = Skipper(
+            connection=connection, selected_processes=[], capability_cache=cache
+        )
+        with pytest.raises(pytest.skip.Exception):
+            skipper.skip_if_unsupported_process("sum")
+
+        connection.list_processes.return_value = [{"id": "sum"}]
+        cache.invalidate()
+        skipper.skip_if_unsupported_process("sum")
@@ -0,0 +1,168 @@
+import dask.array
+import numpy as np
+import pytest
+import xarray as xr
+
+from openeo_test_suite.lib.process_registry import ProcessData
+from openeo_test_suite.lib.synthetic_datacubes import (
+    DatacubeSpec,
+    ScalingResults,
+    create_datacube,
+    create_xarray,
+    get_datacube_process_tests,
+    parse_chunks,
+    parse_shape,
+    track_peak_memory,
+)
+
+DIMENSIONS = ("t", "bands", "y", "x")
+
+
+def test_parse_shape():
+    assert parse_shape("10x4x256x256") == (10, 4, 256, 256)
+    assert parse_shape(" 3X2 ") == (3, 2)
+    with pytest.raises(ValueError):
+        parse_shape("10by4")
+    with pytest.raises(ValueError):
+        parse_shape("0x4")
+
+
+def test_parse_chunks():
+    assert parse_chunks("") is None
+    assert parse_chunks("y=512, x=256") == {"y": 512, "x": 256}
+    with pytest.raises(ValueError):
+        parse_chunks("512")
+
+
+class TestDatacubeSpec:
+    def test_str(self):
+        assert str(DatacubeSpec(DIMENSIONS, (2, 1, 3, 4))) == "2x1x3x4-float64"
+        assert (
+            str(
+                DatacubeSpec(
+                    DIMENSIONS,
+                    (2, 1, 3, 4),
+                    dtype="int16",
+                    chunks={"x": 2},
+                    nodata_ratio=0.1,
+                )
+            )
+            == "2x1x3x4-int16-nodata0.1-chunked"
+        )
+
+    def test_size(self):
+        spec = DatacubeSpec(DIMENSIONS, (2, 1, 3, 4), dtype="float32")
+        assert spec.size == 24
+        assert spec.nbytes == 96
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="doesn't match"):
+            DatacubeSpec(DIMENSIONS, (2, 3))
+        with pytest.raises(ValueError, match="Unsupported dimensions"):
+            DatacubeSpec(("t", "z"), (2, 3))
+
+
+def test_create_datacube():
+    cube = create_datacube(DatacubeSpec(DIMENSIONS, (3, 2, 2, 4)))
+    assert cube["order"] == ["t", "bands", "y", "x"]
+    assert cube["dimensions"]["t"] == {
+        "type": "temporal",
+        "values": [
+            "2020-01-01T00:00:00Z",
+            "2020-01-02T00:00:00Z",
+            "2020-01-03T00:00:00Z",
+        ],
+    }
+    assert cube["dimensions"]["bands"] == {"type": "bands", "values": ["B01", "B02"]}
+    assert cube["dimensions"]["x"] == {
+        "type": "spatial",
+        "axis": "x",
+        "values": [0.0, 10.0, 20.0, 30.0],
+        "reference_system": 32632,
+    }
+    assert cube["data"].shape == (3, 2, 2, 4)
+    assert cube["data"].dtype == np.float64
+    assert not np.isnan(cube["data"]).any()
+    assert "nodata" not in cube
+
+
+def test_create_datacube_nodata():
+    cube = create_datacube(DatacubeSpec(("x",), (10000,), nodata_ratio=0.2))
+    assert 1500 < np.isnan(cube["data"]).sum() < 2500
+
+
+def test_create_datacube_nodata_integer():
+    cube = create_datacube(
+        DatacubeSpec(("x",), (10000,), dtype="uint16", nodata_ratio=0.2)
+    )
+    assert cube["data"].dtype == np.uint16
+    assert cube["nodata"] == 65535
+    assert 1500 < (cube["data"] == 65535).sum() < 2500
+
+
+def test_create_xarray():
+    da = create_xarray(DatacubeSpec(DIMENSIONS, (3, 2, 2, 4)))
+    assert isinstance(da, xr.DataArray)
+    assert da.dims == DIMENSIONS
+    assert np.issubdtype(da.coords["t"].dtype, np.datetime64)
+    assert isinstance(da.data, np.ndarray)
+
+
+def test_create_xarray_chunked():
+    da = create_xarray(DatacubeSpec(DIMENSIONS, (3, 2, 2, 4), chunks={"x": 2}))
+    assert isinstance(da.data, dask.array.Array)
+    assert da.chunks[3] == (2, 2)
+
+
+def test_get_datacube_process_tests():
+    processes = [
+        ProcessData(process_id=pid, spec={}, level="L2", experimental=False, path=None)
+        for pid in ["reduce_dimension", "add", "aggregate_temporal"]
+    ]
+    specs = [DatacubeSpec(DIMENSIONS, (2, 1, 3, 4)), DatacubeSpec(("y", "x"), (3, 4))]
+    tests = get_datacube_process_tests(processes=processes, specs=specs)
+    assert [str(t) for t in tests] == [
+        "reduce_dimension-2x1x3x4-float64",
+        "reduce_dimension-3x4-float64",
+        "aggregate_temporal-2x1x3x4-float64",
+    ]
+    assert tests[0].required == ["mean"]
+
+
+@pytest.mark.parametrize("dimensions", [DIMENSIONS, ("t", "y", "x")])
+def test_get_arguments(dimensions):
+    spec = DatacubeSpec(dimensions, (4,) + (2,) * (len(dimensions) - 1))
+    process = ProcessData(
+        process_id="aggregate_temporal",
+        spec={},
+        level="L2",
+        experimental=False,
+        path=None,
+    )
+    [test] = get_datacube_process_tests(processes=[process], specs=[spec])
+    arguments = test.get_arguments()
+    assert isinstance(arguments["data"], xr.DataArray)
+    assert arguments["intervals"] == [
+        ["2020-01-01", "2020-01-03"],
+        ["2020-01-03", "2020-01-05"],
+    ]
+    assert "process_graph" in arguments["reducer"]
+
+
+def test_track_peak_memory():
+    with track_peak_memory() as memory:
+        data = np.ones(1024**2, dtype=np.uint8)
+        del data
+    assert memory["peak"] >= 1024**2
+
+
+def test_scaling_results_summary():
+    results = ScalingResults()
+    large = DatacubeSpec(("x",), (1024**2,))
+    small = DatacubeSpec(("x",), (1024,))
+    results.add("apply", large, 1.5, 2 * 1024**3 // 128)
+    results.add("apply", small, 0.25, 1024**2 // 64)
+    assert results.get_summary() == [
+        "apply 1024-float64 (0.0 MiB): 0.250s, peak memory 0.0 MiB (2.0x cube size)",
+        "apply 1048576-float64 (8.0 MiB): 1.500s, peak memory 16.0 MiB (2.0x cube size)",
+    ]
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from openeo_test_suite.lib.timing import (
+    PhaseTimer,
+    PhaseTimingStats,
+    get_phase_durations,
+)
+
+
+def _report(user_properties) -> pytest.TestReport:
+    return pytest.TestReport(
+        nodeid="test_foo",
+        location=("test_foo.py", 0, "test_foo"),
+        keywords={},
+        outcome="passed",
+        longrepr=None,
+        when="call",
+        user_properties=user_properties,
+    )
+
+
+class TestPhaseTimer:
+    def test_phases(self):
+        user_properties = [("process_id", "add")]
+        timer = PhaseTimer(user_properties=user_properties)
+        with timer.phase("prepare"):
+            time.sleep(0.01)
+        with timer.phase("execute"):
+            time.sleep(0.02)
+        assert set(timer.durations) == {"prepare", "execute"}
+        assert timer.durations["prepare"] >= 0.01
+        assert timer.durations["execute"] >= 0.02
+        assert user_properties == [
+            ("process_id", "add"),
+            ("duration:prepare", timer.durations["prepare"]),
+            ("duration:execute", timer.durations["execute"]),
+        ]
+
+    def test_nested_phase_excluded(self):
+        timer = PhaseTimer()
+        with timer.phase("compare"):
+            with timer.phase("decode"):
+                time.sleep(0.05)
+        assert timer.durations["decode"] >= 0.05
+        assert timer.durations["compare"] < 0.05
+
+    def test_repeated_phase_accumulates(self):
+        user_properties = []
+        timer = PhaseTimer(user_properties=user_properties)
+        for _ in range(2):
+            with timer.phase("execute"):
+                time.sleep(0.01)
+        assert timer.durations["execute"] >= 0.02
+        assert user_properties == [("duration:execute", timer.durations["execute"])]
+
+    def test_exception(self):
+        timer = PhaseTimer()
+        with pytest.raises(ValueError):
+            with timer.phase("execute"):
+                raise ValueError
+        assert "execute" in timer.durations
+
+
+def test_get_phase_durations():
+    report = _report([("process_id", "add"), ("duration:execute", 1.5)])
+    assert get_phase_durations(report) == {"execute": 1.5}
+
+
+def test_phase_timing_stats():
+    stats = PhaseTimingStats(group_by="process_id")
+    assert stats.get_summary() == []
+    stats.add(_report([("process_id", "add"), ("duration:execute", 1.0)]))
+    stats.add(
+        _report(
+            [("process_id", "add"), ("duration:execute", 2.0), ("duration:decode", 0.5)]
+        )
+    )
+    stats.add(_report([("process_id", "sum"), ("duration:compare", 0.25)]))
+    stats.add(_report([]))
+    assert stats.get_summary() == [
+        "Total per phase: execute 3.000s, decode 0.500s, compare 0.250s",
+        "Slowest (by process_id):",
+        "  add: 3.500s in 2 tests (execute 3.000s, decode 0.500s)",
+        "  sum: 0.250s in 1 test (compare 0.250s)",
+    ]
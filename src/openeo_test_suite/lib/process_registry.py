@@ -1,28 +1,90 @@
+import collections
+import concurrent.futures
+import dataclasses
+import functools
 import itertools
 import json
 import logging
 import os
-from dataclasses import dataclass
+import re
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Iterable, Iterator, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import json5
 
 import openeo_test_suite
+from openeo_test_suite.lib.caching import PersistentCache
 
 _log = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
 class ProcessData:
-    """Process data, including profile level and list of tests"""
+    """
+    Process data, including profile level and list of tests.
+    Unless already loaded together with the process definition (`preloaded_tests`),
+    the tests are only loaded (from `tests_path`) when they are accessed first.
+    """
 
     process_id: str
     spec: dict
     level: str
-    tests: List[dict]  # TODO: also make dataclass for each test?
     experimental: bool
     path: Path
+    tests_path: Optional[Path] = None
+    tests_cache: Optional[PersistentCache] = field(
+        default=None, compare=False, repr=False
+    )
+    preloaded_tests: Optional[List[dict]] = field(
+        default=None, compare=False, repr=False
+    )
+
+    @functools.cached_property
+    def tests(self) -> List[dict]:
+        # TODO: also make dataclass for each test?
+        if self.preloaded_tests is not None:
+            return self.preloaded_tests
+        if self.tests_path is None:
+            return []
+        try:
+            return _load_tests(path=self.tests_path, cache=self.tests_cache)
+        except Exception as e:
+            _log.error(f"Failed to load process tests from {self.tests_path}: {e!r}")
+            return []
+
+    def __getstate__(self) -> dict:
+        # The tests cache is specific to the current session (and it is not
+        # meant to be pickled in the persistent cache or sent to worker processes):
+        # it is attached again after unpickling (see `ProcessRegistry._load`).
+        state = self.__dict__.copy()
+        state["tests_cache"] = None
+        return state
+
+
+class _ProcessIndex:
+    """
+    Loaded processes (in original load order)
+    with lookup indexes (pointing to positions in that list).
+    """
+
+    def __init__(self, processes: List[ProcessData]):
+        self.processes = processes
+        self.by_id: Dict[str, List[int]] = collections.defaultdict(list)
+        self.by_level: Dict[str, List[int]] = collections.defaultdict(list)
+        self.by_experimental: Dict[bool, List[int]] = {True: [], False: []}
+        self.by_category: Dict[str, List[int]] = collections.defaultdict(list)
+        for i, process_data in enumerate(processes):
+            self.by_id[process_data.process_id].append(i)
+            self.by_level[process_data.level].append(i)
+            self.by_experimental[bool(process_data.experimental)].append(i)
+            for category in process_data.spec.get("categories", []):
+                self.by_category[category].append(i)
+
+    def get(self, positions: Iterable[int]) -> Iterator[ProcessData]:
+        """Get processes at given positions, in load order."""
+        return (self.processes[i] for i in sorted(positions))
 
 
 class ProcessRegistry:
@@ -31,16 +93,45 @@ class ProcessRegistry:
     and related tests defined in openeo-processes project
     """
 
-    def __init__(self, root: Optional[Path] = None):
+    # Minimum number of process definitions to parse before considering a process pool
+    PARALLEL_LOADING_THRESHOLD = 64
+
+    # Loaded process indexes, shared between instances
+    # (keyed on resolved root directory and whether tests are loaded together with the process definitions)
+    _shared_indexes: Dict[Tuple[Path, bool], _ProcessIndex] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        cache: Optional[PersistentCache] = None,
+        max_workers: Optional[int] = None,
+        reuse: bool = True,
+        load_tests: bool = False,
+    ):
         """
         :param root: Root directory of the tests folder in  openeo-processes project
+        :param cache: optional persistent cache to reuse already parsed process data
+            (only process definitions with changed JSON/JSON5 files are parsed again)
+        :param max_workers: maximum number of worker processes to parse
+            process definitions in parallel (default: number of available CPUs).
+            Use 1 to force serial loading.
+        :param reuse: whether to reuse the processes already loaded
+            by another instance with the same root directory (and `load_tests` setting).
+        :param load_tests: whether to load the JSON5 tests together with the process definitions
+            (in the same worker processes when parsing in parallel),
+            instead of lazily (and serially) when they are accessed first.
         """
 
         self._root = Path(root or self._guess_root())
         self._root_json5 = Path(self._root.joinpath("tests"))
+        self._cache = cache
+        self._max_workers = max_workers
+        self._reuse = reuse
+        self._load_tests = load_tests
 
         # Lazy load cache
-        self._processes: Union[None, List[ProcessData]] = None
+        self._index: Union[None, _ProcessIndex] = None
 
     def _guess_root(self):
         # TODO: avoid need for guessing and properly include assets in (installed) package
@@ -59,7 +150,6 @@ class ProcessRegistry:
 
     def _load(self) -> Iterator[ProcessData]:
         """Collect all processes"""
-        # TODO: cache or preload this in __init__? Or even reuse across instances?
         if not self._root.is_dir():
             raise ValueError(f"Invalid process test root directory: {self._root}")
         _log.info(f"Loading process definitions from {self._root}")
@@ -67,40 +157,167 @@ class ProcessRegistry:
         process_paths = itertools.chain(
             self._root.glob("*.json"), self._root.glob("proposals/*.json")
         )
+        # Read raw file contents (and resolve from cache where possible),
+        # keeping the original order with placeholders for the ones that still have to be parsed.
+        loaded: List[Union[ProcessData, dict]] = []
+        cache_keys = {}
         for path in process_paths:
             test_metadata_path = self._root_json5 / f"{path.stem}.json5"
             try:
-                with path.open() as f:
-                    data = json.load(f)
-                if data["id"] != path.stem:
-                    raise ValueError(
-                        f"Process id mismatch between id {data['id']!r} and filename {path.name!r}"
-                    )
+                spec_raw = path.read_bytes()
                 # Metadata is stored in sibling json file
                 if test_metadata_path.exists():
-                    with test_metadata_path.open() as f:
-                        metadata = json5.load(f)
+                    metadata_raw = test_metadata_path.read_bytes()
                 else:
-                    metadata = {}
-
-                yield ProcessData(
-                    process_id=data["id"],
-                    spec=data,
-                    level=metadata.get(
-                        "level", "L4"
-                    ),  # default to L4 is intended for processes without a specific level
-                    tests=metadata.get("tests", []),
-                    experimental=data.get("experimental", False),
-                    path=path,
-                )
+                    metadata_raw = None
             except Exception as e:
-                # TODO: good idea to skip broken definitions? Why not just fail hard?
                 _log.error(f"Failed to load process data from {path}: {e!r}")
+                continue
+
+            if self._cache:
+                # Key on paths relative to the root (not absolute ones),
+                # so that the cache stays valid for another checkout/location of the same files.
+                cache_key = self._cache.make_key(
+                    path.relative_to(self._root).as_posix(),
+                    spec_raw,
+                    (
+                        test_metadata_path.relative_to(self._root).as_posix()
+                        if metadata_raw is not None
+                        else ""
+                    ),
+                    metadata_raw or b"",
+                )
+                process_data = self._cache.get(cache_key)
+                if process_data is not None:
+                    loaded.append(
+                        dataclasses.replace(
+                            process_data,
+                            path=path,
+                            tests_path=(
+                                test_metadata_path if metadata_raw is not None else None
+                            ),
+                            tests_cache=self._cache,
+                        )
+                    )
+                    continue
+                cache_keys[path] = cache_key
+
+            loaded.append(
+                {
+                    "path": path,
+                    "spec_raw": spec_raw,
+                    "metadata_path": test_metadata_path,
+                    "metadata_raw": metadata_raw,
+                    "load_tests": self._load_tests,
+                }
+            )
+
+        to_parse = [item for item in loaded if isinstance(item, dict)]
+        if self._cache:
+            _log.info(
+                f"Loaded {len(loaded) - len(to_parse)} process definitions from cache"
+            )
+        parsed = iter(self._parse_all(to_parse))
+
+        for item in loaded:
+            if isinstance(item, ProcessData):
+                yield item
+                continue
+            path = item["path"]
+            process_data = next(parsed)
+            if isinstance(process_data, ProcessData):
+                if self._cache:
+                    self._cache.set(cache_keys[path], process_data)
+                    process_data = dataclasses.replace(
+                        process_data, tests_cache=self._cache
+                    )
+                yield process_data
+            else:
+                # TODO: good idea to skip broken definitions? Why not just fail hard?
+                _log.error(f"Failed to load process data from {path}: {process_data}")
+
+    def _parse_all(
+        self,
+        to_parse: List[Any],
+        parse: Optional[Callable[[Any], Any]] = None,
+        description: str = "process definitions",
+    ) -> List[Any]:
+        """
+        Parse raw process data (serially or in a process pool, depending on size and CPU count),
+        preserving order.
+        Failures are returned as error description strings instead of `ProcessData` objects.
+
+        :param parse: parse function (default: parse process definitions, see `_parse_process_data_safely`)
+        :param description: description of the parsed items (for logging)
+        """
+        parse = parse or _parse_process_data_safely
+        max_workers = min(self._max_workers or _cpu_count(), len(to_parse))
+        if max_workers <= 1 or len(to_parse) < self.PARALLEL_LOADING_THRESHOLD:
+            return [parse(item) for item in to_parse]
+
+        _log.info(f"Parsing {len(to_parse)} {description} with {max_workers=}")
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                chunksize = max(1, len(to_parse) // (4 * max_workers))
+                return list(executor.map(parse, to_parse, chunksize=chunksize))
+        except Exception as e:
+            _log.warning(f"Parallel parsing failed ({e!r}), falling back to serial")
+            return [parse(item) for item in to_parse]
+
+    def preload_tests(self, processes: Iterable[ProcessData]):
+        """
+        Load the tests of given processes up front (instead of lazily when they are accessed first):
+        from the persistent cache where possible, otherwise parsed together
+        (in a process pool, depending on size and CPU count).
+        Failures are left to the lazy loading to report.
+        """
+        pending = []
+        for process_data in processes:
+            if (
+                process_data.tests_path is None
+                or process_data.preloaded_tests is not None
+                or "tests" in process_data.__dict__
+            ):
+                continue
+            try:
+                raw = process_data.tests_path.read_bytes()
+            except OSError:
+                continue
+            if self._cache:
+                tests = self._cache.get(self._cache.make_key("tests", raw))
+                if tests is not None:
+                    # Note: set `tests` cached property directly (frozen dataclass)
+                    process_data.__dict__["tests"] = tests
+                    continue
+            pending.append((process_data, raw))
+
+        parsed = self._parse_all(
+            [raw for _, raw in pending],
+            parse=_parse_tests_safely,
+            description="process test files",
+        )
+        for (process_data, raw), tests in zip(pending, parsed):
+            if isinstance(tests, list):
+                if self._cache:
+                    self._cache.set(self._cache.make_key("tests", raw), tests)
+                process_data.__dict__["tests"] = tests
+
+    def _get_index(self) -> _ProcessIndex:
+        if self._index is None:
+            if self._reuse:
+                key = (self._root.resolve(), self._load_tests)
+                with self._shared_lock:
+                    if key not in self._shared_indexes:
+                        self._shared_indexes[key] = _ProcessIndex(list(self._load()))
+                    self._index = self._shared_indexes[key]
+            else:
+                self._index = _ProcessIndex(list(self._load()))
+        return self._index
 
     def get_all_processes(self) -> Iterable[ProcessData]:
-        if self._processes is None:
-            self._processes = list(self._load())
-        return iter(self._processes)
+        return iter(self._get_index().processes)
 
     def get_processes_filtered(
         self,
@@ -115,31 +332,166 @@ class ProcessRegistry:
         :param process_levels: allow list of process levels (empty/None means allow all)
         :param experimental: allow experimental processes or not?
         """
-        for process_data in self.get_all_processes():
-            pid = process_data.process_id
-            level = process_data.level
+        index = self._get_index()
 
-            if process_ids and pid in process_ids:
-                yield process_data
-            elif process_levels and level in process_levels:
-                if process_data.experimental and not experimental:
-                    _log.debug(f"Skipping process {pid!r}: experimental")
-                    continue
-                yield process_data
-            elif not process_ids and not process_levels:
-                # No id or level allow lists: no filtering (except experimental flag)
-                if process_data.experimental and not experimental:
-                    _log.debug(f"Skipping process {pid!r}: experimental")
+        if not process_ids and not process_levels:
+            # No id or level allow lists: no filtering (except experimental flag)
+            if experimental:
+                return index.get(range(len(index.processes)))
+            return index.get(index.by_experimental[False])
+
+        selected = set()
+        for pid in process_ids or []:
+            selected.update(index.by_id.get(pid, []))
+        for level in process_levels or []:
+            for i in index.by_level.get(level, []):
+                if index.processes[i].experimental and not experimental:
+                    _log.debug(
+                        f"Skipping process {index.processes[i].process_id!r}: experimental"
+                    )
                     continue
+                selected.add(i)
+        return index.get(selected)
 
-                yield process_data
-            else:
-                _log.debug(
-                    f"Skipping process {pid!r}: not in allow lists {process_levels=} or {process_ids=}"
-                )
+    def get_processes_by_category(self, category: str) -> Iterator[ProcessData]:
+        """Get processes with given category (e.g. "math", "cubes", ...)"""
+        index = self._get_index()
+        return index.get(index.by_category.get(category, []))
 
     def get_process(self, process_id: str) -> ProcessData:
-        for process_data in self.get_all_processes():
-            if process_data.process_id == process_id:
-                return process_data
-        raise LookupError(f"Process not found: {process_id!r}")
+        positions = self._get_index().by_id.get(process_id)
+        if not positions:
+            raise LookupError(f"Process not found: {process_id!r}")
+        return self._index.processes[positions[0]]
+
+
+def _parse_process_data(
+    path: Path,
+    spec_raw: bytes,
+    metadata_path: Path,
+    metadata_raw: Optional[bytes],
+    load_tests: bool = False,
+) -> ProcessData:
+    """
+    Build `ProcessData` from raw contents of process spec JSON and test metadata JSON5.
+    Unless `load_tests` is set, only the level is extracted from the JSON5 metadata at this point,
+    and the tests themselves are loaded lazily.
+    """
+    data = json.loads(spec_raw)
+    if data["id"] != path.stem:
+        raise ValueError(
+            f"Process id mismatch between id {data['id']!r} and filename {path.name!r}"
+        )
+    level = None
+    tests = None
+    if metadata_raw is not None:
+        text = metadata_raw.decode("utf-8")
+        if load_tests:
+            try:
+                metadata = json5.loads(text)
+                level = metadata.get("level")
+                tests = metadata.get("tests", [])
+            except Exception:
+                # Leave it to the lazy loading to report the problem
+                level = _scan_json5_level(text)
+        else:
+            level = _scan_json5_level(text)
+
+    return ProcessData(
+        process_id=data["id"],
+        spec=data,
+        # default to L4 is intended for processes without a specific level
+        level=level or "L4",
+        experimental=data.get("experimental", False),
+        path=path,
+        tests_path=metadata_path if metadata_raw is not None else None,
+        preloaded_tests=tests,
+    )
+
+
+# Tokenizer for a lightweight scan of JSON5 documents (whitespace and comments are matched, but not captured)
+_JSON5_TOKEN_REGEX = re.compile(
+    r"""
+    \s+ | //[^\n]* | /\*.*?\*/
+    | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<punctuation>[{}\[\]:,])
+    | (?P<other>[^\s{}\[\]:,"'/]+)
+    """,
+    flags=re.VERBOSE | re.DOTALL,
+)
+
+
+def _scan_json5_level(text: str) -> Optional[str]:
+    """
+    Extract top-level "level" string property from JSON5 test metadata
+    without a full (and slow) JSON5 parse:
+    the document is only tokenized up to the point where the property is found.
+    """
+    depth = 0
+    previous = None
+    key = None
+    for match in _JSON5_TOKEN_REGEX.finditer(text):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        token = match.group(kind)
+        if key == "level":
+            return token[1:-1] if kind == "string" else None
+        if kind == "punctuation":
+            if token in "{[":
+                depth += 1
+            elif token in "}]":
+                depth -= 1
+            elif token == ":" and depth == 1 and previous:
+                key = previous
+        previous = token.strip("\"'") if kind in ("string", "other") else None
+    return None
+
+
+def _load_tests(path: Path, cache: Optional[PersistentCache] = None) -> List[dict]:
+    """Load tests from JSON5 test metadata file (through persistent cache if any)."""
+    raw = path.read_bytes()
+    if cache:
+        # Note: keyed on content only (not on the path, which doesn't affect the tests)
+        cache_key = cache.make_key("tests", raw)
+        tests = cache.get(cache_key)
+        if tests is not None:
+            return tests
+    tests = _parse_tests(raw)
+    if cache:
+        cache.set(cache_key, tests)
+    return tests
+
+
+def _parse_tests(raw: bytes) -> List[dict]:
+    """Parse tests from raw contents of JSON5 test metadata."""
+    return json5.loads(raw.decode("utf-8")).get("tests", [])
+
+
+def _parse_tests_safely(raw: bytes) -> Union[List[dict], str]:
+    """
+    Wrapper for `_parse_tests` (e.g. to run in a process pool)
+    that returns failure description instead of raising exception.
+    """
+    try:
+        return _parse_tests(raw)
+    except Exception as e:
+        return repr(e)
+
+
+def _parse_process_data_safely(item: dict) -> Union[ProcessData, str]:
+    """
+    Wrapper for `_parse_process_data` (e.g. to run in a process pool)
+    that returns failure description instead of raising exception.
+    """
+    try:
+        return _parse_process_data(**item)
+    except Exception as e:
+        return repr(e)
+
+
+def _cpu_count() -> int:
+    """Number of CPUs available to the current process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
@@ -1,4 +1,13 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, NamedTuple
+
+
+class ProcessCall(NamedTuple):
+    """Upcoming process execution, as announced to `ProcessTestRunner.prefetch`."""
+
+    process_id: str
+    arguments: Dict
+    # Whether the process test expects an exception
+    throws: bool = False
 
 
 class ProcessTestRunner:
@@ -15,6 +24,35 @@ class ProcessTestRunner:
         """
         pass
 
+    def get_backend_id(self) -> str:
+        """
+        Identifier of the backend (implementation) the runner executes processes with,
+        including its version (e.g. to key recorded process execution results on).
+        """
+        return type(self).__name__
+
+    def warm_up(self):
+        """
+        Prepare for process executions in a dedicated (e.g. worker) process,
+        for example by importing the process implementations upfront.
+        """
+        pass
+
+    def get_prefetch_size(self) -> int:
+        """
+        Number of upcoming process executions the runner wants to be informed about
+        through `prefetch` (0: no prefetching).
+        """
+        return 0
+
+    def prefetch(self, calls: List[ProcessCall]):
+        """
+        Hint about upcoming `execute` calls (with the same process id and arguments),
+        allowing the runner to execute them ahead of time (e.g. batched or concurrently),
+        and return the precomputed result (or raise the precomputed exception) from `execute`.
+        """
+        pass
+
     def encode_process_graph(
         self, process: Dict, parent_process_id=None, parent_parameter=None
     ) -> Any:
@@ -37,6 +75,8 @@ class ProcessTestRunner:
         """
         Converts a datacube from the JSON object representation (type: datacube) to the
         internal backend representation openEO process tests.
+        The datacube data can also be a numpy array (e.g. memory-mapped from a `.npy` file)
+        or the whole datacube can be an `xarray.DataArray` (e.g. loaded from a NetCDF or Zarr file).
         specification -> backend
         """
         raise NotImplementedError("datacubes not implemented yet")
@@ -71,3 +111,82 @@ class ProcessTestRunner:
         Returns the nodata value of the backend.
         """
         return None
+
+    def close(self):
+        """
+        Release resources of the runner (e.g. thread pools for prefetching),
+        when it is not used anymore.
+        """
+        pass
+
+
+class WrappingRunner(ProcessTestRunner):
+    """
+    Base class for wrappers around a `ProcessTestRunner` (e.g. to record or deduplicate process executions),
+    passing everything through to the wrapped runner by default.
+
+    Keeps track of the process graphs (JSON) of encoded callbacks,
+    so that process calls with callbacks can be hashed in a stable way
+    (by id of the encoded object, the object itself is kept alive to avoid id reuse).
+    """
+
+    def __init__(self, runner: ProcessTestRunner):
+        self.runner = runner
+        self._backend_id = None
+        self._encoded_process_graphs: Dict[int, tuple] = {}
+
+    @property
+    def backend_id(self) -> str:
+        if self._backend_id is None:
+            self._backend_id = self.runner.get_backend_id()
+        return self._backend_id
+
+    def list_processes(self) -> List[Dict]:
+        return self.runner.list_processes()
+
+    def execute(self, id: str, arguments: Dict) -> Any:
+        return self.runner.execute(id, arguments)
+
+    def get_backend_id(self) -> str:
+        return self.backend_id
+
+    def warm_up(self):
+        self.runner.warm_up()
+
+    def get_prefetch_size(self) -> int:
+        return self.runner.get_prefetch_size()
+
+    def prefetch(self, calls: List[ProcessCall]):
+        self.runner.prefetch(calls)
+
+    def encode_process_graph(
+        self, process: Dict, parent_process_id=None, parent_parameter=None
+    ) -> Any:
+        encoded = self.runner.encode_process_graph(
+            process=process,
+            parent_process_id=parent_process_id,
+            parent_parameter=parent_parameter,
+        )
+        self._encoded_process_graphs[id(encoded)] = (encoded, process)
+        return encoded
+
+    def encode_labeled_array(self, data: Dict) -> Any:
+        return self.runner.encode_labeled_array(data)
+
+    def encode_datacube(self, data: Dict) -> Any:
+        return self.runner.encode_datacube(data)
+
+    def encode_data(self, data: Any) -> Any:
+        return self.runner.encode_data(data)
+
+    def decode_data(self, data: Any, expected: Any) -> Any:
+        return self.runner.decode_data(data, expected)
+
+    def is_json_only(self) -> bool:
+        return self.runner.is_json_only()
+
+    def get_nodata_value(self) -> Any:
+        return self.runner.get_nodata_value()
+
+    def close(self):
+        self.runner.close()
@@ -1,65 +1,439 @@
+import atexit
+import collections
+import contextlib
+import functools
+import hashlib
 import importlib
+import importlib.metadata
+import importlib.util
 import inspect
+import json
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import dask
+import numpy as np
 from openeo_pg_parser_networkx import OpenEOProcessGraph, ProcessRegistry
-from openeo_pg_parser_networkx.pg_schema import BoundingBox
-from openeo_pg_parser_networkx.process_registry import Process
-from openeo_processes_dask.process_implementations.core import process
+from openeo_pg_parser_networkx.pg_schema import BoundingBox, ProcessGraph
+from openeo_pg_parser_networkx.process_registry import DEFAULT_NAMESPACE, Process
 
-from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
+from openeo_test_suite.lib.caching import LruCache, get_persistent_cache
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
 from openeo_test_suite.lib.process_runner.util import (
+    call_key,
     datacube_to_xarray,
     numpy_to_native,
     xarray_to_datacube,
 )
 
+_log = logging.getLogger(__name__)
 
-def create_process_registry():
-    process_registry = ProcessRegistry(wrap_funcs=[process])
+# Startup timings (in seconds), e.g. for `get_startup_report`
+startup_timings = {
+    "import_implementations": None,
+    "resolve_processes": 0.0,
+    "resolved_processes": 0,
+}
 
-    processes_from_module = [
-        func
-        for _, func in inspect.getmembers(
-            importlib.import_module("openeo_processes_dask.process_implementations"),
-            inspect.isfunction,
-        )
-    ]
+
+@functools.lru_cache
+def _get_implementations() -> Dict[str, Callable]:
+    """
+    Import the process implementations (which is relatively slow)
+    and map them on (normalized) process id.
+    """
+    start = time.time()
+    module = importlib.import_module("openeo_processes_dask.process_implementations")
+    functions = [func for _, func in inspect.getmembers(module, inspect.isfunction)]
 
     # not sure why this is needed
     import openeo_processes_dask.process_implementations.math
 
-    processes_from_module.append(openeo_processes_dask.process_implementations.math.e)
+    functions.append(openeo_processes_dask.process_implementations.math.e)
+
+    implementations = {func.__name__.strip("_"): func for func in functions}
+    startup_timings["import_implementations"] = time.time() - start
+    _log.info(
+        f"Imported {len(implementations)} process implementations in {startup_timings['import_implementations']:.2f}s"
+    )
+    return implementations
+
 
+def _get_spec(name: str) -> dict:
+    # Note: importing the specs is relatively cheap
     specs_module = importlib.import_module("openeo_processes_dask.specs")
-    specs = {
-        func.__name__: getattr(specs_module, func.__name__)
-        for func in processes_from_module
-    }
-
-    for func in processes_from_module:
-        process_registry[func.__name__] = Process(
-            spec=specs[func.__name__], implementation=func
+    return getattr(specs_module, name)
+
+
+def _get_implementation_names() -> List[str]:
+    """
+    Names of the implemented processes (function names, e.g. "_sum" for "sum"),
+    persistently cached per `openeo-processes-dask` version to avoid importing the implementations.
+    """
+    cache = get_persistent_cache("dask-runner")
+    key = None
+    if cache is not None:
+        key = cache.make_key(
+            "implementation-names",
+            importlib.metadata.version("openeo-processes-dask"),
         )
+        names = cache.get(key)
+        if names is not None:
+            return names
+    names = sorted(func.__name__ for func in _get_implementations().values())
+    if cache is not None:
+        cache.set(key, names)
+    return names
+
 
-    return process_registry
+class LazyProcessRegistry(ProcessRegistry):
+    """
+    Process registry that resolves process implementations (and specs) on first use,
+    instead of building the full registry upfront.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._resolve_lock = threading.Lock()
+
+    def __getitem__(self, key):
+        try:
+            return super().__getitem__(key)
+        except KeyError:
+            namespace, process_id = self._keytransform(key)
+            if namespace != DEFAULT_NAMESPACE or process_id is None:
+                raise
+            if not self._resolve(process_id):
+                raise
+            return super().__getitem__(key)
+
+    def _resolve(self, process_id: str) -> bool:
+        with self._resolve_lock:
+            if process_id in self.store.get(DEFAULT_NAMESPACE, {}):
+                return True
+            func = _get_implementations().get(process_id)
+            if func is None:
+                return False
+            start = time.time()
+            from openeo_processes_dask.process_implementations.core import process
+
+            self[process_id] = Process(
+                spec=_get_spec(func.__name__), implementation=process(func)
+            )
+            startup_timings["resolve_processes"] += time.time() - start
+            startup_timings["resolved_processes"] += 1
+            return True
+
+
+def create_process_registry() -> LazyProcessRegistry:
+    return LazyProcessRegistry()
 
 
 registry = create_process_registry()
 
 
+def get_startup_report() -> str:
+    """Human-readable report of the startup timings of the Dask runner."""
+    import_time = startup_timings["import_implementations"]
+    return (
+        "Dask runner startup: "
+        + (
+            f"importing process implementations took {import_time:.2f}s"
+            if import_time is not None
+            else "process implementations not imported"
+        )
+        + f", resolved {startup_timings['resolved_processes']} processes"
+        + f" in {startup_timings['resolve_processes']:.2f}s"
+    )
+
+
+# Parsed (and validated) datamodels of callback process graphs (LRU),
+# keyed on canonical process graph hash and parent process/parameter
+_parsed_process_graphs = LruCache(max_size=256)
+
+
+class _PreparsedProcessGraph(OpenEOProcessGraph):
+    """
+    `OpenEOProcessGraph` built from an already parsed (and validated) process graph datamodel,
+    skipping the unflattening and datamodel validation of the raw process graph.
+    """
+
+    def __init__(self, pg_data: dict, nested_graph: ProcessGraph):
+        self._preparsed_nested_graph = nested_graph
+        super().__init__(pg_data=pg_data)
+
+    def _unflatten_raw_process_graph(self, raw_flat_graph: dict) -> None:
+        return None
+
+    def _parse_datamodel(self, nested_graph: None) -> ProcessGraph:
+        return self._preparsed_nested_graph
+
+
+def _parse_process_graph(
+    process: dict,
+    parent_process_id: Optional[str] = None,
+    parent_parameter: Optional[str] = None,
+) -> OpenEOProcessGraph:
+    """
+    Parse process graph, with memoized datamodel validation
+    of the same callback (e.g. `{"process_graph": {"sum": ...}}` as used in many process tests).
+
+    Note that each call returns a fresh `OpenEOProcessGraph` (with its own networkx graph):
+    building a callable from it (`to_callable`) modifies the graph nodes,
+    and the callable keeps the results of its nodes across invocations,
+    so neither can be shared between callbacks.
+    """
+    try:
+        canonical = json.dumps(
+            [process, parent_process_id, parent_parameter],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+    except (TypeError, ValueError):
+        # Not JSON serializable (e.g. already encoded arguments): don't memoize
+        return OpenEOProcessGraph(pg_data=process)
+    key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    nested_graph = _parsed_process_graphs.get(key)
+    if nested_graph is None:
+        parsed = OpenEOProcessGraph(pg_data=process)
+        _parsed_process_graphs.set(key, parsed.nested_graph)
+        return parsed
+    return _PreparsedProcessGraph(pg_data=process, nested_graph=nested_graph)
+
+
+SCHEDULERS = ["synchronous", "threads", "processes", "distributed"]
+
+
+@functools.lru_cache
+def _get_distributed_client(
+    num_workers: Optional[int] = None, memory_limit: Optional[str] = None
+):
+    """Get client of a local `distributed` cluster (started on first use, closed at exit)."""
+    import distributed
+
+    cluster_kwargs = {}
+    if num_workers is not None:
+        cluster_kwargs["n_workers"] = num_workers
+    if memory_limit is not None:
+        cluster_kwargs["memory_limit"] = memory_limit
+    start = time.time()
+    cluster = distributed.LocalCluster(**cluster_kwargs)
+    client = distributed.Client(cluster, set_as_default=False)
+    _log.info(
+        f"Started local distributed cluster {cluster!r} in {time.time() - start:.2f}s"
+    )
+
+    def close():
+        client.close()
+        cluster.close()
+
+    atexit.register(close)
+    return client
+
+
+# Number of upcoming process executions to vectorize over (see `Dask.prefetch`)
+_VECTORIZE_PREFETCH_SIZE = 256
+
+# Argument types that can be vectorized (numpy arrays of one of these)
+_SCALAR_TYPES = (bool, int, float)
+
+
+def _get_scalar_signature(arguments: Dict) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """
+    Argument names and (scalar) types of a process call,
+    or None if the call has no arguments or non-scalar arguments.
+    """
+    if not arguments or not all(type(v) in _SCALAR_TYPES for v in arguments.values()):
+        return None
+    return tuple(sorted((k, type(v).__name__) for k, v in arguments.items()))
+
+
 class Dask(ProcessTestRunner):
+    def __init__(
+        self,
+        scheduler: Optional[str] = None,
+        num_workers: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+        vectorize: bool = False,
+    ):
+        """
+        :param scheduler: Dask scheduler to execute the processes with:
+            "synchronous", "threads", "processes" or "distributed" (a local `distributed` cluster).
+            By default, the globally configured (or default) Dask scheduler is used.
+        :param num_workers: number of workers (threads, processes or cluster workers)
+        :param memory_limit: memory limit per worker (e.g. "2GB"),
+            only supported with the "distributed" scheduler.
+        :param vectorize: execute upcoming (prefetched) process calls with only scalar arguments
+            in vectorized form: grouped per process and argument signature
+            into a single call with numpy arrays, with the element-wise results
+            returned from the individual `execute` calls.
+        """
+        if scheduler is not None and scheduler not in SCHEDULERS:
+            raise ValueError(f"Invalid Dask scheduler {scheduler!r}")
+        if (
+            scheduler == "distributed"
+            and importlib.util.find_spec("distributed") is None
+        ):
+            raise RuntimeError(
+                "The 'distributed' Dask scheduler requires the `distributed` package to be installed."
+            )
+        if memory_limit is not None and scheduler != "distributed":
+            raise ValueError(
+                "A Dask worker memory limit is only supported with the 'distributed' scheduler."
+            )
+        self.scheduler = scheduler
+        self.num_workers = num_workers
+        self.memory_limit = memory_limit
+        self.vectorize = vectorize
+        # Results of vectorized process executions (by call key)
+        self._prefetched: Dict[str, Any] = {}
+
+    def _get_scheduler_config(self) -> Optional[dict]:
+        """Dask config to use the configured scheduler (None: keep default)."""
+        if self.scheduler is None:
+            return None
+        if self.scheduler == "distributed":
+            client = _get_distributed_client(
+                num_workers=self.num_workers, memory_limit=self.memory_limit
+            )
+            return {"scheduler": client}
+        config = {"scheduler": self.scheduler}
+        if self.num_workers is not None and self.scheduler != "synchronous":
+            config["num_workers"] = self.num_workers
+        return config
+
+    def _scheduler_context(self):
+        """Context to use the configured scheduler, for process execution as well as result computation."""
+        config = self._get_scheduler_config()
+        if config is None:
+            return contextlib.nullcontext()
+        return dask.config.set(config)
+
+    def warm_up(self):
+        _get_implementations()
+        config = self._get_scheduler_config()
+        if config is not None:
+            # Dedicated process: also use the configured scheduler
+            # for (lazy) results that are computed outside of `execute`/`decode_data`.
+            dask.config.set(config)
+
     def list_processes(self):
-        return map(lambda process: process.spec, registry.values())
+        return [_get_spec(name) for name in _get_implementation_names()]
 
     def execute(self, id, arguments):
+        if self._prefetched and _get_scalar_signature(arguments):
+            key = call_key(id, arguments)
+            if key in self._prefetched:
+                return self._prefetched.pop(key)
         callable = registry[id].implementation
-        return callable(**arguments)
+        with self._scheduler_context():
+            return callable(**arguments)
+
+    def get_prefetch_size(self) -> int:
+        return _VECTORIZE_PREFETCH_SIZE if self.vectorize else 0
+
+    def prefetch(self, calls: List[ProcessCall]):
+        if not self.vectorize:
+            return
+        groups: Dict[tuple, Dict[str, Dict]] = collections.defaultdict(dict)
+        for call in calls:
+            # Note: calls that expect an exception are executed on their own
+            signature = _get_scalar_signature(call.arguments)
+            if call.throws or signature is None:
+                continue
+            key = call_key(call.process_id, call.arguments)
+            if key not in self._prefetched:
+                groups[(call.process_id, signature)][key] = call.arguments
+        for (process_id, _), group in groups.items():
+            if len(group) > 1:
+                self._execute_vectorized(process_id, group)
+
+    def _execute_vectorized(self, process_id: str, group: Dict[str, Dict]):
+        """
+        Execute a group of process calls (by call key) with the same scalar argument signature
+        as a single call with numpy arrays, and keep the element-wise results.
+        If the process implementation can not be vectorized
+        (e.g. it fails, or does not return an array with one result per call),
+        the calls are left to be executed one by one,
+        as well as calls with a non-finite result for finite arguments (e.g. division by zero).
+        """
+        keys = list(group.keys())
+        arguments = {}
+        for name in group[keys[0]]:
+            values = [group[key][name] for key in keys]
+            # Note: arguments with the same value for all calls (e.g. `min` and `max` of `clip`)
+            # are kept scalar, as implementations don't necessarily support arrays for them.
+            same = all(v == values[0] for v in values)
+            arguments[name] = values[0] if same else np.array(values)
+        try:
+            results = self._execute_array(process_id, arguments)
+            if results.shape != (len(keys),) or results.dtype.hasobject:
+                raise ValueError(f"Unexpected result shape {results.shape}")
+            if results.dtype.kind in "iu":
+                # Note: numpy integer arithmetic silently wraps around on overflow (unlike Python ints):
+                # cross-check all results against a float execution (exact up to 2**53, approximate beyond)
+                as_float = {
+                    name: np.asarray(value, dtype=np.float64)
+                    if type(value) is int
+                    or (isinstance(value, np.ndarray) and value.dtype.kind in "iu")
+                    else value
+                    for name, value in arguments.items()
+                }
+                float_results = self._execute_array(process_id, as_float)
+                if not np.allclose(results, float_results, rtol=1e-9, atol=0):
+                    raise ValueError("Integer overflow")
+            # Calls with non-finite results from finite inputs (e.g. division by zero)
+            # might raise an error in a regular execution: leave them to be executed on their own
+            keep = [
+                i
+                for i, key in enumerate(keys)
+                if np.isfinite(results[i])
+                or not all(math.isfinite(v) for v in group[key].values())
+            ]
+            if not keep:
+                raise ValueError("No finite results")
+            # Sanity check of the vectorized form against a regular execution
+            first = keep[0]
+            expected = self.decode_data(
+                self.execute(process_id, group[keys[first]]), expected=None
+            )
+            actual = self.decode_data(results[first], expected=None)
+            # Note: tolerance for differences between scalar and (SIMD) array code paths
+            if not np.isclose(expected, actual, rtol=1e-12, atol=0, equal_nan=True):
+                raise ValueError(f"Vectorized result {actual!r} != {expected!r}")
+        except Exception as e:
+            _log.debug(f"Failed to vectorize {process_id!r}: {e!r}")
+            return
+        _log.debug(f"Vectorized {len(keep)} executions of {process_id!r}")
+        self._prefetched.update((keys[i], results[i]) for i in keep)
+
+    def _execute_array(self, process_id: str, arguments: Dict) -> np.ndarray:
+        """Execute process with (numpy array) arguments and compute the result."""
+        callable = registry[process_id].implementation
+        with self._scheduler_context(), np.errstate(all="ignore"):
+            results = callable(**arguments)
+            if isinstance(results, dask.array.core.Array):
+                results = results.compute()
+        return np.asarray(results)
+
+    def get_backend_id(self) -> str:
+        backend_id = f"openeo-processes-dask {importlib.metadata.version('openeo-processes-dask')}"
+        if self.scheduler is not None:
+            backend_id += f" ({self.scheduler} scheduler)"
+        return backend_id
 
     def encode_process_graph(
         self, process, parent_process_id=None, parent_parameter=None
     ):
-        parsed = OpenEOProcessGraph(pg_data=process)
+        parsed = _parse_process_graph(
+            process,
+            parent_process_id=parent_process_id,
+            parent_parameter=parent_parameter,
+        )
         return parsed.to_callable(process_registry=registry)
 
     def encode_datacube(self, data):
@@ -81,11 +455,13 @@ class Dask(ProcessTestRunner):
         return data
 
     def decode_data(self, data, expected):
-        if isinstance(data, dask.array.core.Array):
-            data = data.compute()
+        # Note: (lazy) xarray data is also computed while converting it to a datacube
+        with self._scheduler_context():
+            if isinstance(data, dask.array.core.Array):
+                data = data.compute()
 
-        data = numpy_to_native(data, expected)
-        data = xarray_to_datacube(data)
+            data = numpy_to_native(data, expected)
+            data = xarray_to_datacube(data)
 
         return data
 
@@ -0,0 +1,131 @@
+"""
+Deduplication of process executions of a `ProcessTestRunner`:
+process calls with canonically identical arguments
+(e.g. from different process tests, or repeated across levels and experimental variants)
+are only executed once per test session, and their result is shared.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from openeo_test_suite.lib.caching import LruCache
+from openeo_test_suite.lib.process_runner.base import (
+    ProcessCall,
+    ProcessTestRunner,
+    WrappingRunner,
+)
+from openeo_test_suite.lib.process_runner.util import canonicalize
+
+_log = logging.getLogger(__name__)
+
+# Process calls with arguments or results larger than this (e.g. large arrays or datacubes)
+# are not deduplicated: they are unlikely to be repeated, and expensive to hash or copy.
+_MAX_NBYTES = 16 * 1024**2
+
+
+class ExecutionCache(LruCache):
+    """
+    Thread-safe LRU cache of process execution results (or raised exceptions), by call key,
+    with hit/miss statistics.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        super().__init__(max_size=max_size)
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[Exception]]]:
+        return super().get(key)
+
+    def set(self, key: str, result: Any = None, exception: Optional[Exception] = None):
+        super().set(key, (result, exception))
+
+
+def _get_nbytes(value: Any) -> int:
+    """(Estimated) size of the array and list data in process arguments or results."""
+    # Note: duck typed (numpy, xarray and dask arrays), as dask is an optional dependency
+    if isinstance(getattr(value, "nbytes", None), int) and hasattr(value, "shape"):
+        return value.nbytes
+    elif isinstance(value, dict):
+        return sum(_get_nbytes(v) for v in value.values())
+    elif isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (bool, int, float, type(None))):
+            # Note: plain lists of numbers (e.g. of the scaled-up process tests) are estimated
+            # as (float64) arrays, without visiting each element
+            return len(value) * 8
+        return sum(_get_nbytes(v) for v in value)
+    return 0
+
+
+_execution_cache = ExecutionCache()
+
+
+def get_execution_cache() -> ExecutionCache:
+    return _execution_cache
+
+
+class DedupingRunner(WrappingRunner):
+    """
+    Wrapper around a `ProcessTestRunner` to execute each unique process call
+    (process id and canonical hash of the encoded arguments) only once,
+    and share the result (or exception) among all tests that need it.
+
+    Results are handed out as (deep) copies, so that in-place modifications
+    (e.g. while preparing the results for comparison) can not affect other tests.
+    """
+
+    def __init__(
+        self, runner: ProcessTestRunner, cache: Optional[ExecutionCache] = None
+    ):
+        super().__init__(runner)
+        self.cache = cache if cache is not None else get_execution_cache()
+
+    def _key(self, id: str, arguments: Dict) -> str:
+        canonical = json.dumps(
+            [
+                self.backend_id,
+                id,
+                canonicalize(arguments, self._encoded_process_graphs),
+            ],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def execute(self, id, arguments):
+        if _get_nbytes(arguments) > _MAX_NBYTES:
+            self._encoded_process_graphs.clear()
+            return self.runner.execute(id, arguments)
+
+        key = self._key(id, arguments)
+        self._encoded_process_graphs.clear()
+        entry = self.cache.get(key)
+        if entry is not None:
+            result, exception = entry
+            if exception is not None:
+                raise exception
+            return copy.deepcopy(result)
+
+        try:
+            result = self.runner.execute(id, arguments)
+        except Exception as e:
+            # Note: only regular exceptions are shared (not e.g. skips or failures from pytest)
+            self.cache.set(key, exception=e)
+            raise
+        if _get_nbytes(result) > _MAX_NBYTES:
+            # Not shared: no need for a defensive copy
+            return result
+        self.cache.set(key, result=result)
+        return copy.deepcopy(result)
+
+    def prefetch(self, calls: List[ProcessCall]):
+        # Only announce calls without (shared) result yet
+        self.runner.prefetch(
+            [
+                c
+                for c in calls
+                if _get_nbytes(c.arguments) > _MAX_NBYTES
+                or self._key(c.process_id, c.arguments) not in self.cache
+            ]
+        )
@@ -1,14 +1,70 @@
-from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import requests
+import requests.adapters
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.util import call_key
+
+_log = logging.getLogger(__name__)
 
 
 class Http(ProcessTestRunner):
-    def __init__(self, connection):
+    def __init__(self, connection, batch_size: int = 1, concurrency: int = 1):
+        """
+        :param connection: openeo connection
+        :param batch_size: maximum number of (prefetched) process executions
+            to combine in a single synchronous processing request.
+            Batching is disabled with a batch size of 1.
+        :param concurrency: maximum number of concurrent processing requests
+            for prefetched process executions.
+            Concurrent execution is disabled with a concurrency of 1.
+        """
         self.connection = connection
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        # Results of prefetched process executions (by call key)
+        self._prefetched: Dict[str, Future] = {}
+        self._supports_batching = None
+        self._executor = None
+        if concurrency > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix="openeo-http-runner"
+            )
+            self._setup_connection_pool(concurrency)
+
+    def _setup_connection_pool(self, size: int):
+        """Make sure the connection can keep enough connections alive for concurrent requests."""
+        session = getattr(self.connection, "session", None)
+        if not isinstance(session, requests.Session):
+            return
+        for prefix, adapter in list(session.adapters.items()):
+            if isinstance(adapter, requests.adapters.HTTPAdapter):
+                session.mount(
+                    prefix,
+                    requests.adapters.HTTPAdapter(
+                        pool_maxsize=size, max_retries=adapter.max_retries
+                    ),
+                )
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._prefetched.clear()
 
     def list_processes(self):
         return self.connection.list_processes()
 
     def execute(self, id, arguments):
+        future = self._prefetched.pop(call_key(id, arguments), None)
+        if future is not None:
+            return future.result()
+        return self._execute_single(id, arguments)
+
+    def _execute_single(self, id, arguments):
         process = {
             "process_graph": {
                 "node": {
@@ -20,5 +76,107 @@ class Http(ProcessTestRunner):
         }
         return self.connection.execute(process)
 
+    def get_backend_id(self) -> str:
+        capabilities = self.connection.capabilities()
+        return f"{self.connection.root_url} {capabilities.get('backend_version')}"
+
+    def get_prefetch_size(self) -> int:
+        size = max(self.batch_size, 1) * max(self.concurrency, 1)
+        return size if size > 1 else 0
+
+    def _can_batch(self) -> bool:
+        if self._supports_batching is None:
+            try:
+                process_ids = {p["id"] for p in self.list_processes()}
+                self._supports_batching = "array_create" in process_ids
+            except Exception as e:
+                _log.warning(f"Failed to list processes, disabling batching: {e!r}")
+                self._supports_batching = False
+        return self._supports_batching
+
+    def prefetch(self, calls: List[ProcessCall]):
+        batching = self.batch_size > 1 and self._can_batch()
+        if not batching and not self._executor:
+            return
+
+        batch = []
+        singles = []
+        for call in calls:
+            key = call_key(call.process_id, call.arguments)
+            if key in self._prefetched:
+                continue
+            future = Future()
+            if batching and not call.throws:
+                batch.append((call, future))
+            elif self._executor:
+                # Tests that expect an exception would make the whole batch fail:
+                # execute them on their own.
+                singles.append((call, future))
+            else:
+                continue
+            self._prefetched[key] = future
+
+        jobs = [
+            batch[i : i + self.batch_size]
+            for i in range(0, len(batch), self.batch_size)
+        ]
+        jobs.extend([single] for single in singles)
+        for job in jobs:
+            if self._executor:
+                self._executor.submit(self._execute_batch, job)
+            else:
+                self._execute_batch(job)
+
+    def _execute_batch(self, batch: List[tuple]):
+        """
+        Execute multiple process calls in a single processing request:
+        one node per call, with the results combined by `array_create`.
+        Falls back on executing the calls one by one
+        if the batch fails as a whole (e.g. due to an unexpected error in one of the calls,
+        or results that can not be combined in an array).
+        """
+        try:
+            self._execute_batch_or_single(batch)
+        except Exception as e:
+            # Avoid waiting forever in `execute` on results that never come
+            _log.exception(
+                f"Failed to execute batch of {len(batch)} process executions"
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _execute_batch_or_single(self, batch: List[tuple]):
+        if len(batch) > 1:
+            process_graph = {
+                f"node{i}": {"process_id": call.process_id, "arguments": call.arguments}
+                for i, (call, _) in enumerate(batch)
+            }
+            process_graph["batch"] = {
+                "process_id": "array_create",
+                "arguments": {
+                    "data": [{"from_node": f"node{i}"} for i in range(len(batch))]
+                },
+                "result": True,
+            }
+            try:
+                results = self.connection.execute({"process_graph": process_graph})
+                if not isinstance(results, list) or len(results) != len(batch):
+                    raise ValueError(f"Unexpected batch result {results!r}")
+            except Exception as e:
+                _log.info(
+                    f"Batch of {len(batch)} process executions failed ({e!r}), falling back to single execution"
+                )
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                return
+
+        for call, future in batch:
+            try:
+                future.set_result(self._execute_single(call.process_id, call.arguments))
+            except Exception as e:
+                future.set_exception(e)
+
     def is_json_only(self) -> bool:
         return True
@@ -0,0 +1,403 @@
+"""
+Process isolation for local runners (e.g. `dask` and `vito`):
+execute processes in a pool of (pre-warmed) worker processes,
+with per-test timeouts, memory limits and automatic worker recycling,
+so that a runaway process implementation can not hang or exhaust the whole test session.
+"""
+
+import atexit
+import functools
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import pytest
+
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.util import PicklableException, call_key
+
+_log = logging.getLogger(__name__)
+
+# Exit code of a worker process that exceeded its memory limit
+MEMORY_LIMIT_EXIT_CODE = 75
+
+
+def parse_memory_size(size: str) -> int:
+    """Parse memory size (e.g. "512MB", "2GB" or number of bytes) to number of bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]i?B?)?\s*", size, flags=re.I)
+    if not match:
+        raise ValueError(f"Invalid memory size {size!r}")
+    value, unit = match.groups()
+    unit = (unit or "B").upper().rstrip("B").rstrip("I")
+    factor = 1024 ** ["", "K", "M", "G", "T"].index(unit)
+    return int(float(value) * factor)
+
+
+class EncodedArgument(NamedTuple):
+    """
+    Process argument to encode (with given `ProcessTestRunner` method) in the worker process,
+    as encoded arguments (e.g. callables for process graphs) can generally not be transferred
+    between processes.
+    """
+
+    method: str
+    args: tuple
+
+
+def _contains_encoded(value: Any) -> bool:
+    if isinstance(value, EncodedArgument):
+        return True
+    elif isinstance(value, dict):
+        return any(_contains_encoded(v) for v in value.values())
+    elif isinstance(value, list):
+        return any(_contains_encoded(v) for v in value)
+    return False
+
+
+def _encode(runner: ProcessTestRunner, value: Any) -> Any:
+    """Encode (nested) `EncodedArgument`s with given runner."""
+    if isinstance(value, EncodedArgument):
+        args = [_encode(runner, a) for a in value.args]
+        return getattr(runner, value.method)(*args)
+    elif isinstance(value, dict):
+        return {k: _encode(runner, v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_encode(runner, v) for v in value]
+    return value
+
+
+def _get_rss() -> int:
+    """Resident set size (in bytes) of the current process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Fallback (e.g. on macOS): peak resident set size
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _start_memory_watchdog(memory_limit: int, interval: float = 0.05):
+    def watch():
+        while True:
+            if _get_rss() > memory_limit:
+                os._exit(MEMORY_LIMIT_EXIT_CODE)
+            time.sleep(interval)
+
+    threading.Thread(target=watch, name="memory-watchdog", daemon=True).start()
+
+
+def _picklable(exception: Exception) -> Any:
+    try:
+        pickle.dumps(exception)
+        return exception
+    except Exception:
+        return PicklableException(exception)
+
+
+def _materialize(result: Any) -> Any:
+    """Compute lazy results (e.g. dask arrays) in the worker process."""
+    compute = getattr(result, "compute", None)
+    return compute() if callable(compute) else result
+
+
+def _worker_main(
+    connection,
+    runner_class: Type[ProcessTestRunner],
+    runner_kwargs: dict,
+    memory_limit: Optional[int],
+):
+    """Main loop of a worker process: execute processes received over the connection."""
+    if memory_limit:
+        _start_memory_watchdog(memory_limit)
+    runner = runner_class(**runner_kwargs)
+    runner.warm_up()
+    connection.send(("ready", None))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        id, arguments = message
+        try:
+            arguments = _encode(runner, arguments)
+        except Exception as e:
+            connection.send(("encode-error", _picklable(e)))
+            continue
+        try:
+            result = _materialize(runner.execute(id, arguments))
+        except Exception as e:
+            connection.send(("error", _picklable(e)))
+            continue
+        try:
+            connection.send(("result", result))
+        except Exception as e:
+            connection.send(("error", _picklable(e)))
+
+
+class _WorkerFailure(Exception):
+    """The worker process timed out, exceeded its memory limit or died otherwise."""
+
+
+class _Worker:
+    """Handle on a worker process."""
+
+    def __init__(self, context, runner_class, runner_kwargs, memory_limit):
+        self._connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, runner_class, runner_kwargs, memory_limit),
+            name="openeo-isolated-runner",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.ready = False
+        self.tasks = 0
+
+    def _receive(self, timeout: Optional[float]) -> Tuple[str, Any]:
+        if not self._connection.poll(timeout):
+            raise _WorkerFailure(f"Timeout: no result within {timeout}s")
+        try:
+            return self._connection.recv()
+        except (EOFError, OSError):
+            self.process.join(timeout=1)
+            if self.process.exitcode == MEMORY_LIMIT_EXIT_CODE:
+                raise _WorkerFailure("Worker process exceeded its memory limit")
+            raise _WorkerFailure(
+                f"Worker process died (exit code {self.process.exitcode})"
+            )
+
+    def execute(self, id: str, arguments: Dict, timeout: Optional[float]):
+        """Execute process in the worker process, return (kind, result or exception)."""
+        if not self.ready:
+            # Note: warm-up is not included in the timeout.
+            self._receive(timeout=None)
+            self.ready = True
+        self.tasks += 1
+        try:
+            self._connection.send((id, arguments))
+        except (BrokenPipeError, OSError):
+            return self._receive(timeout=0)
+        return self._receive(timeout=timeout)
+
+    def close(self):
+        try:
+            self._connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self._connection.close()
+
+
+class _WorkerPool:
+    def __init__(
+        self,
+        runner_class: Type[ProcessTestRunner],
+        runner_kwargs: dict,
+        size: int,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        max_tasks: Optional[int] = None,
+    ):
+        self._context = multiprocessing.get_context("spawn")
+        self._runner_class = runner_class
+        self._runner_kwargs = runner_kwargs
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks = max_tasks
+        # Start (and pre-warm) the workers right away
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._start_worker())
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="openeo-isolated-runner"
+        )
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(
+            context=self._context,
+            runner_class=self._runner_class,
+            runner_kwargs=self._runner_kwargs,
+            memory_limit=self.memory_limit,
+        )
+
+    def submit(self, id: str, arguments: Dict) -> Future:
+        return self._executor.submit(self._execute, id, arguments)
+
+    def _execute(self, id: str, arguments: Dict) -> Any:
+        worker = self._idle.get()
+        recycle = False
+        try:
+            kind, value = worker.execute(id, arguments, timeout=self.timeout)
+        except _WorkerFailure as e:
+            recycle = True
+            # Not a process exception (that could satisfy a test that expects one): fail the test
+            pytest.fail(f"Process {id!r} failed in isolated worker process: {e}")
+        finally:
+            if recycle or (self.max_tasks and worker.tasks >= self.max_tasks):
+                _log.info(f"Recycling worker process {worker.process.pid}")
+                worker.close()
+                worker = self._start_worker()
+            self._idle.put(worker)
+
+        if isinstance(value, PicklableException):
+            value = value.to_exception()
+        if kind == "result":
+            return value
+        elif kind == "encode-error":
+            pytest.fail(f"Failed to encode arguments of process {id!r}: {value!r}")
+        raise value
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while not self._idle.empty():
+            self._idle.get().close()
+
+
+@functools.lru_cache
+def _get_worker_pool(
+    runner_class: Type[ProcessTestRunner],
+    runner_kwargs: Tuple[Tuple[str, Any], ...],
+    size: int,
+    timeout: Optional[float],
+    memory_limit: Optional[int],
+    max_tasks: Optional[int],
+) -> _WorkerPool:
+    """Get worker pool (shared for the whole session, closed at exit)."""
+    pool = _WorkerPool(
+        runner_class=runner_class,
+        runner_kwargs=dict(runner_kwargs),
+        size=size,
+        timeout=timeout,
+        memory_limit=memory_limit,
+        max_tasks=max_tasks,
+    )
+    atexit.register(pool.close)
+    return pool
+
+
+class IsolatedRunner(ProcessTestRunner):
+    """
+    Wrapper around a local `ProcessTestRunner` to execute processes
+    in a pool of worker processes (each with its own instance of the runner).
+
+    Arguments are encoded in the worker process (see `EncodedArgument`)
+    and lazy results are computed there,
+    while decoding results is still done in the test process (through `decode_data`).
+    Upcoming process executions are distributed over the workers through prefetching.
+    """
+
+    def __init__(
+        self,
+        runner_class: Type[ProcessTestRunner],
+        runner_kwargs: Optional[dict] = None,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        max_tasks: Optional[int] = None,
+    ):
+        """
+        :param runner_class: local runner class (to instantiate in the test and worker processes)
+        :param runner_kwargs: constructor arguments of the runner
+        :param workers: number of worker processes
+        :param timeout: maximum execution time (in seconds) per process execution
+        :param memory_limit: maximum resident memory (in bytes) per worker process
+        :param max_tasks: maximum number of process executions per worker process
+            before it is replaced by a fresh one
+        """
+        runner_kwargs = runner_kwargs or {}
+        self.runner = runner_class(**runner_kwargs)
+        self.workers = workers
+        self._pool = _get_worker_pool(
+            runner_class=runner_class,
+            runner_kwargs=tuple(sorted(runner_kwargs.items())),
+            size=workers,
+            timeout=timeout,
+            memory_limit=memory_limit,
+            max_tasks=max_tasks,
+        )
+        self._prefetched: Dict[str, Future] = {}
+
+    def _is_implemented(self, method: str) -> bool:
+        return getattr(type(self.runner), method) is not getattr(
+            ProcessTestRunner, method
+        )
+
+    def list_processes(self) -> List[Dict]:
+        return self.runner.list_processes()
+
+    def execute(self, id, arguments):
+        future = self._prefetched.pop(call_key(id, arguments), None)
+        if future is None:
+            future = self._pool.submit(id, arguments)
+        return future.result()
+
+    def get_backend_id(self) -> str:
+        return self.runner.get_backend_id()
+
+    def get_prefetch_size(self) -> int:
+        return self.workers if self.workers > 1 else 0
+
+    def prefetch(self, calls: List[ProcessCall]):
+        for call in calls:
+            key = call_key(call.process_id, call.arguments)
+            if key not in self._prefetched:
+                self._prefetched[key] = self._pool.submit(
+                    call.process_id, call.arguments
+                )
+
+    def encode_process_graph(
+        self, process: Dict, parent_process_id=None, parent_parameter=None
+    ) -> Any:
+        return EncodedArgument(
+            "encode_process_graph", (process, parent_process_id, parent_parameter)
+        )
+
+    def encode_labeled_array(self, data: Dict) -> Any:
+        if not self._is_implemented("encode_labeled_array"):
+            # Fail (or skip) early, in the test process.
+            return self.runner.encode_labeled_array(data)
+        return EncodedArgument("encode_labeled_array", (data,))
+
+    def encode_datacube(self, data: Dict) -> Any:
+        if not self._is_implemented("encode_datacube"):
+            return self.runner.encode_datacube(data)
+        return EncodedArgument("encode_datacube", (data,))
+
+    def encode_data(self, data: Any) -> Any:
+        if _contains_encoded(data):
+            return EncodedArgument("encode_data", (data,))
+        return self.runner.encode_data(data)
+
+    def decode_data(self, data: Any, expected: Any) -> Any:
+        return self.runner.decode_data(data, expected)
+
+    def is_json_only(self) -> bool:
+        return self.runner.is_json_only()
+
+    def get_nodata_value(self) -> Any:
+        return self.runner.get_nodata_value()
+
+    def close(self):
+        # Note: the worker pool itself is shared for the whole session (and closed at exit)
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+        self.runner.close()
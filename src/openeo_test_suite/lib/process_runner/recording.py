@@ -0,0 +1,135 @@
+"""
+Record/replay of process executions (and process listings) of a `ProcessTestRunner`,
+e.g. to iterate on result comparison logic or process test expectations
+without hitting the backend again.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Union
+
+import pytest
+
+from openeo_test_suite.lib.caching import PersistentCache, get_persistent_cache
+from openeo_test_suite.lib.process_runner.base import (
+    ProcessCall,
+    ProcessTestRunner,
+    WrappingRunner,
+)
+from openeo_test_suite.lib.process_runner.util import PicklableException, canonicalize
+
+_log = logging.getLogger(__name__)
+
+MODES = ["off", "record", "replay", "update"]
+NAMESPACE = "process-recordings"
+
+
+class RecordingRunner(WrappingRunner):
+    """
+    Wrapper around a `ProcessTestRunner` to record or replay
+    the results of process executions.
+
+    Results are stored in a content-addressed store,
+    keyed on the backend (see `ProcessTestRunner.get_backend_id`, which includes the backend version),
+    the process id and a canonical hash of the (encoded) arguments.
+
+    Modes:
+    - "record": always execute and store the results
+    - "replay": only serve stored results (skip the test if there is none)
+    - "update": serve stored results, execute (and store) what is missing,
+      e.g. because the arguments or the backend version changed
+    """
+
+    def __init__(self, runner: ProcessTestRunner, store: PersistentCache, mode: str):
+        if mode not in ["record", "replay", "update"]:
+            raise ValueError(f"Invalid recording mode {mode!r}")
+        super().__init__(runner)
+        self.store = store
+        self.mode = mode
+
+    def _canonical(self, value: Any) -> Any:
+        return canonicalize(value, encoded_process_graphs=self._encoded_process_graphs)
+
+    def _key(self, *parts: Any) -> str:
+        canonical = json.dumps(
+            [self.backend_id, *(self._canonical(p) for p in parts)],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return PersistentCache.make_key(canonical)
+
+    def list_processes(self) -> List[Dict]:
+        key = self._key("list_processes")
+        if self.mode in ["replay", "update"]:
+            processes = self.store.get(key)
+            if processes is not None:
+                return processes
+            if self.mode == "replay":
+                pytest.skip("No recorded process listing to replay")
+        processes = list(self.runner.list_processes())
+        self.store.set(key, processes)
+        return processes
+
+    def execute(self, id, arguments):
+        key = self._key("execute", id, arguments)
+        self._encoded_process_graphs.clear()
+        if self.mode in ["replay", "update"]:
+            recorded = self.store.get(key)
+            if recorded is not None:
+                (result,) = recorded
+                if isinstance(result, PicklableException):
+                    raise result.to_exception()
+                return result
+            if self.mode == "replay":
+                pytest.skip(f"No recorded result to replay for process {id}")
+
+        try:
+            result = self.runner.execute(id, arguments)
+        except Exception as e:
+            self.store.set(key, (PicklableException(e),))
+            raise
+        # Note: wrapped in a tuple to distinguish a recorded `None` result from a missing one
+        self.store.set(key, (result,))
+        return result
+
+    def get_prefetch_size(self) -> int:
+        return 0 if self.mode == "replay" else self.runner.get_prefetch_size()
+
+    def prefetch(self, calls: List[ProcessCall]):
+        if self.mode == "replay":
+            return
+        if self.mode == "update":
+            calls = [
+                c
+                for c in calls
+                if self.store.get(self._key("execute", c.process_id, c.arguments))
+                is None
+            ]
+        self.runner.prefetch(calls)
+
+
+def get_recording_runner(
+    runner: ProcessTestRunner, mode: str, store: Union[PersistentCache, None]
+) -> ProcessTestRunner:
+    """Wrap given runner for recording/replay according to given mode (if not "off")."""
+    if mode == "off":
+        return runner
+    if store is None:
+        raise RuntimeError(
+            "Recording/replay of process executions requires a store directory:"
+            " specify it with `--process-recording-dir` or enable persistent caching."
+        )
+    _log.info(f"Process execution recording mode {mode!r} with store {store.root}")
+    return RecordingRunner(runner=runner, store=store, mode=mode)
+
+
+def get_recording_store(config: pytest.Config) -> Union[PersistentCache, None]:
+    """
+    Get store for recorded process executions from pytest config (CLI options),
+    with fallback to the persistent cache directory.
+    """
+    if config.getoption("--process-recording-dir"):
+        return PersistentCache(
+            root=config.getoption("--process-recording-dir"), namespace=NAMESPACE
+        )
+    return get_persistent_cache(NAMESPACE)
@@ -1,13 +1,30 @@
+import functools
+import hashlib
+import json
+import logging
+import math
+import pickle
 import re
-from datetime import datetime, timezone
-from typing import Union
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import xarray as xr
 from dateutil.parser import isoparse
 from pandas import Timestamp
 
+from openeo_test_suite.lib.external_references import load_ref
+from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
+
+_log = logging.getLogger(__name__)
+
 ISO8601_REGEX = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"
+# ISO 8601 datetime with (optional) fractional seconds (up to microseconds) and timezone,
+# as group for the local datetime (without timezone) that numpy can parse directly
+_ISO8601_LOCAL_REGEX = re.compile(
+    r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)(?:Z|[+-]\d{2}(?::?\d{2})?)?"
+)
 
 
 def numpy_to_native(data, expected):
@@ -27,22 +44,16 @@ def numpy_to_native(data, expected):
 
 
 def datacube_to_xarray(cube):
+    if isinstance(cube, xr.DataArray):
+        # Already loaded (e.g. from NetCDF or Zarr)
+        return cube
+
     coords = []
     crs = None
     for name in cube["order"]:
         dim = cube["dimensions"][name]
         if dim["type"] == "temporal":
-            values = [
-                isostr_to_datetime(date, fail_on_error=False) for date in dim["values"]
-            ]
-            # Verify that the values are all datetimes, otherwise likely the tests are invalid
-            if all(isinstance(date, datetime) for date in values):
-                # Ot looks like xarray does not support creating proper time dimensions from datetimes,
-                # so we convert to np.datetime64 explicitly.
-                # np.datetime64 doesn't like timezone-aware datetimes, so we remove the timezone.
-                values = [np.datetime64(dt.replace(tzinfo=None), "ns") for dt in values]
-            else:
-                raise Exception("Mixed datetime types in temporal dimension")
+            values = isostrs_to_datetime64(dim["values"])
         elif dim["type"] == "spatial":
             values = dim["values"]
             if "reference_system" in dim:
@@ -52,6 +63,7 @@ def datacube_to_xarray(cube):
 
         coords.append((name, values))
 
+    # Note: numpy arrays (e.g. memory-mapped from `.npy` files) are used as-is, without copying
     da = xr.DataArray(cube["data"], coords=coords)
     if crs is not None:
         da.attrs["crs"] = crs  # todo: non-standardized
@@ -75,7 +87,7 @@ def xarray_to_datacube(data):
         dtype = data.coords[c].dtype
         if np.issubdtype(dtype, np.datetime64) or isinstance(dtype, Timestamp):
             type = "temporal"
-            values = [datetime_to_isostr(date) for date in data.coords[c].values]
+            values = datetimes_to_isostrs(data.coords[c].values)
         else:
             values = data.coords[c].values.tolist()
             if c == "x":  # todo: non-standardized
@@ -123,14 +135,61 @@ def isostr_to_datetime(dt: str, fail_on_error=True) -> Union[datetime, str]:
             )
 
 
+def isostrs_to_datetime64(values: List[str]) -> np.ndarray:
+    """
+    Convert ISO 8601 datetime strings to a `datetime64[ns]` array (in bulk).
+    The timezone is dropped (not converted), as `np.datetime64` doesn't support timezones.
+    """
+    # Note: label sets are typically repeated (e.g. across the examples of a process)
+    try:
+        values = tuple(values)
+        hash(values)
+    except TypeError:
+        return _isostrs_to_datetime64(values)
+    return _cached_isostrs_to_datetime64(values).copy()
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_isostrs_to_datetime64(values: Tuple[str]) -> np.ndarray:
+    return _isostrs_to_datetime64(values)
+
+
+def _isostrs_to_datetime64(values) -> np.ndarray:
+    local = []
+    for value in values:
+        match = (
+            _ISO8601_LOCAL_REGEX.fullmatch(value) if isinstance(value, str) else None
+        )
+        if not match:
+            break
+        local.append(match.group(1))
+    else:
+        try:
+            return np.array(local, dtype="datetime64[ns]")
+        except ValueError:
+            pass
+
+    # Fallback for less common formats (e.g. "+0100" offsets or "24:00:00")
+    parsed = [isostr_to_datetime(value, fail_on_error=False) for value in values]
+    # Verify that the values are all datetimes, otherwise likely the tests are invalid
+    if not all(isinstance(dt, datetime) for dt in parsed):
+        raise Exception("Mixed datetime types in temporal dimension")
+    return np.array([dt.replace(tzinfo=None) for dt in parsed], dtype="datetime64[ns]")
+
+
+def datetimes_to_isostrs(values: Union[np.ndarray, List]) -> List[str]:
+    """Convert datetimes (e.g. a `datetime64` array) to ISO 8601 strings (in bulk)."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime_as_string(values, unit="s", timezone="UTC").tolist()
+    return [datetime_to_isostr(dt) for dt in values]
+
+
 def datetime_to_isostr(dt):
     if isinstance(dt, Timestamp):
         dt_object = dt.to_pydatetime()
     elif isinstance(dt, np.datetime64):
-        # Convert numpy.datetime64 to timestamp (in seconds)
-        timestamp = dt.astype("datetime64[s]").astype(int)
-        # Create a datetime object from the timestamp
-        dt_object = datetime.utcfromtimestamp(timestamp).replace(tzinfo=timezone.utc)
+        return str(np.datetime_as_string(dt, unit="s", timezone="UTC"))
     elif isinstance(dt, datetime):
         dt_object = dt
     elif re.match(ISO8601_REGEX, dt):
@@ -140,3 +199,188 @@ def datetime_to_isostr(dt):
 
     # Convert to ISO format string
     return dt_object.isoformat().replace("+00:00", "Z")
+
+
+def canonicalize(value: Any, encoded_process_graphs: Dict[int, tuple]) -> Any:
+    """
+    Canonical (JSON serializable) representation of (encoded) process arguments,
+    e.g. to hash them in a stable way.
+    Large arrays are represented by a hash of their data,
+    and encoded callbacks by their process graph
+    (looked up by id of the encoded object in `encoded_process_graphs`, mapping to an `(encoded, process)` tuple).
+    """
+    if isinstance(value, dict):
+        return {
+            str(k): canonicalize(v, encoded_process_graphs) for k, v in value.items()
+        }
+    elif isinstance(value, (list, tuple)):
+        return [canonicalize(v, encoded_process_graphs) for v in value]
+    elif isinstance(value, xr.DataArray):
+        return {
+            "dataarray": list(value.dims),
+            "coords": {
+                str(k): canonicalize(c.values, encoded_process_graphs)
+                for k, c in value.coords.items()
+            },
+            "data": canonicalize(value.values, encoded_process_graphs),
+            "attrs": canonicalize(value.attrs, encoded_process_graphs),
+        }
+    elif isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        if data.dtype.hasobject:
+            return {"ndarray": canonicalize(data.tolist(), encoded_process_graphs)}
+        return {
+            "ndarray": data.dtype.str,
+            "shape": list(data.shape),
+            "sha256": hashlib.sha256(data.tobytes()).hexdigest(),
+        }
+    elif isinstance(value, float) and not math.isfinite(value):
+        return {"float": repr(value)}
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif id(value) in encoded_process_graphs:
+        return {"process_graph": encoded_process_graphs[id(value)][1]}
+    else:
+        return {"repr": repr(value)}
+
+
+def call_key(id: str, arguments: Dict) -> str:
+    """
+    Key of a process call (process id and arguments),
+    e.g. to match executions with results of prefetched ones.
+    Non-JSON argument values (e.g. numpy arrays) are represented by a hash of their pickled representation.
+    """
+
+    def default(value):
+        return {"pickle": hashlib.sha256(pickle.dumps(value)).hexdigest()}
+
+    return json.dumps(
+        {"process_id": id, "arguments": arguments},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=default,
+    )
+
+
+class PicklableException:
+    """
+    Picklable representation of an exception raised by a process execution
+    (e.g. to record it, or to pass it from a worker process).
+    """
+
+    def __init__(self, exception: Exception):
+        self.class_name = type(exception).__name__
+        self.message = str(exception)
+
+    def to_exception(self) -> Exception:
+        # Note: only the class name and message are preserved
+        # (as far as exceptions are inspected in the process tests).
+        return type(self.class_name, (Exception,), {})(self.message)
+
+
+def prepare_arguments(
+    arguments: dict,
+    process_id: str,
+    connection: ProcessTestRunner,
+    file: Optional[Path],
+) -> dict:
+    """
+    Prepare process test arguments (JSON5 representation, with external references)
+    for execution with given runner (internal backend representation).
+    """
+    return {
+        k: _prepare_argument(
+            arg=v, process_id=process_id, name=k, connection=connection, file=file
+        )
+        for k, v in arguments.items()
+    }
+
+
+def _prepare_argument(
+    arg: Union[dict, str, int, float],
+    process_id: str,
+    name: str,
+    connection: ProcessTestRunner,
+    file: Optional[Path],
+):
+    # handle external references to files
+    if isinstance(arg, dict) and "$ref" in arg:
+        arg = load_ref(arg["$ref"], file)
+
+    # handle custom types of data
+    if isinstance(arg, xr.DataArray):
+        # datacubes loaded from binary formats (e.g. NetCDF)
+        arg = connection.encode_datacube(arg)
+    elif isinstance(arg, dict):
+        if "type" in arg:
+            # labeled arrays
+            if arg["type"] == "labeled-array":
+                arg = connection.encode_labeled_array(arg)
+            # datacubes
+            elif arg["type"] == "datacube":
+                arg = connection.encode_datacube(load_data_ref(arg, file))
+            # nodata-values
+            elif arg["type"] == "nodata":
+                arg = connection.get_nodata_value()
+            else:
+                # TODO: raise NotImplementedError?
+                _log.warning(f"Unhandled argument type: {arg}")
+        elif "process_graph" in arg:
+            arg = connection.encode_process_graph(
+                process=arg, parent_process_id=process_id, parent_parameter=name
+            )
+        else:
+            arg = {
+                k: _prepare_argument(
+                    arg=v,
+                    process_id=process_id,
+                    name=name,
+                    connection=connection,
+                    file=file,
+                )
+                for k, v in arg.items()
+            }
+
+    elif isinstance(arg, list):
+        arg = [
+            _prepare_argument(
+                arg=a,
+                process_id=process_id,
+                name=name,
+                connection=connection,
+                file=file,
+            )
+            for a in arg
+        ]
+    elif isinstance(arg, np.ndarray) and connection.is_json_only():
+        # arrays loaded from binary formats (e.g. `.npy`)
+        arg = arg.tolist()
+
+    arg = connection.encode_data(arg)
+
+    if connection.is_json_only():
+        check_non_json_values(arg)
+
+    return arg
+
+
+def load_data_ref(cube: dict, file: Optional[Path]) -> dict:
+    """Resolve external reference for the data of a datacube (e.g. to a binary `.npy` file)"""
+    if isinstance(cube.get("data"), dict) and "$ref" in cube["data"]:
+        cube = {**cube, "data": load_ref(cube["data"]["$ref"], file)}
+    return cube
+
+
+def check_non_json_values(value):
+    # TODO: shouldn't this check be an aspect of Http(ProcessTestRunner)?
+    if isinstance(value, float):
+        if math.isnan(value):
+            raise ValueError("HTTP JSON APIs don't support NaN values")
+        elif math.isinf(value):
+            raise ValueError("HTTP JSON APIs don't support infinity values")
+    elif isinstance(value, dict):
+        for v in value.values():
+            check_non_json_values(v)
+    elif isinstance(value, list):
+        for item in value:
+            check_non_json_values(item)
@@ -1,3 +1,5 @@
+import importlib.metadata
+
 from openeo_driver.ProcessGraphDeserializer import process_registry_2xx
 
 from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
@@ -16,6 +18,9 @@ class Vito(ProcessTestRunner):
         fn = process_registry_2xx.get_function(id)
         return fn(arguments, env=None)
 
+    def get_backend_id(self) -> str:
+        return f"openeo_driver {importlib.metadata.version('openeo_driver')}"
+
     def encode_datacube(self, data):
         return datacube_to_xarray(data)
 
@@ -5,6 +5,7 @@ from typing import Iterable, List, Optional, Union
 
 import pytest
 
+from openeo_test_suite.lib.caching import get_persistent_cache
 from openeo_test_suite.lib.process_registry import ProcessData, ProcessRegistry
 
 _log = logging.getLogger(__name__)
@@ -40,6 +41,11 @@ def set_process_selection_from_config(config: pytest.Config):
     )
 
 
+@functools.lru_cache()
+def _get_process_registry() -> ProcessRegistry:
+    return ProcessRegistry(cache=get_persistent_cache("process-registry"))
+
+
 # TODO: more structural/testable solution for get_selected_processes related caching?
 @functools.lru_cache()
 def get_selected_processes() -> List[ProcessData]:
@@ -52,7 +58,7 @@ def get_selected_processes() -> List[ProcessData]:
     assert isinstance(_process_filters, ProcessFilters)
 
     return list(
-        ProcessRegistry().get_processes_filtered(
+        _get_process_registry().get_processes_filtered(
             process_ids=_process_filters.process_ids,
             process_levels=_process_filters.process_levels,
             experimental=_process_filters.experimental,
@@ -60,6 +66,17 @@ def get_selected_processes() -> List[ProcessData]:
     )
 
 
+@functools.lru_cache()
+def get_selected_processes_with_tests() -> List[ProcessData]:
+    """
+    Like `get_selected_processes`, but with the tests of the processes loaded up front
+    (e.g. in parallel) instead of lazily one by one, e.g. to generate test items from all of them.
+    """
+    processes = get_selected_processes()
+    _get_process_registry().preload_tests(processes)
+    return processes
+
+
 def csv_to_list(
     csv: Union[str, None] = None, *, separator: str = ",", none_on_empty: bool = False
 ) -> Union[List[str], None]:
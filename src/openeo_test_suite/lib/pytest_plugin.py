@@ -1,21 +1,39 @@
 import argparse
+import importlib.util
 import json
 import shlex
 import sys
 from pathlib import Path
+from typing import List
 
 import openeo
 import pytest
 import pytest_metadata.plugin
 
 import openeo_test_suite
+from openeo_test_suite.lib.backend_metadata import get_backend_metadata_store
 from openeo_test_suite.lib.backend_under_test import (
     HttpBackend,
     NoBackend,
     get_backend_url,
+    get_capability_snapshot,
     set_backend_under_test,
 )
+from openeo_test_suite.lib.benchmark import get_benchmark_results, load_baseline
+from openeo_test_suite.lib.caching import CACHE_DIR_ENV_VAR, set_cache_dir_from_config
+from openeo_test_suite.lib.capabilities import (
+    get_capability_cache,
+    get_test_requirements,
+)
+from openeo_test_suite.lib.process_runner.dedupe import get_execution_cache
+from openeo_test_suite.lib.process_runner.recording import MODES
 from openeo_test_suite.lib.process_selection import set_process_selection_from_config
+from openeo_test_suite.lib.scaled_processes import set_scaled_sizes_from_config
+from openeo_test_suite.lib.synthetic_datacubes import (
+    get_scaling_results,
+    set_synthetic_datacubes_from_config,
+)
+from openeo_test_suite.lib.timing import PhaseTimingStats, get_phase_durations
 from openeo_test_suite.lib.version import get_openeo_versions
 
 
@@ -58,6 +76,47 @@ def pytest_addoption(parser: pytest.Parser):
         "By default, experimental processes are ignored.",
     )
 
+    group.addoption(
+        "--suite-cache",
+        type=bool,
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Toggle persistent caching of data that is expensive to construct (e.g. parsed process definitions and tests) across test suite runs. "
+        "Enabled by default.",
+    )
+    group.addoption(
+        "--suite-cache-dir",
+        action="store",
+        default=None,
+        help="Root directory for persistent caches of the test suite, "
+        "e.g. a directory shared between CI runners. "
+        f"Falls back on the `{CACHE_DIR_ENV_VAR}` environment variable, "
+        "and finally on a subdirectory of the pytest cache directory.",
+    )
+    group.addoption(
+        "--backend-metadata-ttl",
+        type=float,
+        action="store",
+        default=3600,
+        help="Time (in seconds) to reuse persistently cached backend metadata "
+        "(e.g. process and collection listings) without revalidating it. "
+        "After that, it is revalidated with a conditional request (ETag/Last-Modified) "
+        "and only downloaded again if it changed. Default: 3600.",
+    )
+
+    group.addoption(
+        "--capability-check",
+        action="store",
+        choices=["off", "skip", "deselect"],
+        default="off",
+        help="Check at test collection time whether the backend under test has the capabilities "
+        "(processes, output file formats, collections) required by each test, "
+        "based on a snapshot of its (unauthenticated) capability listings. "
+        "Tests that can not run are statically skipped ('skip') or deselected ('deselect'), "
+        "so that no fixture setup time is spent on them. "
+        "Disabled ('off') by default.",
+    )
+
     group.addoption(
         "--runner",
         action="store",
@@ -65,6 +124,222 @@ def pytest_addoption(parser: pytest.Parser):
         help="A specific test runner to use for individual process tests. If not provided, uses a default HTTP API runner.",
     )
 
+    group.addoption(
+        "--http-batch-size",
+        type=int,
+        action="store",
+        default=1,
+        help="Individual process testing with the `http` runner: "
+        "maximum number of process tests to combine (through `array_create`) in a single synchronous processing request. "
+        "Process tests that expect an exception are not batched, "
+        "and a failing batch falls back on executing its process tests one by one. "
+        "Default: 1 (no batching).",
+    )
+    group.addoption(
+        "--http-concurrency",
+        type=int,
+        action="store",
+        default=1,
+        help="Individual process testing with the `http` runner: "
+        "maximum number of concurrent processing requests. "
+        "Upcoming process tests are executed ahead of time in a thread pool "
+        "(over a pool of keep-alive connections), "
+        "while results are still checked in the individual tests. "
+        "Default: 1 (no concurrency).",
+    )
+
+    group.addoption(
+        "--dask-scheduler",
+        action="store",
+        choices=["synchronous", "threads", "processes", "distributed"],
+        default=None,
+        help="Individual process testing with the `dask` runner: "
+        "Dask scheduler to execute processes and compute results with: "
+        "'synchronous', 'threads', 'processes' or 'distributed' (a local `distributed` cluster, "
+        "requires the `distributed` package). "
+        "Default: the globally configured (or default) Dask scheduler.",
+    )
+    group.addoption(
+        "--dask-workers",
+        type=int,
+        action="store",
+        default=None,
+        help="Individual process testing with the `dask` runner: "
+        "number of workers (threads, processes or cluster workers) of the Dask scheduler.",
+    )
+    group.addoption(
+        "--dask-memory-limit",
+        action="store",
+        default=None,
+        help="Individual process testing with the `dask` runner: "
+        "memory limit per worker (e.g. '2GB'), only supported with the 'distributed' scheduler.",
+    )
+    group.addoption(
+        "--dask-vectorize",
+        type=bool,
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Individual process testing with the `dask` runner: "
+        "execute upcoming process tests with only scalar arguments (e.g. `add`, `sin`, `clip`) "
+        "in vectorized form: grouped per process and argument types into a single call with NumPy arrays, "
+        "with the element-wise results checked in the individual tests. "
+        "Process tests that expect an exception are executed on their own, "
+        "and processes that can not be vectorized fall back on individual execution. "
+        "Disabled by default.",
+    )
+
+    group.addoption(
+        "--process-isolation-workers",
+        type=int,
+        action="store",
+        default=0,
+        help="Individual process testing with the `dask` or `vito` runner: "
+        "execute processes in given number of (pre-warmed) worker processes, "
+        "isolated from the test session (and using multiple cores). "
+        "Default: 0 (execute in the test session process).",
+    )
+    group.addoption(
+        "--process-isolation-timeout",
+        type=float,
+        action="store",
+        default=None,
+        help="With `--process-isolation-workers`: maximum execution time (in seconds) per process test. "
+        "A worker process that exceeds it is killed (and replaced), and the test fails.",
+    )
+    group.addoption(
+        "--process-isolation-memory-limit",
+        action="store",
+        default=None,
+        help="With `--process-isolation-workers`: maximum resident memory per worker process (e.g. '2GB'). "
+        "A worker process that exceeds it is killed (and replaced), and the test fails.",
+    )
+    group.addoption(
+        "--process-isolation-max-tasks",
+        type=int,
+        action="store",
+        default=None,
+        help="With `--process-isolation-workers`: number of process executions "
+        "after which a worker process is replaced by a fresh one. "
+        "Default: no limit (only replace failing worker processes).",
+    )
+
+    group.addoption(
+        "--process-dedupe",
+        type=bool,
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Individual process testing: execute process calls with canonically identical arguments "
+        "(e.g. from different process tests) only once per test session, "
+        "and share the result (as a copy) among all tests that need it. "
+        "Calls with large arguments or results (e.g. datacubes) are not deduplicated. "
+        "Enabled by default, except in benchmark mode (`--benchmark-repeat`).",
+    )
+
+    group.addoption(
+        "--process-recording",
+        action="store",
+        choices=MODES,
+        default="off",
+        help="Individual process testing: record or replay process execution results "
+        "(keyed on backend and its version, process id and arguments), "
+        "e.g. to iterate on result comparisons or process test expectations without hitting the backend again. "
+        "'record': execute and store all results, "
+        "'replay': only use stored results (skip tests without stored result), "
+        "'update': use stored results and only execute (and store) missing ones. "
+        "Default: 'off'.",
+    )
+    group.addoption(
+        "--process-recording-dir",
+        action="store",
+        default=None,
+        help="Directory to store recorded process execution results in. "
+        "Falls back on the persistent cache directory (see `--suite-cache-dir`).",
+    )
+
+    group.addoption(
+        "--benchmark-repeat",
+        type=int,
+        action="store",
+        default=0,
+        help="Individual process testing: benchmark mode. "
+        "Execute each (passing) process test given number of additional times, after the regular execution as warm-up, "
+        "and report the latency distribution (min, median, p95) per process and level. "
+        "Default: 0 (no benchmarking).",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        action="store",
+        default=None,
+        help="With `--benchmark-repeat`: benchmark results file (see `--benchmark-save`) "
+        "to compare the latencies against, to flag processes with regressed latency.",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        action="store",
+        default=0.2,
+        help="With `--benchmark-baseline`: relative increase of the median latency (compared to the baseline) "
+        "above which a process is flagged as regressed. "
+        "Default: 0.2 (20%%).",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store",
+        default=None,
+        help="With `--benchmark-repeat`: file to save the benchmark results to (e.g. as new baseline).",
+    )
+
+    group.addoption(
+        "--scaled-sizes",
+        action="store",
+        default="",
+        help="Individual process testing: also run scaled-up variants of the process tests "
+        "for processes with a NumPy reference implementation, "
+        "with generated inputs of given sizes (number of elements), "
+        "e.g. `--scaled-sizes 1e4,1e6` (comma-separated). "
+        "Default: no scaled-up tests.",
+    )
+
+    group.addoption(
+        "--synthetic-cube-shapes",
+        action="store",
+        default="",
+        help="Individual process testing with the dask or vito runner: "
+        "execute datacube processes (e.g. `reduce_dimension`, `apply_dimension`, `merge_cubes`) "
+        "on synthetic datacubes of given shapes, e.g. `--synthetic-cube-shapes 10x4x256x256,20x4x1024x1024` "
+        "(comma-separated), and report execution time and peak memory against cube size. "
+        "Default: no synthetic datacube tests.",
+    )
+    group.addoption(
+        "--synthetic-cube-dimensions",
+        action="store",
+        default="t,bands,y,x",
+        help="With `--synthetic-cube-shapes`: dimensions of the synthetic datacubes (comma-separated), "
+        "from `t` (temporal), `bands`, `y` and `x` (spatial). "
+        "Default: 't,bands,y,x'.",
+    )
+    group.addoption(
+        "--synthetic-cube-dtype",
+        action="store",
+        default="float64",
+        help="With `--synthetic-cube-shapes`: data type of the synthetic datacubes. Default: 'float64'.",
+    )
+    group.addoption(
+        "--synthetic-cube-chunks",
+        action="store",
+        default="",
+        help="With `--synthetic-cube-shapes`: Dask chunk sizes of the synthetic datacubes, "
+        "e.g. `y=512,x=512`. Default: not chunked.",
+    )
+    group.addoption(
+        "--synthetic-cube-nodata",
+        type=float,
+        action="store",
+        default=0.0,
+        help="With `--synthetic-cube-shapes`: fraction of nodata values in the synthetic datacubes. "
+        "Default: 0.",
+    )
+
     group.addoption(
         "--s2-collection",
         action="store",
@@ -73,17 +348,41 @@ def pytest_addoption(parser: pytest.Parser):
     )
 
 
+# Phase timings of process tests, aggregated per process
+_phase_timing_stats = PhaseTimingStats(group_by="process_id")
+
+
 def pytest_configure(config: pytest.Config):
     """Implementation of `pytest_configure` hook."""
+    if (
+        config.getoption("--benchmark-repeat")
+        and config.getoption("--process-recording") != "off"
+    ):
+        raise pytest.UsageError(
+            "Benchmarking (`--benchmark-repeat`) can not be combined with `--process-recording`."
+        )
+
+    if config.getoption("--runner") == "dask":
+        _check_dask_options(config)
+
+    set_cache_dir_from_config(config)
+
     backend_url = get_backend_url(config)
     if backend_url is None:
         backend = NoBackend()
     else:
         connection = openeo.connect(url=backend_url, auto_validate=False)
-        backend = HttpBackend(connection=connection)
+        metadata_store = get_backend_metadata_store(
+            root_url=connection.root_url,
+            ttl=config.getoption("--backend-metadata-ttl"),
+            session=connection.session,
+        )
+        backend = HttpBackend(connection=connection, metadata_store=metadata_store)
     set_backend_under_test(backend)
 
     set_process_selection_from_config(config)
+    set_scaled_sizes_from_config(config)
+    set_synthetic_datacubes_from_config(config)
 
     # Add some additional info to HTML report
     # https://pytest-html.readthedocs.io/en/latest/user_guide.html#environment
@@ -93,6 +392,35 @@ def pytest_configure(config: pytest.Config):
             "openEO versions": get_openeo_versions(),
         }
     )
+    if config.getoption("--runner") == "dask":
+        config.stash[pytest_metadata.plugin.metadata_key][
+            "Dask scheduler"
+        ] = _dask_scheduler_info(config)
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]):
+    """Implementation of `pytest_collection_modifyitems` hook."""
+    mode = config.getoption("--capability-check")
+    if mode == "off":
+        return
+    snapshot = get_capability_snapshot()
+    if snapshot is None:
+        return
+
+    selected = []
+    deselected = []
+    for item in items:
+        reasons = snapshot.get_unmet_requirements(get_test_requirements(item))
+        if not reasons:
+            selected.append(item)
+        elif mode == "deselect":
+            deselected.append(item)
+        else:
+            item.add_marker(pytest.mark.skip(reason="; ".join(reasons)))
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
 
 
 def _invocation() -> str:
@@ -100,15 +428,131 @@ def _invocation() -> str:
     return shlex.join(sys.argv[1:])
 
 
+def _dask_scheduler_info(config: pytest.Config) -> str:
+    """Description of the Dask scheduler used by the `dask` runner."""
+    info = config.getoption("--dask-scheduler") or "default"
+    if config.getoption("--dask-workers") is not None:
+        info += f", {config.getoption('--dask-workers')} workers"
+    if config.getoption("--dask-memory-limit") is not None:
+        info += f", memory limit {config.getoption('--dask-memory-limit')} per worker"
+    return info
+
+
+def _check_dask_options(config: pytest.Config):
+    """
+    Check the `dask` runner options upfront
+    (instead of failing each process test in the setup of the runner).
+    """
+    scheduler = config.getoption("--dask-scheduler")
+    if scheduler == "distributed" and importlib.util.find_spec("distributed") is None:
+        raise pytest.UsageError(
+            "The 'distributed' Dask scheduler (`--dask-scheduler`) requires the `distributed` package to be installed."
+        )
+    if (
+        config.getoption("--dask-memory-limit") is not None
+        and scheduler != "distributed"
+    ):
+        raise pytest.UsageError(
+            "A Dask worker memory limit (`--dask-memory-limit`) is only supported with `--dask-scheduler=distributed`."
+        )
+    workers = config.getoption("--dask-workers")
+    if workers is not None and workers < 1:
+        raise pytest.UsageError(
+            f"Invalid number of Dask workers (`--dask-workers`): {workers}"
+        )
+
+
 def pytest_report_header(config: pytest.Config):
     """Implementation of `pytest_report_header` hook."""
     # Add info to terminal report
-    return [
+    header = [
         f"openEO versions: {get_openeo_versions()}",
         f"Invoked with: {_invocation()}",
     ]
+    if config.getoption("--runner") == "dask":
+        header.append(f"Dask scheduler: {_dask_scheduler_info(config)}")
+    return header
+
+
+def pytest_runtest_logreport(report: pytest.TestReport):
+    """Implementation of `pytest_runtest_logreport` hook."""
+    if report.when == "call":
+        _phase_timing_stats.add(report)
+        get_benchmark_results().add_report(report)
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    """Implementation of `pytest_sessionfinish` hook."""
+    benchmark_save = session.config.getoption("--benchmark-save")
+    # Note: pytest-xdist workers only have partial results, the controller has them all
+    is_xdist_worker = hasattr(session.config, "workerinput")
+    if benchmark_save and get_benchmark_results().latencies and not is_xdist_worker:
+        get_benchmark_results().save(benchmark_save)
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    """Implementation of `pytest_terminal_summary` hook."""
+    if get_benchmark_results().latencies:
+        baseline_path = config.getoption("--benchmark-baseline")
+        baseline = load_baseline(baseline_path) if baseline_path else None
+        terminalreporter.section("process benchmark")
+        for line in get_benchmark_results().get_summary(
+            baseline=baseline, threshold=config.getoption("--benchmark-threshold")
+        ):
+            terminalreporter.write_line(line)
+        if config.getoption("--benchmark-save"):
+            terminalreporter.write_line(
+                f"Saved benchmark results to {config.getoption('--benchmark-save')}"
+            )
+
+    scaling_summary = get_scaling_results().get_summary()
+    if scaling_summary:
+        terminalreporter.section("synthetic datacube scaling")
+        for line in scaling_summary:
+            terminalreporter.write_line(line)
+
+    phase_summary = _phase_timing_stats.get_summary()
+    if phase_summary:
+        terminalreporter.section("process test phase timings")
+        for line in phase_summary:
+            terminalreporter.write_line(line)
+
+    dask_runner = sys.modules.get("openeo_test_suite.lib.process_runner.dask")
+    if dask_runner is not None:
+        # Only report when the Dask runner was actually used (imported)
+        terminalreporter.write_line(dask_runner.get_startup_report())
+
+    execution_cache = get_execution_cache()
+    executions = execution_cache.hits + execution_cache.misses
+    if executions:
+        terminalreporter.write_line(
+            f"Process execution deduplication: {executions} executions,"
+            f" {execution_cache.hits} shared ({execution_cache.hits / executions:.1%})"
+        )
+
+    capability_cache = get_capability_cache()
+    lookups = capability_cache.hits + capability_cache.misses
+    if lookups:
+        terminalreporter.write_line(
+            f"openEO capability cache: {lookups} lookups,"
+            f" {capability_cache.hits} hits ({capability_cache.hit_rate:.1%} hit rate)"
+        )
 
 
 def pytest_html_report_title(report):
     """Implementation of `pytest_html_report_title` hook (from pytest-html plugin)."""
     report.title = "openEO Test Suite Report"
+
+
+def pytest_html_results_table_header(cells):
+    """Implementation of `pytest_html_results_table_header` hook (from pytest-html plugin)."""
+    cells.insert(2, "<th>Phases</th>")
+
+
+def pytest_html_results_table_row(report, cells):
+    """Implementation of `pytest_html_results_table_row` hook (from pytest-html plugin)."""
+    durations = get_phase_durations(report)
+    phases = ", ".join(
+        f"{phase}: {duration:.3f}s" for phase, duration in durations.items()
+    )
+    cells.insert(2, f"<td>{phases}</td>")
@@ -0,0 +1,160 @@
+"""
+Scaled-up variants of individual process tests:
+large generated inputs (e.g. 10^4 to 10^7 elements, optionally mixed with nodata values)
+for processes of the process registry, with the expected results computed
+by a vectorized NumPy reference implementation ("oracle") of the process.
+"""
+
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import numpy as np
+import pytest
+
+from openeo_test_suite.lib.process_registry import ProcessData
+from openeo_test_suite.lib.process_selection import csv_to_list
+
+_log = logging.getLogger(__name__)
+
+# Fraction of the generated values to replace with nodata (NaN) in nodata variants
+NODATA_FRACTION = 0.1
+
+# Absolute tolerance for comparing the results with the reference results
+# (on top of a relative tolerance, see `compare_arrays`)
+DELTA = 1e-6
+
+# Reference implementation: generated data -> (process arguments, expected result)
+Oracle = Callable[[np.ndarray], Tuple[Dict[str, Any], Any]]
+
+
+def _reducer(reference: Callable[[np.ndarray], Any]) -> Oracle:
+    """Oracle for a reducer with `ignore_nodata` (default: true), e.g. `sum`."""
+    return lambda data: ({"data": data}, reference(data))
+
+
+def _quantiles(data: np.ndarray) -> Tuple[Dict[str, Any], Any]:
+    probabilities = [0.1, 0.25, 0.5, 0.75, 0.9]
+    # Note: openEO quantiles follow "type 7" (linear interpolation), the NumPy default
+    return (
+        {"data": data, "probabilities": probabilities},
+        np.nanquantile(data, probabilities),
+    )
+
+
+def _sort(data: np.ndarray) -> Tuple[Dict[str, Any], Any]:
+    # Default `nodata: null`: nodata values are removed
+    return {"data": data}, np.sort(data[~np.isnan(data)])
+
+
+def _cumsum(data: np.ndarray) -> Tuple[Dict[str, Any], Any]:
+    # Default `ignore_nodata: true`: nodata values are skipped (and stay nodata)
+    expected = np.nancumsum(data)
+    expected[np.isnan(data)] = np.nan
+    return {"data": data}, expected
+
+
+def _array_apply(data: np.ndarray) -> Tuple[Dict[str, Any], Any]:
+    process = {
+        "process_graph": {
+            "multiply": {
+                "process_id": "multiply",
+                "arguments": {"x": {"from_parameter": "x"}, "y": 2},
+                "result": True,
+            }
+        }
+    }
+    return {"data": data, "process": process}, data * 2
+
+
+ORACLES: Dict[str, Oracle] = {
+    "sum": _reducer(np.nansum),
+    "mean": _reducer(np.nanmean),
+    "min": _reducer(np.nanmin),
+    "max": _reducer(np.nanmax),
+    "median": _reducer(np.nanmedian),
+    # Note: openEO `sd` and `variance` are the sample (corrected) statistics
+    "sd": _reducer(functools.partial(np.nanstd, ddof=1)),
+    "variance": _reducer(functools.partial(np.nanvar, ddof=1)),
+    "quantiles": _quantiles,
+    "sort": _sort,
+    "cumsum": _cumsum,
+    "array_apply": _array_apply,
+}
+
+
+@dataclass(frozen=True)
+class ScaledProcessTest:
+    """Scaled-up test of a process: generated input of given size, checked against the process oracle."""
+
+    process_id: str
+    level: str
+    size: int
+    nodata: bool = False
+    seed: int = 42
+
+    def __str__(self) -> str:
+        return f"{self.process_id}-{self.size}" + ("-nodata" if self.nodata else "")
+
+    def get_data(self) -> np.ndarray:
+        """Generate the (deterministic) input data."""
+        rng = np.random.default_rng([self.seed, self.size])
+        data = rng.uniform(-1000, 1000, size=self.size)
+        if self.nodata:
+            data[rng.random(self.size) < NODATA_FRACTION] = np.nan
+        return data
+
+    def get_arguments_and_expected(self) -> Tuple[Dict[str, Any], Any]:
+        """Process arguments (in process test representation) and expected result."""
+        return ORACLES[self.process_id](self.get_data())
+
+
+def parse_size(size: str) -> int:
+    """Parse element count like "10000", "1e4" or "10^4"."""
+    size = size.strip()
+    if "^" in size:
+        base, exponent = size.split("^", 1)
+        return int(base) ** int(exponent)
+    value = float(size)
+    if value < 1 or value != int(value):
+        raise ValueError(f"Invalid size {size!r}")
+    return int(value)
+
+
+def get_scaled_process_tests(
+    processes: List[ProcessData], sizes: List[int]
+) -> List[ScaledProcessTest]:
+    """Scaled-up tests (plain and with nodata values) for the given processes that have an oracle."""
+    return [
+        ScaledProcessTest(
+            process_id=process.process_id,
+            level=process.level,
+            size=size,
+            nodata=nodata,
+        )
+        for process in processes
+        if process.process_id in ORACLES
+        for size in sizes
+        for nodata in [False, True]
+    ]
+
+
+# Internal singleton with the sizes of scaled-up process tests (empty: disabled)
+# setup happens in `pytest_configure` hook
+_scaled_sizes: Union[List[int], None] = None
+
+
+def set_scaled_sizes_from_config(config: pytest.Config):
+    """Set up the sizes of scaled-up process tests from pytest config (CLI options)."""
+    global _scaled_sizes
+    try:
+        _scaled_sizes = [
+            parse_size(s) for s in csv_to_list(config.getoption("--scaled-sizes"))
+        ]
+    except ValueError as e:
+        raise pytest.UsageError(f"Invalid scaled sizes option: {e}") from e
+
+
+def get_scaled_sizes() -> List[int]:
+    return _scaled_sizes or []
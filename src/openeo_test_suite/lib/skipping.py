@@ -1,10 +1,16 @@
 import logging
-from typing import Iterable, Iterator, List, Set, Union
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Set, Union
 
 import openeo
 import pytest
 from openeo.internal.graph_building import FlatGraphableMixin, as_flat_graph
 
+from openeo_test_suite.lib.capabilities import (
+    CapabilityCache,
+    get_capability_source,
+    is_output_format_supported,
+)
+
 _log = logging.getLogger(__name__)
 
 
@@ -15,31 +21,49 @@ class Skipper:
     """
 
     def __init__(
-        self, connection: openeo.Connection, selected_processes: Iterable[str]
+        self,
+        connection: openeo.Connection,
+        selected_processes: Iterable[str],
+        capability_cache: Optional[CapabilityCache] = None,
     ):
         """
         :param connection: openeo connection
         :param selected_processes: list of active process selection
+        :param capability_cache: cache of backend capabilities to share between tests
         """
         self._connection = connection
 
         self._selected_processes = set(selected_processes)
 
-    def _get_output_formats(self) -> set:
-        formats = set(
-            f.lower() for f in self._connection.list_file_formats()["output"].keys()
+        self._capability_cache = capability_cache or CapabilityCache()
+        self._capability_source = get_capability_source(connection)
+
+    def _get_output_formats(self) -> FrozenSet[str]:
+        def fetch() -> FrozenSet[str]:
+            formats = frozenset(
+                f.lower() for f in self._connection.list_file_formats()["output"].keys()
+            )
+            _log.info("Detected output formats: %s", formats)
+            return formats
+
+        return self._capability_cache.get(
+            source=self._capability_source, capability="output_formats", fetch=fetch
+        )
+
+    def _get_available_processes(self) -> FrozenSet[str]:
+        def fetch() -> FrozenSet[str]:
+            return frozenset(p["id"] for p in self._connection.list_processes())
+
+        return self._capability_cache.get(
+            source=self._capability_source, capability="process_ids", fetch=fetch
         )
-        _log.info("Detected output formats: %s", formats)
-        return formats
 
     def skip_if_no_netcdf_support(self):
-        output_formats = self._get_output_formats()
-        if not output_formats.intersection({"netcdf", "nc"}):
+        if not is_output_format_supported("netcdf", self._get_output_formats()):
             pytest.skip("NetCDF not supported as output file format")
 
     def skip_if_no_geotiff_support(self):
-        output_formats = self._get_output_formats()
-        if not output_formats.intersection({"geotiff", "gtiff"}):
+        if not is_output_format_supported("geotiff", self._get_output_formats()):
             pytest.skip("GeoTIFF not supported as output file format")
 
     def _get_processes(
@@ -85,8 +109,7 @@ class Skipper:
         """
         processes = self._get_processes(processes)
 
-        # TODO: cache available processes?
-        available_processes = set(p["id"] for p in self._connection.list_processes())
+        available_processes = self._get_available_processes()
         unsupported_processes = processes.difference(available_processes)
         if unsupported_processes:
             pytest.skip(f"Backend does not support: {unsupported_processes}")
@@ -95,14 +118,30 @@ class Skipper:
 def extract_processes_from_process_graph(
     pg: Union[dict, FlatGraphableMixin]
 ) -> Set[str]:
-    """Extract process ids from given process graph."""
-    pg = as_flat_graph(pg)
+    """
+    Extract process ids from given process graph.
+    Note: not memoized, as building a memoization key (e.g. hashing the graph)
+    would cost about as much as the (linear) walk itself.
+    """
+    return set(_walk_process_ids(as_flat_graph(pg)))
 
-    def extract(pg) -> Iterator[str]:
-        for v in pg.values():
-            yield v["process_id"]
-            for arg in v["arguments"].values():
-                if isinstance(arg, dict) and "process_graph" in arg:
-                    yield from extract(arg["process_graph"])
 
-    return set(extract(pg))
+def _walk_process_ids(pg: dict) -> Iterator[str]:
+    """
+    Iteratively walk a flat process graph (and its callbacks,
+    also when nested in list or dict arguments) and yield all process ids.
+    """
+    # Stack of (is_node, value) tuples
+    stack = [(True, node) for node in pg.values()]
+    while stack:
+        is_node, value = stack.pop()
+        if is_node:
+            yield value["process_id"]
+            stack.extend((False, arg) for arg in value.get("arguments", {}).values())
+        elif isinstance(value, dict):
+            if isinstance(value.get("process_graph"), dict):
+                stack.extend((True, node) for node in value["process_graph"].values())
+            else:
+                stack.extend((False, v) for v in value.values())
+        elif isinstance(value, list):
+            stack.extend((False, v) for v in value)
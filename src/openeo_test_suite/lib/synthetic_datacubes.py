@@ -0,0 +1,345 @@
+"""
+Synthetic datacubes (with configurable shape, dtype, chunking and nodata ratio)
+to feed datacube processes on local runners (e.g. `dask`, `vito`),
+and measure execution time and peak memory against cube size (scaling curves),
+without any remote data.
+"""
+
+import contextlib
+import datetime
+import logging
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from openeo_test_suite.lib.process_registry import ProcessData
+from openeo_test_suite.lib.process_runner.util import datacube_to_xarray
+from openeo_test_suite.lib.process_selection import csv_to_list
+
+_log = logging.getLogger(__name__)
+
+# Dimension types of the (non-standardized) dimension names used by the local runners
+DIMENSION_TYPES = {"t": "temporal", "bands": "bands", "x": "spatial", "y": "spatial"}
+
+# Spatial resolution (in meters) and reference system of the generated spatial labels
+_RESOLUTION = 10.0
+_CRS = 32632
+
+_START_DATE = datetime.date(2020, 1, 1)
+
+
+@dataclass(frozen=True)
+class DatacubeSpec:
+    """Specification of a synthetic datacube."""
+
+    dimensions: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    dtype: str = "float64"
+    # Dask chunk sizes per dimension (None: not chunked, plain numpy data)
+    chunks: Optional[Dict[str, int]] = field(default=None, hash=False)
+    # Fraction of the values to replace with nodata
+    nodata_ratio: float = 0.0
+    seed: int = 42
+
+    def __post_init__(self):
+        if len(self.dimensions) != len(self.shape):
+            raise ValueError(
+                f"Shape {self.shape} doesn't match dimensions {self.dimensions}"
+            )
+        unknown = [d for d in self.dimensions if d not in DIMENSION_TYPES]
+        if unknown:
+            raise ValueError(
+                f"Unsupported dimensions {unknown} (supported: {list(DIMENSION_TYPES)})"
+            )
+
+    def __str__(self) -> str:
+        name = "x".join(str(s) for s in self.shape) + f"-{self.dtype}"
+        if self.nodata_ratio:
+            name += f"-nodata{self.nodata_ratio:g}"
+        if self.chunks:
+            name += "-chunked"
+        return name
+
+    @property
+    def size(self) -> int:
+        """Number of elements."""
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * np.dtype(self.dtype).itemsize
+
+    def get_labels(self, dimension: str) -> List:
+        n = self.shape[self.dimensions.index(dimension)]
+        dimension_type = DIMENSION_TYPES[dimension]
+        if dimension_type == "temporal":
+            return [
+                (_START_DATE + datetime.timedelta(days=i)).isoformat() + "T00:00:00Z"
+                for i in range(n)
+            ]
+        elif dimension_type == "spatial":
+            return (np.arange(n) * _RESOLUTION).tolist()
+        else:
+            return [f"B{i + 1:02d}" for i in range(n)]
+
+
+def create_datacube(spec: DatacubeSpec) -> dict:
+    """Create a synthetic datacube in the process test representation (with numpy data)."""
+    rng = np.random.default_rng(spec.seed)
+    dtype = np.dtype(spec.dtype)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        data = rng.integers(max(info.min, 0), min(info.max, 10000), size=spec.shape)
+        data = data.astype(dtype)
+        nodata = info.max
+    else:
+        data = rng.uniform(0, 1, size=spec.shape).astype(dtype)
+        nodata = np.nan
+
+    dimensions = {}
+    for name in spec.dimensions:
+        dimension = {"type": DIMENSION_TYPES[name], "values": spec.get_labels(name)}
+        if dimension["type"] == "spatial":
+            dimension["axis"] = name
+            dimension["reference_system"] = _CRS
+        dimensions[name] = dimension
+
+    cube = {
+        "type": "datacube",
+        "order": list(spec.dimensions),
+        "dimensions": dimensions,
+        "data": data,
+    }
+    if spec.nodata_ratio:
+        data[rng.random(spec.shape) < spec.nodata_ratio] = nodata
+        if not np.isnan(nodata):
+            cube["nodata"] = int(nodata)
+    return cube
+
+
+def create_xarray(spec: DatacubeSpec) -> xr.DataArray:
+    """Create a synthetic datacube as `xarray.DataArray` (optionally chunked)."""
+    da = datacube_to_xarray(create_datacube(spec))
+    if spec.chunks:
+        da = da.chunk(spec.chunks)
+    return da
+
+
+def _callback(process_id: str, **arguments) -> dict:
+    return {
+        "process_graph": {
+            process_id: {
+                "process_id": process_id,
+                "arguments": arguments,
+                "result": True,
+            }
+        }
+    }
+
+
+def _reduce_dimension(cube: xr.DataArray, spec: DatacubeSpec) -> Dict[str, Any]:
+    return {
+        "data": cube,
+        "reducer": _callback("mean", data={"from_parameter": "data"}),
+        "dimension": spec.dimensions[0],
+    }
+
+
+def _apply_dimension(cube: xr.DataArray, spec: DatacubeSpec) -> Dict[str, Any]:
+    return {
+        "data": cube,
+        "process": _callback("cumsum", data={"from_parameter": "data"}),
+        "dimension": spec.dimensions[0],
+    }
+
+
+def _apply(cube: xr.DataArray, spec: DatacubeSpec) -> Dict[str, Any]:
+    return {
+        "data": cube,
+        "process": _callback("multiply", x={"from_parameter": "x"}, y=2),
+    }
+
+
+def _aggregate_temporal(cube: xr.DataArray, spec: DatacubeSpec) -> Dict[str, Any]:
+    # Two intervals, splitting the temporal extent in halves
+    dates = [label[:10] for label in spec.get_labels("t")]
+    end = (
+        datetime.date.fromisoformat(dates[-1]) + datetime.timedelta(days=1)
+    ).isoformat()
+    middle = dates[len(dates) // 2]
+    return {
+        "data": cube,
+        "intervals": [[dates[0], middle], [middle, end]],
+        "reducer": _callback("mean", data={"from_parameter": "data"}),
+    }
+
+
+def _merge_cubes(cube: xr.DataArray, spec: DatacubeSpec) -> Dict[str, Any]:
+    return {
+        "cube1": cube,
+        "cube2": cube,
+        "overlap_resolver": _callback(
+            "add", x={"from_parameter": "x"}, y={"from_parameter": "y"}
+        ),
+    }
+
+
+# Datacube processes to scale: (synthetic cube, spec) -> process arguments
+# in process test representation, and processes required by the callbacks.
+DATACUBE_PROCESSES: Dict[
+    str,
+    Tuple[Callable[[xr.DataArray, DatacubeSpec], Dict[str, Any]], List[str]],
+] = {
+    "reduce_dimension": (_reduce_dimension, ["mean"]),
+    "apply_dimension": (_apply_dimension, ["cumsum"]),
+    "apply": (_apply, ["multiply"]),
+    "aggregate_temporal": (_aggregate_temporal, ["mean"]),
+    "merge_cubes": (_merge_cubes, ["add"]),
+}
+
+
+@dataclass(frozen=True)
+class DatacubeProcessTest:
+    """Execution of a datacube process on a synthetic datacube."""
+
+    process_id: str
+    level: str
+    spec: DatacubeSpec
+
+    def __str__(self) -> str:
+        return f"{self.process_id}-{self.spec}"
+
+    @property
+    def required(self) -> List[str]:
+        return DATACUBE_PROCESSES[self.process_id][1]
+
+    def get_arguments(self) -> Dict[str, Any]:
+        """Process arguments in process test representation (with the synthetic cube as `xarray.DataArray`)."""
+        return DATACUBE_PROCESSES[self.process_id][0](
+            create_xarray(self.spec), self.spec
+        )
+
+
+def get_datacube_process_tests(
+    processes: List[ProcessData], specs: List[DatacubeSpec]
+) -> List[DatacubeProcessTest]:
+    """Synthetic datacube tests for the given (datacube) processes that are applicable to the cube specs."""
+    return [
+        DatacubeProcessTest(
+            process_id=process.process_id, level=process.level, spec=spec
+        )
+        for process in processes
+        if process.process_id in DATACUBE_PROCESSES
+        for spec in specs
+        # Note: `aggregate_temporal` requires a temporal dimension
+        if process.process_id != "aggregate_temporal" or "t" in spec.dimensions
+    ]
+
+
+def parse_shape(shape: str) -> Tuple[int, ...]:
+    """Parse shape like "10x4x256x256"."""
+    try:
+        parsed = tuple(int(s) for s in shape.strip().lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid shape {shape!r}") from None
+    if any(s < 1 for s in parsed):
+        raise ValueError(f"Invalid shape {shape!r}")
+    return parsed
+
+
+def parse_chunks(chunks: str) -> Optional[Dict[str, int]]:
+    """Parse chunk sizes like "y=512,x=512"."""
+    parsed = {}
+    for item in csv_to_list(chunks):
+        name, _, size = item.partition("=")
+        if not size:
+            raise ValueError(f"Invalid chunk size {item!r} (expected 'dimension=size')")
+        parsed[name.strip()] = int(size)
+    return parsed or None
+
+
+@contextlib.contextmanager
+def track_peak_memory() -> Iterator[Dict[str, int]]:
+    """
+    Track the peak memory (in bytes) allocated within the context (by Python and numpy),
+    available as "peak" item of the yielded dict after the context.
+    Note: only allocations in the current process are tracked
+    (not in worker processes, e.g. with process isolation or the distributed Dask scheduler).
+    """
+    tracked = {"peak": 0}
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        yield tracked
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracked["peak"] = max(peak - start, 0)
+        if not already_tracing:
+            tracemalloc.stop()
+
+
+class ScalingResults:
+    """Execution time and peak memory of datacube processes, against cube size."""
+
+    def __init__(self):
+        self.results: List[Tuple[str, DatacubeSpec, float, int]] = []
+
+    def add(
+        self, process_id: str, spec: DatacubeSpec, duration: float, peak_memory: int
+    ):
+        self.results.append((process_id, spec, duration, peak_memory))
+
+    def get_summary(self) -> List[str]:
+        """Human-readable summary: time and peak memory per process, by increasing cube size."""
+        lines = []
+        for process_id, spec, duration, peak_memory in sorted(
+            self.results, key=lambda r: (r[0], r[1].nbytes, str(r[1]))
+        ):
+            lines.append(
+                f"{process_id} {spec} ({spec.nbytes / 1024**2:.1f} MiB):"
+                f" {duration:.3f}s, peak memory {peak_memory / 1024**2:.1f} MiB"
+                f" ({peak_memory / spec.nbytes:.1f}x cube size)"
+            )
+        return lines
+
+
+# Internal singleton with the synthetic datacube specs (empty: disabled)
+# setup happens in `pytest_configure` hook
+_datacube_specs: Union[List[DatacubeSpec], None] = None
+
+
+def set_synthetic_datacubes_from_config(config: pytest.Config):
+    """Set up the synthetic datacube specs from pytest config (CLI options)."""
+    global _datacube_specs
+    dimensions = tuple(csv_to_list(config.getoption("--synthetic-cube-dimensions")))
+    try:
+        _datacube_specs = [
+            DatacubeSpec(
+                dimensions=dimensions,
+                shape=parse_shape(shape),
+                dtype=config.getoption("--synthetic-cube-dtype"),
+                chunks=parse_chunks(config.getoption("--synthetic-cube-chunks")),
+                nodata_ratio=config.getoption("--synthetic-cube-nodata"),
+            )
+            for shape in csv_to_list(config.getoption("--synthetic-cube-shapes"))
+        ]
+    except ValueError as e:
+        raise pytest.UsageError(f"Invalid synthetic datacube options: {e}") from e
+
+
+def get_synthetic_datacube_specs() -> List[DatacubeSpec]:
+    return _datacube_specs or []
+
+
+_scaling_results = ScalingResults()
+
+
+def get_scaling_results() -> ScalingResults:
+    return _scaling_results
@@ -0,0 +1,111 @@
+"""
+Timing of the phases of individual tests (e.g. argument encoding, execution, decoding and comparison
+in individual process testing), reported through the `user_properties` of the test report.
+"""
+
+import collections
+import contextlib
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+# Prefix of the user property names that hold phase durations (in seconds)
+USER_PROPERTY_PREFIX = "duration:"
+
+
+class PhaseTimer:
+    """
+    Measure the duration of named phases of a test,
+    and keep them in the `user_properties` of the test item (if given).
+
+    The duration of a nested phase is not included in the duration of the enclosing phase.
+    """
+
+    def __init__(self, user_properties: Optional[List[Tuple[str, object]]] = None):
+        self.durations: Dict[str, float] = {}
+        self._user_properties = user_properties
+        # Durations of nested phases, to subtract from the enclosing phase
+        self._nested: List[float] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            self._add(name, elapsed - nested)
+
+    def _add(self, name: str, duration: float):
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+        if self._user_properties is not None:
+            key = USER_PROPERTY_PREFIX + name
+            self._user_properties[:] = [
+                (k, v) for (k, v) in self._user_properties if k != key
+            ]
+            self._user_properties.append((key, self.durations[name]))
+
+
+def get_phase_durations(report: pytest.TestReport) -> Dict[str, float]:
+    """Get phase durations from the user properties of a test report."""
+    return {
+        k[len(USER_PROPERTY_PREFIX) :]: v
+        for k, v in report.user_properties
+        if k.startswith(USER_PROPERTY_PREFIX)
+    }
+
+
+class PhaseTimingStats:
+    """Aggregate phase durations over the tests of a session, grouped by a user property (e.g. process id)."""
+
+    def __init__(self, group_by: str):
+        self.group_by = group_by
+        self.totals: Dict[str, Dict[str, float]] = collections.defaultdict(
+            lambda: collections.defaultdict(float)
+        )
+        self.counts: Dict[str, int] = collections.defaultdict(int)
+
+    def add(self, report: pytest.TestReport):
+        durations = get_phase_durations(report)
+        if not durations:
+            return
+        group = dict(report.user_properties).get(self.group_by, "-")
+        self.counts[group] += 1
+        for phase, duration in durations.items():
+            self.totals[group][phase] += duration
+
+    def get_summary(self, limit: int = 10) -> List[str]:
+        """Human-readable summary: total duration per phase and slowest groups."""
+        if not self.totals:
+            return []
+        phase_totals = collections.defaultdict(float)
+        for durations in self.totals.values():
+            for phase, duration in durations.items():
+                phase_totals[phase] += duration
+
+        def format_phases(durations: Dict[str, float]) -> str:
+            return ", ".join(
+                f"{phase} {duration:.3f}s"
+                for phase, duration in sorted(
+                    durations.items(), key=lambda item: -item[1]
+                )
+            )
+
+        lines = [
+            f"Total per phase: {format_phases(phase_totals)}",
+            f"Slowest (by {self.group_by}):",
+        ]
+        slowest = sorted(self.totals.items(), key=lambda item: -sum(item[1].values()))
+        for group, durations in slowest[:limit]:
+            count = self.counts[group]
+            lines.append(
+                f"  {group}: {sum(durations.values()):.3f}s"
+                f" in {count} test{'' if count == 1 else 's'}"
+                f" ({format_phases(durations)})"
+            )
+        return lines
@@ -8,6 +8,7 @@ import openeo
 import pytest
 
 from openeo_test_suite.lib.backend_under_test import get_backend_url
+from openeo_test_suite.lib.capabilities import CapabilityCache, get_capability_cache
 from openeo_test_suite.lib.process_selection import get_selected_processes
 from openeo_test_suite.lib.skipping import Skipper
 
@@ -55,9 +56,16 @@ def connection(
     return con
 
 
+@pytest.fixture(scope="session")
+def capability_cache() -> CapabilityCache:
+    """Session-wide cache of backend capabilities (e.g. supported processes)."""
+    return get_capability_cache()
+
+
 @pytest.fixture
-def skipper(connection) -> Skipper:
+def skipper(connection, capability_cache) -> Skipper:
     return Skipper(
         connection=connection,
         selected_processes=[p.process_id for p in get_selected_processes()],
+        capability_cache=capability_cache,
     )
@@ -1,15 +1,36 @@
 import logging
 import os
+from typing import Iterator
 
 import openeo
 import pytest
 
 from openeo_test_suite.lib.backend_under_test import get_backend_url
 from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
+from openeo_test_suite.lib.process_runner.dedupe import DedupingRunner
+from openeo_test_suite.lib.process_runner.recording import (
+    get_recording_runner,
+    get_recording_store,
+)
+from openeo_test_suite.lib.scaled_processes import get_scaled_sizes
+from openeo_test_suite.lib.synthetic_datacubes import get_synthetic_datacube_specs
+from openeo_test_suite.lib.timing import PhaseTimer
 
 _log = logging.getLogger(__name__)
 
 
+def pytest_pycollect_makeitem(collector, name, obj):
+    """
+    Implementation of `pytest_pycollect_makeitem` hook:
+    don't collect opt-in tests (scaled-up data, synthetic datacubes) when they are not enabled,
+    instead of reporting them as skipped because of an empty parameter set.
+    """
+    if name == "test_scaled_process" and not get_scaled_sizes():
+        return []
+    if name == "test_synthetic_datacube_process" and not get_synthetic_datacube_specs():
+        return []
+
+
 @pytest.fixture(scope="session")
 def runner(request) -> str:
     """
@@ -29,21 +50,64 @@ def auto_authenticate() -> bool:
     return True
 
 
+@pytest.fixture(scope="module")
+def process_dedupe() -> bool:
+    """
+    Fixture to act as parameterizable toggle for deduplicating process executions of the connection fixture
+    (see `--process-dedupe`). Allows per-test/folder opt-out, e.g. for tests that measure the executions.
+    """
+    return True
+
+
 @pytest.fixture(scope="module")
 def connection(
-    request, runner: str, auto_authenticate: bool, pytestconfig
-) -> ProcessTestRunner:
+    request, runner: str, auto_authenticate: bool, process_dedupe: bool, pytestconfig
+) -> Iterator[ProcessTestRunner]:
     # TODO: this fixture override changes the return type of the original `connection` fixture,
     #       which might lead to problems due to broken assumptions
+    connection = get_recording_runner(
+        runner=_create_runner(request, runner, auto_authenticate, pytestconfig),
+        mode=request.config.getoption("--process-recording"),
+        store=get_recording_store(request.config),
+    )
+    # Note: no deduplication when benchmarking, as it would skip the repeated executions
+    if (
+        process_dedupe
+        and request.config.getoption("--process-dedupe")
+        and not request.config.getoption("--benchmark-repeat")
+    ):
+        connection = DedupingRunner(connection)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def phase_timer(request) -> PhaseTimer:
+    """
+    Fixture to time the phases of a process test (e.g. argument encoding, execution, decoding and comparison),
+    reported through the `user_properties` of the test report.
+    """
+    return PhaseTimer(user_properties=request.node.user_properties)
+
 
+def _create_runner(
+    request, runner: str, auto_authenticate: bool, pytestconfig
+) -> ProcessTestRunner:
     if runner == "dask":
         from openeo_test_suite.lib.process_runner.dask import Dask
 
-        return Dask()
+        return _create_local_runner(
+            request,
+            Dask,
+            scheduler=request.config.getoption("--dask-scheduler"),
+            num_workers=request.config.getoption("--dask-workers"),
+            memory_limit=request.config.getoption("--dask-memory-limit"),
+            vectorize=request.config.getoption("--dask-vectorize"),
+        )
     elif runner == "vito":
         from openeo_test_suite.lib.process_runner.vito import Vito
 
-        return Vito()
+        return _create_local_runner(request, Vito)
     elif runner == "skip":
         from openeo_test_suite.lib.process_runner.skip import SkippingRunner
 
@@ -60,7 +124,33 @@ def connection(
             with capmanager.global_and_fixture_disabled():
                 con.authenticate_oidc()
 
-        return Http(con)
+        return Http(
+            con,
+            batch_size=request.config.getoption("--http-batch-size"),
+            concurrency=request.config.getoption("--http-concurrency"),
+        )
 
     else:
         raise ValueError(f"Unknown runner {runner!r}")
+
+
+def _create_local_runner(request, runner_class, **kwargs) -> ProcessTestRunner:
+    """Create local runner, optionally with process isolation (in a pool of worker processes)."""
+    workers = request.config.getoption("--process-isolation-workers")
+    if not workers:
+        return runner_class(**kwargs)
+
+    from openeo_test_suite.lib.process_runner.isolated import (
+        IsolatedRunner,
+        parse_memory_size,
+    )
+
+    memory_limit = request.config.getoption("--process-isolation-memory-limit")
+    return IsolatedRunner(
+        runner_class=runner_class,
+        runner_kwargs=kwargs,
+        workers=workers,
+        timeout=request.config.getoption("--process-isolation-timeout"),
+        memory_limit=parse_memory_size(memory_limit) if memory_limit else None,
+        max_tasks=request.config.getoption("--process-isolation-max-tasks"),
+    )
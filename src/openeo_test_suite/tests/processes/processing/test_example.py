@@ -2,17 +2,28 @@
 
 import logging
 import math
+import time
 import warnings
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple
 
-import json5
+import numpy as np
 import pytest
+import xarray as xr
 from deepdiff import DeepDiff
 
-from openeo_test_suite.lib.process_runner.base import ProcessTestRunner
-from openeo_test_suite.lib.process_runner.util import isostr_to_datetime
-from openeo_test_suite.lib.process_selection import get_selected_processes
+from openeo_test_suite.lib.benchmark import USER_PROPERTY_LATENCIES, USER_PROPERTY_LEVEL
+from openeo_test_suite.lib.comparison import compare_arrays, compare_datacubes
+from openeo_test_suite.lib.external_references import load_ref
+from openeo_test_suite.lib.process_runner.base import ProcessCall, ProcessTestRunner
+from openeo_test_suite.lib.process_runner.util import (
+    isostr_to_datetime,
+    load_data_ref,
+    prepare_arguments,
+    xarray_to_datacube,
+)
+from openeo_test_suite.lib.process_selection import get_selected_processes_with_tests
+from openeo_test_suite.lib.timing import PhaseTimer
 
 _log = logging.getLogger(__name__)
 
@@ -27,7 +38,7 @@ def get_examples() -> List[Tuple[str, dict, Path, str, bool]]:
             test.get("level", process.level),
             test.get("experimental", process.experimental),
         )
-        for process in get_selected_processes()
+        for process in get_selected_processes_with_tests()
         for test in process.tests
     ]
 
@@ -43,118 +54,170 @@ def test_process(
     level,
     experimental,
     skipper,
+    request,
+    phase_timer: PhaseTimer,
 ):
+    request.node.user_properties.append(("process_id", process_id))
+
     # Check whether the process (and additional extra required ones, if any) is supported on the backend
     skipper.skip_if_unsupported_process([process_id] + example.get("required", []))
 
     # prepare the arguments from test JSON encoding to internal backend representations
     # or skip if not supported by the test runner
     try:
-        arguments = _prepare_arguments(
-            arguments=example["arguments"],
-            process_id=process_id,
-            connection=connection,
-            file=file,
-        )
+        with phase_timer.phase("prepare"):
+            arguments = prepare_arguments(
+                arguments=example["arguments"],
+                process_id=process_id,
+                connection=connection,
+                file=file,
+            )
     except NotImplementedError as e:
         pytest.skip(str(e))
 
     throws = bool(example.get("throws"))
     returns = "returns" in example
 
+    benchmark_repeat = request.config.getoption("--benchmark-repeat")
+    # Note: no prefetching when benchmarking, to avoid interference with the timed executions,
+    # and neither in pytest-xdist workers, which only run a (unknown up front) part of the session items.
+    is_xdist_worker = hasattr(request.config, "workerinput")
+    if connection.get_prefetch_size() and not benchmark_repeat and not is_xdist_worker:
+        with phase_timer.phase("prefetch"):
+            _prefetch_upcoming(request=request, connection=connection, skipper=skipper)
+
     # execute the process
-    try:
-        result = connection.execute(process_id, arguments)
-    except Exception as e:
-        result = e
+    with phase_timer.phase("execute"):
+        try:
+            result = connection.execute(process_id, arguments)
+        except Exception as e:
+            result = e
 
     # check the process results / behavior
-    if throws and returns:
-        if isinstance(result, Exception):
+    with phase_timer.phase("compare"):
+        if throws and returns:
+            if isinstance(result, Exception):
+                check_exception(example, result)
+            else:
+                check_return_value(example, result, connection, file, phase_timer)
+        elif throws:
             check_exception(example, result)
-        else:
-            check_return_value(example, result, connection, file)
-    elif throws:
-        check_exception(example, result)
-    elif returns:
-        check_return_value(example, result, connection, file)
-    else:
+        elif returns:
+            check_return_value(example, result, connection, file, phase_timer)
+    if not throws and not returns:
         pytest.skip(
             f"Test for process {process_id} doesn't provide an expected result for arguments: {example['arguments']}"
         )
 
-
-def _prepare_arguments(
-    arguments: dict, process_id: str, connection: ProcessTestRunner, file: Path
-) -> dict:
-    return {
-        k: _prepare_argument(
-            arg=v, process_id=process_id, name=k, connection=connection, file=file
+    if benchmark_repeat:
+        # The (checked) execution above serves as warm-up
+        latencies = _benchmark(
+            connection=connection,
+            process_id=process_id,
+            example=example,
+            file=file,
+            repeat=benchmark_repeat,
         )
-        for k, v in arguments.items()
-    }
+        # Note: aggregated from the test reports (see `BenchmarkResults.add_report`),
+        # e.g. on the pytest-xdist controller
+        request.node.user_properties.append((USER_PROPERTY_LEVEL, level))
+        request.node.user_properties.append((USER_PROPERTY_LATENCIES, latencies))
 
 
-def _prepare_argument(
-    arg: Union[dict, str, int, float],
-    process_id: str,
-    name: str,
+def _benchmark(
     connection: ProcessTestRunner,
+    process_id: str,
+    example: dict,
     file: Path,
-):
-    # handle external references to files
-    if isinstance(arg, dict) and "$ref" in arg:
-        arg = _load_ref(arg["$ref"], file)
-
-    # handle custom types of data
-    if isinstance(arg, dict):
-        if "type" in arg:
-            # labeled arrays
-            if arg["type"] == "labeled-array":
-                arg = connection.encode_labeled_array(arg)
-            # datacubes
-            elif arg["type"] == "datacube":
-                arg = connection.encode_datacube(arg)
-            # nodata-values
-            elif arg["type"] == "nodata":
-                arg = connection.get_nodata_value()
-            else:
-                # TODO: raise NotImplementedError?
-                _log.warning(f"Unhandled argument type: {arg}")
-        elif "process_graph" in arg:
-            arg = connection.encode_process_graph(
-                process=arg, parent_process_id=process_id, parent_parameter=name
-            )
-        else:
-            arg = {
-                k: _prepare_argument(
-                    arg=v,
-                    process_id=process_id,
-                    name=name,
-                    connection=connection,
-                    file=file,
-                )
-                for k, v in arg.items()
-            }
+    repeat: int,
+) -> List[float]:
+    """
+    Repeatedly execute the process of given example and return the latencies (in seconds),
+    including result decoding (as some runners compute results lazily).
+    """
+    latencies = []
+    for _ in range(repeat):
+        # Note: fresh arguments for each execution, as encoded arguments (e.g. callbacks)
+        # are not necessarily reusable.
+        arguments = prepare_arguments(
+            arguments=example["arguments"],
+            process_id=process_id,
+            connection=connection,
+            file=file,
+        )
+        start = time.perf_counter()
+        try:
+            result = connection.execute(process_id, arguments)
+            if "returns" in example:
+                connection.decode_data(result, example["returns"])
+        except Exception:
+            # Expected (and already checked) exceptions
+            pass
+        latencies.append(time.perf_counter() - start)
+    return latencies
 
-    elif isinstance(arg, list):
-        arg = [
-            _prepare_argument(
-                arg=a,
-                process_id=process_id,
-                name=name,
-                connection=connection,
-                file=file,
-            )
-            for a in arg
-        ]
 
-    arg = connection.encode_data(arg)
+# Index of each test item in the session, and index up to which items were announced to the runner
+_item_index_key = pytest.StashKey[dict]()
+_prefetched_until_key = pytest.StashKey[int]()
 
-    if connection.is_json_only():
-        check_non_json_values(arg)
 
-    return arg
+def _prefetch_upcoming(
+    request: pytest.FixtureRequest, connection: ProcessTestRunner, skipper
+):
+    """
+    Announce the process executions of the current and upcoming `test_process` items
+    to the runner (see `ProcessTestRunner.prefetch`), e.g. for batched or concurrent execution.
+    """
+    session = request.session
+    if _item_index_key not in session.stash:
+        session.stash[_item_index_key] = {
+            item.nodeid: i for i, item in enumerate(session.items)
+        }
+    index = session.stash[_item_index_key].get(request.node.nodeid)
+    if index is None:
+        return
+    size = connection.get_prefetch_size()
+    prefetched_until = session.stash.get(_prefetched_until_key, 0)
+    if index + size // 2 < prefetched_until:
+        # Still enough upcoming items announced
+        return
+    # Announce the next window of items (before the current one is exhausted, to keep a pipeline going)
+    start = max(index, prefetched_until)
+    end = start + size
+    session.stash[_prefetched_until_key] = end
+
+    calls = []
+    for item in session.items[start:end]:
+        if getattr(item, "function", None) is not test_process:
+            continue
+        if item.get_closest_marker("skip"):
+            continue
+        params = item.callspec.params
+        example = params["example"]
+        if "arguments" not in example:
+            continue
+        try:
+            skipper.skip_if_unsupported_process(
+                [params["process_id"]] + example.get("required", [])
+            )
+            arguments = prepare_arguments(
+                arguments=example["arguments"],
+                process_id=params["process_id"],
+                connection=connection,
+                file=params["file"],
+            )
+        except (Exception, pytest.skip.Exception):
+            # Will be handled (skipped or failed) by the test itself
+            continue
+        calls.append(
+            ProcessCall(
+                process_id=params["process_id"],
+                arguments=arguments,
+                throws=bool(example.get("throws")),
+            )
+        )
+    connection.prefetch(calls)
 
 
 def _prepare_results(connection: ProcessTestRunner, file: Path, example, result=None):
@@ -164,7 +227,11 @@ def _prepare_results(connection: ProcessTestRunner, file: Path, example, result=
     if isinstance(example, dict):
         # handle external references to files
         if isinstance(example, dict) and "$ref" in example:
-            example = _load_ref(example["$ref"], file)
+            example = load_ref(example["$ref"], file)
+            if isinstance(example, xr.DataArray):
+                example = xarray_to_datacube(example)
+            elif isinstance(example, np.ndarray):
+                return (example, result)
 
         if "type" in example:
             if example["type"] == "datetime":
@@ -175,6 +242,8 @@ def _prepare_results(connection: ProcessTestRunner, file: Path, example, result=
                     pass
             elif example["type"] == "nodata":
                 example = connection.get_nodata_value()
+            elif example["type"] == "datacube":
+                example = load_data_ref(example, file)
         else:
             # TODO: avoid in-place dict mutation
             for key in example:
@@ -208,37 +277,6 @@ def _prepare_results(connection: ProcessTestRunner, file: Path, example, result=
     return (example, result)
 
 
-def _load_ref(ref: str, file: Path):
-    try:
-        path = file.parent / ref
-        if ref.endswith(".json") or ref.endswith(".json5") or ref.endswith(".geojson"):
-            with open(path) as f:
-                return json5.load(f)
-        elif ref.endswith(".txt") or ref.endswith(".wkt2"):
-            with open(path) as f:
-                return f.read()
-        else:
-            raise NotImplementedError(f"Unhandled external reference {ref}.")
-    except Exception as e:
-        # TODO: is this try-except actually useful?
-        raise RuntimeError(f"Failed to load external reference {ref}") from e
-
-
-def check_non_json_values(value):
-    # TODO: shouldn't this check be an aspect of Http(ProcessTestRunner)?
-    if isinstance(value, float):
-        if math.isnan(value):
-            raise ValueError("HTTP JSON APIs don't support NaN values")
-        elif math.isinf(value):
-            raise ValueError("HTTP JSON APIs don't support infinity values")
-    elif isinstance(value, dict):
-        for v in value.values():
-            check_non_json_values(v)
-    elif isinstance(value, list):
-        for item in value:
-            check_non_json_values(item)
-
-
 def check_exception(example, result):
     assert isinstance(result, Exception), f"Expected an exception, but got {result}"
     if isinstance(example["throws"], str):
@@ -248,11 +286,14 @@ def check_exception(example, result):
             warnings.warn(f"Expected exception {example['throws']} but got {result!r}")
 
 
-def check_return_value(example, result, connection, file):
+def check_return_value(
+    example, result, connection, file, phase_timer: Optional[PhaseTimer] = None
+):
     assert not isinstance(result, Exception), f"Unexpected exception: {result}"
 
     # handle custom types of data
-    result = connection.decode_data(result, example["returns"])
+    with (phase_timer or PhaseTimer()).phase("decode"):
+        result = connection.decode_data(result, example["returns"])
 
     # decode special types (currently mostly datetimes and nodata)
     (example["returns"], result) = _prepare_results(
@@ -261,35 +302,32 @@ def check_return_value(example, result, connection, file):
 
     delta = example.get("delta", 0.0000000001)
 
-    if isinstance(example["returns"], dict):
+    if (
+        isinstance(example["returns"], dict)
+        and example["returns"].get("type") == "datacube"
+    ):
         assert isinstance(result, dict), f"Expected a dict but got {type(result)}"
-        exclude_regex_paths = []
-        exclude_paths = []
-        ignore_order_func = None
-        if "type" in example["returns"] and example["returns"]["type"] == "datacube":
+        exclude_paths = [
             # todo: non-standardized
-            exclude_regex_paths.append(
-                r"root\['dimensions'\]\[[^\]]+\]\['reference_system'\]"
-            )
+            "root['nodata']",
+        ]
+        exclude_regex_paths = [
             # todo: non-standardized
-            exclude_paths.append("root['nodata']")
-            # ignore data if operation is not changing data
-            if example["returns"]["data"] is None:
-                exclude_paths.append("root['data']")
-
-        diff = DeepDiff(
+            r"root\['dimensions'\]\[[^\]]+\]\['reference_system'\]"
+        ]
+        # ignore data if operation is not changing data
+        if example["returns"]["data"] is None:
+            exclude_paths.append("root['data']")
+        differences = compare_datacubes(
             example["returns"],
             result,
-            math_epsilon=delta,
-            ignore_numeric_type_changes=True,
-            ignore_nan_inequality=True,
+            delta=delta,
             exclude_paths=exclude_paths,
             exclude_regex_paths=exclude_regex_paths,
-            ignore_order_func=ignore_order_func,
         )
-        assert {} == diff, f"Differences: {diff!s}"
-    elif isinstance(example["returns"], list):
-        assert isinstance(result, list), f"Expected a list but got {type(result)}"
+        assert [] == differences, "\n".join(differences)
+    elif isinstance(example["returns"], dict):
+        assert isinstance(result, dict), f"Expected a dict but got {type(result)}"
         diff = DeepDiff(
             example["returns"],
             result,
@@ -298,6 +336,12 @@ def check_return_value(example, result, connection, file):
             ignore_nan_inequality=True,
         )
         assert {} == diff, f"Differences: {diff!s}"
+    elif isinstance(example["returns"], (list, np.ndarray)):
+        assert isinstance(
+            result, (list, np.ndarray)
+        ), f"Expected a list but got {type(result)}"
+        differences = compare_arrays(example["returns"], result, delta=delta)
+        assert [] == differences, "\n".join(differences)
     elif isinstance(example["returns"], float) and math.isnan(example["returns"]):
         assert isinstance(result, float) and math.isnan(
             result
@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from openeo_test_suite.lib.comparison import compare_arrays
+from openeo_test_suite.lib.process_runner.util import prepare_arguments
+from openeo_test_suite.lib.process_selection import get_selected_processes
+from openeo_test_suite.lib.scaled_processes import (
+    DELTA,
+    ScaledProcessTest,
+    get_scaled_process_tests,
+    get_scaled_sizes,
+)
+from openeo_test_suite.lib.synthetic_datacubes import (
+    DatacubeProcessTest,
+    get_datacube_process_tests,
+    get_scaling_results,
+    get_synthetic_datacube_specs,
+    track_peak_memory,
+)
+from openeo_test_suite.lib.timing import PhaseTimer
+
+
+@pytest.fixture(scope="module")
+def process_dedupe() -> bool:
+    # Note: executions are measured (time, memory), and unlikely to be repeated
+    return False
+
+
+def get_scaled_tests():
+    """Scaled-up process tests (opt-in through `--scaled-sizes`)."""
+    sizes = get_scaled_sizes()
+    if not sizes:
+        return []
+    return get_scaled_process_tests(processes=get_selected_processes(), sizes=sizes)
+
+
+@pytest.mark.parametrize("scaled_test", get_scaled_tests(), ids=str)
+def test_scaled_process(
+    connection,
+    runner: str,
+    scaled_test: ScaledProcessTest,
+    skipper,
+    request,
+    phase_timer: PhaseTimer,
+):
+    process_id = scaled_test.process_id
+    request.node.user_properties.append(("process_id", process_id))
+
+    skipper.skip_if_unsupported_process(process_id)
+    if runner == "dask" and process_id == "array_apply":
+        # TODO: remove when fixed upstream
+        request.applymarker(
+            pytest.mark.xfail(
+                reason="Known openeo-processes-dask issue: array_apply returns a constant array (for any input size)",
+                strict=False,
+            )
+        )
+    if scaled_test.nodata and connection.is_json_only():
+        pytest.skip("HTTP JSON APIs don't support NaN values")
+
+    with phase_timer.phase("generate"):
+        arguments, expected = scaled_test.get_arguments_and_expected()
+
+    try:
+        with phase_timer.phase("prepare"):
+            arguments = prepare_arguments(
+                arguments=arguments,
+                process_id=process_id,
+                connection=connection,
+                file=None,
+            )
+    except NotImplementedError as e:
+        pytest.skip(str(e))
+
+    with phase_timer.phase("execute"):
+        result = connection.execute(process_id, arguments)
+
+    with phase_timer.phase("decode"):
+        result = connection.decode_data(result, expected)
+
+    with phase_timer.phase("compare"):
+        differences = compare_arrays(expected=expected, actual=result, delta=DELTA)
+    assert not differences, "\n".join(differences)
+
+
+def get_datacube_tests():
+    """Datacube process tests on synthetic datacubes (opt-in through `--synthetic-cube-shapes`)."""
+    specs = get_synthetic_datacube_specs()
+    if not specs:
+        return []
+    return get_datacube_process_tests(processes=get_selected_processes(), specs=specs)
+
+
+@pytest.mark.parametrize("datacube_test", get_datacube_tests(), ids=str)
+def test_synthetic_datacube_process(
+    connection,
+    runner: str,
+    datacube_test: DatacubeProcessTest,
+    skipper,
+    request,
+    phase_timer: PhaseTimer,
+):
+    process_id = datacube_test.process_id
+    request.node.user_properties.append(("process_id", process_id))
+
+    if runner not in {"dask", "vito"}:
+        pytest.skip(f"Synthetic datacubes are not supported with runner {runner!r}")
+    skipper.skip_if_unsupported_process([process_id] + datacube_test.required)
+
+    def get_arguments(timer: PhaseTimer) -> dict:
+        with timer.phase("generate"):
+            arguments = datacube_test.get_arguments()
+        with timer.phase("prepare"):
+            return prepare_arguments(
+                arguments=arguments,
+                process_id=process_id,
+                connection=connection,
+                file=None,
+            )
+
+    try:
+        arguments = get_arguments(phase_timer)
+    except NotImplementedError as e:
+        pytest.skip(str(e))
+
+    # Note: timed without memory tracking, as `tracemalloc` slows down allocations considerably
+    start = time.perf_counter()
+    with phase_timer.phase("execute"):
+        result = connection.execute(process_id, arguments)
+    with phase_timer.phase("decode"):
+        # Note: (lazy) results are computed while decoding
+        result = connection.decode_data(result, None)
+    duration = time.perf_counter() - start
+
+    # Separate (untimed) run, with fresh arguments, to measure peak memory
+    arguments = get_arguments(PhaseTimer())
+    with track_peak_memory() as memory:
+        connection.decode_data(connection.execute(process_id, arguments), None)
+
+    spec = datacube_test.spec
+    get_scaling_results().add(process_id, spec, duration, memory["peak"])
+    request.node.user_properties.append(("cube_bytes", spec.nbytes))
+    request.node.user_properties.append(("peak_memory", memory["peak"]))
+
+    assert isinstance(result, dict) and result.get("type") == "datacube"
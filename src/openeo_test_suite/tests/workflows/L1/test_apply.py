@@ -3,6 +3,7 @@ import pytest
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_apply(
     skipper,
     cube_one_day_red,
@@ -1,8 +1,10 @@
 import numpy as np
+import pytest
 
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_apply_dimension_quantiles_0(
     skipper,
     cube_one_day_red_nir,
@@ -44,6 +46,7 @@ def test_apply_dimension_quantiles_0(
     assert data[b_dim].values[1] == "B08"
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_apply_dimension_quantiles_1(
     skipper,
     cube_red_nir,
@@ -79,6 +82,7 @@ def test_apply_dimension_quantiles_1(
     assert (data[b_dim].values[2] == 2) or (data[b_dim].values[2] == "2")
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_apply_dimension_ndvi(
     skipper,
     cube_one_day_red_nir,
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from openeo_test_suite.lib.validate_stac import validate_stac_dict
 from openeo_test_suite.lib.workflows.io import (
@@ -11,6 +12,7 @@ from openeo_test_suite.lib.workflows.parameters import (
 )
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_load_save_netcdf(
     skipper,
     cube_red_nir,
@@ -49,6 +51,7 @@ def test_load_save_netcdf(
     assert (data[y_dim].max().values + y_res / 2) >= bounding_box_32632["south"]
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_load_save_10x10_netcdf(
     skipper,
     cube_red_10x10,
@@ -91,6 +94,7 @@ def test_load_save_10x10_netcdf(
 # In this test, only a single acquisition in time should be loaded
 
 
+@pytest.mark.required_output_format("geotiff")
 def test_load_save_geotiff(
     skipper,
     cube_one_day_red,
@@ -121,6 +125,7 @@ def test_load_save_geotiff(
     assert (data[y_dim].max().values + y_res / 2) >= bounding_box_32632["south"]
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_load_save_netcdf_batch_job_metadata(
     skipper,
     cube_red_10x10,
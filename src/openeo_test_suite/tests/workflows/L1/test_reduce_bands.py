@@ -1,6 +1,9 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_ndvi_index(
     skipper,
     cube_one_day_red_nir,
@@ -30,6 +33,7 @@ def test_ndvi_index(
 
 
 # Fails if array_index + label is not supported
+@pytest.mark.required_output_format("netcdf")
 def test_ndvi_label(
     skipper,
     cube_one_day_red_nir,
@@ -1,6 +1,9 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_ndvi_add_dim(
     skipper,
     cube_one_day_red_nir,
@@ -1,7 +1,10 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 from openeo_test_suite.lib.workflows.parameters import temporal_interval_one_day
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_aggregate_temporal(
     skipper,
     cube_red_nir,
@@ -31,6 +34,7 @@ def test_aggregate_temporal(
     assert len(data[t_dim]) == 3
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_aggregate_temporal_period(
     skipper,
     cube_red_nir,
@@ -1,6 +1,9 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_drop_dimension_time(
     skipper,
     cube_red_10x10,
@@ -1,9 +1,11 @@
 import numpy as np
+import pytest
 
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 from openeo_test_suite.lib.workflows.parameters import bounding_box_32632_10x10
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_filter_bbox(
     skipper,
     cube_one_day_red,
@@ -1,7 +1,10 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 from openeo_test_suite.lib.workflows.parameters import temporal_interval_one_day
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_filter_temporal(
     skipper,
     cube_red_nir,
@@ -1,6 +1,9 @@
+import pytest
+
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_rename_labels_bands(
     skipper,
     cube_one_day_red_nir,
@@ -27,6 +30,7 @@ def test_rename_labels_bands(
     assert data[b_dim].values[1] == "nir"
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_rename_labels_time(
     skipper,
     cube_one_day_red_nir,
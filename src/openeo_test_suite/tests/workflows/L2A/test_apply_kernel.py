@@ -1,8 +1,10 @@
 import numpy as np
+import pytest
 
 from openeo_test_suite.lib.workflows.io import load_netcdf_dataarray
 
 
+@pytest.mark.required_output_format("netcdf")
 def test_apply_kernel(
     skipper,
     cube_red_10x10,